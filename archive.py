@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+文章库
+把每次运行的录音稿、逐字稿、结构化JSON和HTML连同内容哈希存进本地SQLite数据库，
+对嘉宾、主题、章节标题和每组问答建立全文索引，并可以在样式改动后用多个进程批量重新渲染所有文章。
+
+用法:
+    python archive.py ingest output/*/                  # 导入已有的输出目录（或JSON文件）
+    python archive.py search "低比特 量化"               # 全文搜索
+    python archive.py list
+    python archive.py show <文章名> [--html]
+    python archive.py rerender --workers 4 [--export html/]
+
+设置 ARCHIVE_DB（或 pipeline.py --archive）后，pipeline 每次生成文章都会自动存入文章库。
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+import article_stats
+import tolerant_json
+from generate_article import generate_wechat_article_html, get_emphasis_matcher
+from chunking import CJK_PATTERN
+from checkpoint import hash_text
+
+
+DEFAULT_DB = 'articles.db'
+
+# 批量重新渲染时每批读取的文章数（内存占用只取决于一批）
+RERENDER_BATCH = 200
+
+# 搜索结果摘要中标记命中位置（先用控制字符，整理空格后再替换成括号）
+MATCH_START, MATCH_END = '\x02', '\x03'
+
+# segment 在每个中日韩字符两侧各加一个空格；搜索结果摘要中匹配的词两侧还有高亮标记，
+# 摘要的开头和结尾可能截在字符边上，少一侧空格
+SEGMENTED_CJK_PATTERN = re.compile(rf' ?({re.escape(MATCH_START)}?{CJK_PATTERN.pattern}{re.escape(MATCH_END)}?) ?')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    slug TEXT NOT NULL UNIQUE,
+    guest_name TEXT,
+    source_path TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    transcript TEXT,
+    transcript_hash TEXT,
+    verbatim TEXT,
+    verbatim_hash TEXT,
+    data TEXT,
+    data_hash TEXT,
+    html TEXT,
+    html_hash TEXT,
+    renderer_version TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS article_index USING fts5(guest_name, guest_intro, topics, titles);
+CREATE VIRTUAL TABLE IF NOT EXISTS qa_index USING fts5(subtitle, question, answer, article_id UNINDEXED, section UNINDEXED);
+'''
+
+
+def content_hash(text):
+    """内容哈希，内容为空时返回None"""
+    if text is None:
+        return None
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def renderer_version():
+    """渲染器代码和加粗短语表共同决定的版本，改动后批量重新渲染时所有文章都需要更新"""
+    import incremental_render
+    return hash_text(incremental_render.renderer_version(), get_emphasis_matcher().fingerprint)
+
+
+# ingest 的 renderer_version 参数会遮住上面的函数
+_current_renderer_version = renderer_version
+
+
+def segment(text):
+    """
+    全文索引用的分词：中日韩字符逐字用空格隔开，其他文字保持原样
+    FTS5 默认分词器把连续的汉字当成一个词，逐字切开后按短语查询，任意长度的词都能命中
+    """
+    return CJK_PATTERN.sub(r' \g<0> ', text or '')
+
+
+def unsegment(text):
+    """去掉 segment 在汉字两侧加的空格，原文中的空格保持不变（"2020年" 不会变成 "2020 年"）"""
+    return SEGMENTED_CJK_PATTERN.sub(r'\1', text or '').strip()
+
+
+def build_match(query):
+    """把用户输入的搜索词（空格分隔，全部命中）转成FTS5查询：每个词作为一个短语"""
+    terms = [term for term in query.split() if term]
+    if not terms:
+        raise ValueError("搜索词不能为空")
+    return ' '.join('"' + ' '.join(segment(term).split()).replace('"', '""') + '"' for term in terms)
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def _render_row(row):
+    """子进程中渲染一篇文章：(id, 数据JSON) -> (id, HTML, 错误信息)"""
+    article_id, data_text = row
+    try:
+        return article_id, generate_wechat_article_html(json.loads(data_text)), None
+    except Exception as e:
+        return article_id, None, f"{type(e).__name__}: {e}"
+
+
+class ArticleArchive:
+    """SQLite文章库（每个线程使用自己的实例）"""
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        # WAL模式下搜索不会被写入阻塞，并行的pipeline任务也可以依次写入
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _index(self, article_id, data):
+        """重建一篇文章的全文索引"""
+        self.conn.execute('DELETE FROM article_index WHERE rowid = ?', (article_id,))
+        self.conn.execute('DELETE FROM qa_index WHERE article_id = ?', (article_id,))
+        sections = data.get('main_sections') or []
+        self.conn.execute(
+            'INSERT INTO article_index (rowid, guest_name, guest_intro, topics, titles) VALUES (?, ?, ?, ?, ?)',
+            (article_id, segment(data.get('guest_name')), segment(data.get('guest_intro')),
+             segment('\n'.join(data.get('topics') or [])),
+             segment('\n'.join(section.get('title', '') for section in sections)))
+        )
+        self.conn.executemany(
+            'INSERT INTO qa_index (subtitle, question, answer, article_id, section) VALUES (?, ?, ?, ?, ?)',
+            [
+                (segment(sub.get('subtitle')), segment(sub.get('question')), segment(sub.get('answer')),
+                 article_id, section.get('title', ''))
+                for section in sections for sub in section.get('sub_sections') or []
+            ]
+        )
+
+    def ingest(self, slug, data, html=None, transcript=None, verbatim=None, source_path=None, renderer_version=None):
+        """
+        存入（或更新）一篇文章，没有提供的内容保留库中已有的版本；没有HTML时在本地渲染。
+        本地渲染的HTML按当前渲染器版本记录；传入的HTML只有同时给出 renderer_version 时才记录版本，
+        否则版本留空，批量重新渲染时会重新生成
+
+        Returns:
+            str: 'added'、'updated' 或 'unchanged'
+        """
+        article_stats.apply_stats(data)
+        data_text = json.dumps(data, ensure_ascii=False)
+        if html is None:
+            html = generate_wechat_article_html(data)
+            renderer_version = _current_renderer_version()
+        values = {
+            'guest_name': data.get('guest_name'),
+            'source_path': source_path,
+            'transcript': transcript,
+            'transcript_hash': content_hash(transcript),
+            'verbatim': verbatim,
+            'verbatim_hash': content_hash(verbatim),
+            'data': data_text,
+            'data_hash': content_hash(data_text),
+            'html': html,
+            'html_hash': content_hash(html),
+            'renderer_version': renderer_version
+        }
+        now = _now()
+        with self.conn:
+            row = self.conn.execute(
+                'SELECT id, transcript_hash, verbatim_hash, data_hash, html_hash, renderer_version FROM articles WHERE slug = ?',
+                (slug,)
+            ).fetchone()
+            if row is None:
+                cursor = self.conn.execute(
+                    f"INSERT INTO articles (slug, created_at, updated_at, {', '.join(values)}) "
+                    f"VALUES (?, ?, ?, {', '.join('?' * len(values))})",
+                    (slug, now, now, *values.values())
+                )
+                self._index(cursor.lastrowid, data)
+                return 'added'
+            if all(values[key] in (None, row[key])
+                   for key in ('transcript_hash', 'verbatim_hash', 'data_hash', 'html_hash', 'renderer_version')):
+                return 'unchanged'
+            # 渲染器版本描述的是库中的HTML：HTML换了就跟着换（未知时留空），HTML没变时保留原来的版本
+            if values['renderer_version'] is None and values['html_hash'] == row['html_hash']:
+                values['renderer_version'] = row['renderer_version']
+            self.conn.execute(
+                f"UPDATE articles SET updated_at = ?, "
+                f"{', '.join(f'{key} = ?' if key == 'renderer_version' else f'{key} = COALESCE(?, {key})' for key in values)} "
+                f"WHERE id = ?",
+                (now, *values.values(), row['id'])
+            )
+            if values['data_hash'] != row['data_hash']:
+                self._index(row['id'], data)
+            return 'updated'
+
+    def search(self, query, limit=20):
+        """
+        在嘉宾信息、主题、章节标题和问答中搜索，按相关度排序
+
+        Returns:
+            list[dict]: 每项包含 slug、guest_name、kind（'article' 或 'qa'）、section、subtitle、snippet
+        """
+        match = build_match(query)
+        try:
+            rows = self.conn.execute(
+                '''
+                SELECT * FROM (
+                    SELECT 'article' AS kind, a.slug, a.guest_name, '' AS section, '' AS subtitle,
+                           snippet(article_index, -1, :start, :end, '…', 24) AS snippet, bm25(article_index) AS rank
+                    FROM article_index JOIN articles a ON a.id = article_index.rowid
+                    WHERE article_index MATCH :match
+                    UNION ALL
+                    SELECT 'qa', a.slug, a.guest_name, q.section, q.subtitle,
+                           snippet(qa_index, -1, :start, :end, '…', 24), bm25(qa_index)
+                    FROM qa_index q JOIN articles a ON a.id = q.article_id
+                    WHERE qa_index MATCH :match
+                ) ORDER BY rank LIMIT :limit
+                ''',
+                {'match': match, 'start': MATCH_START, 'end': MATCH_END, 'limit': limit}
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"搜索词无效: {e}")
+        return [
+            {
+                'slug': row['slug'],
+                'guest_name': row['guest_name'],
+                'kind': row['kind'],
+                'section': row['section'],
+                'subtitle': unsegment(row['subtitle']),
+                'snippet': unsegment(row['snippet']).replace(MATCH_START, '【').replace(MATCH_END, '】')
+            }
+            for row in rows
+        ]
+
+    def list(self):
+        """所有文章的概要"""
+        return [dict(row) for row in self.conn.execute(
+            'SELECT slug, guest_name, updated_at, length(html) AS html_chars, renderer_version FROM articles ORDER BY updated_at DESC'
+        )]
+
+    def get(self, slug):
+        """读取一篇文章的完整记录，不存在时返回None"""
+        row = self.conn.execute('SELECT * FROM articles WHERE slug = ?', (slug,)).fetchone()
+        return dict(row) if row else None
+
+    def rerender(self, workers=1, force=False, slugs=None, export_dir=None):
+        """
+        用当前的模板和加粗短语表重新渲染文章，按批读取，workers>1 时在多个进程中并行渲染
+
+        只处理渲染器版本与当前不同的文章（force为True时处理全部），HTML没有变化的不写回
+
+        Yields:
+            tuple: (slug, 状态 'updated' / 'unchanged' / 'failed', 错误信息)
+        """
+        version = renderer_version()
+        conditions = ['data IS NOT NULL']
+        params = []
+        if not force:
+            conditions.append('renderer_version IS NOT ?')
+            params.append(version)
+        if slugs:
+            conditions.append(f"slug IN ({', '.join('?' * len(slugs))})")
+            params.extend(slugs)
+        if export_dir:
+            os.makedirs(export_dir, exist_ok=True)
+
+        pool = None
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            last_id = 0
+            while True:
+                # 按id分页读取，每批都是独立的查询，写回时不会影响后续的读取
+                rows = self.conn.execute(
+                    f"SELECT id, slug, data, html_hash FROM articles WHERE {' AND '.join(conditions)} AND id > ? "
+                    f"ORDER BY id LIMIT ?",
+                    (*params, last_id, RERENDER_BATCH)
+                ).fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1]['id']
+                jobs = [(row['id'], row['data']) for row in rows]
+                if pool is None:
+                    results = map(_render_row, jobs)
+                else:
+                    results = pool.map(_render_row, jobs, chunksize=max(1, len(jobs) // (workers * 2)))
+                by_id = {row['id']: row for row in rows}
+                updates = []
+                outcomes = []
+                for article_id, html, error in results:
+                    row = by_id[article_id]
+                    if error:
+                        outcomes.append((row['slug'], 'failed', error))
+                        continue
+                    html_hash = content_hash(html)
+                    changed = html_hash != row['html_hash']
+                    updates.append((html if changed else None, html_hash, version, _now() if changed else None, article_id))
+                    outcomes.append((row['slug'], 'updated' if changed else 'unchanged', None))
+                    if export_dir:
+                        with open(os.path.join(export_dir, f"{row['slug']}.html"), 'w', encoding='utf-8') as f:
+                            f.write(html)
+                with self.conn:
+                    self.conn.executemany(
+                        'UPDATE articles SET html = COALESCE(?, html), html_hash = ?, renderer_version = ?, '
+                        'updated_at = COALESCE(?, updated_at) WHERE id = ?',
+                        updates
+                    )
+                yield from outcomes
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+
+def _read_text(path):
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def ingest_run(db_path, txt_path, verbatim, data, html_path):
+    """把pipeline一次运行的结果存入文章库（文章名取录音稿文件名）"""
+    slug = Path(txt_path).stem
+    with ArticleArchive(db_path) as archive:
+        status = archive.ingest(
+            slug, data,
+            html=_read_text(html_path),
+            transcript=_read_text(txt_path),
+            verbatim=verbatim,
+            source_path=os.path.abspath(txt_path),
+            # HTML刚由本次运行按当前模板生成
+            renderer_version=renderer_version()
+        )
+    return slug, status
+
+
+def find_outputs(path):
+    """
+    从一个pipeline输出目录（或JSON文件）中找出要导入的文件
+
+    Returns:
+        dict: slug、json、html、verbatim、transcript 的路径（不存在的为None）
+    """
+    if os.path.isdir(path):
+        directory = Path(path)
+        json_path = directory / 'interview_data.json'
+        slug = directory.resolve().name
+    else:
+        json_path = Path(path)
+        directory = json_path.parent
+        slug = directory.resolve().name if json_path.name == 'interview_data.json' else json_path.stem
+    html_path = directory / 'interview_article.html'
+    if json_path.name != 'interview_data.json':
+        html_path = json_path.with_suffix('.html')
+    verbatim_paths = sorted(directory.glob('*_verbatim.txt'))
+    verbatim_path = verbatim_paths[0] if verbatim_paths else None
+    transcript_path = verbatim_path and verbatim_path.with_name(verbatim_path.name[:-len('_verbatim.txt')] + '.txt')
+    return {
+        'slug': slug,
+        'json': str(json_path),
+        'html': str(html_path) if html_path.exists() else None,
+        'verbatim': str(verbatim_path) if verbatim_path else None,
+        'transcript': str(transcript_path) if transcript_path and transcript_path.exists() else None
+    }
+
+
+def command_ingest(archive, args):
+    failed = 0
+    for path in args.paths:
+        found = find_outputs(path)
+        try:
+            data = tolerant_json.load_file(found['json'])
+            status = archive.ingest(
+                found['slug'], data,
+                html=_read_text(found['html']),
+                transcript=_read_text(found['transcript']),
+                verbatim=_read_text(found['verbatim']),
+                source_path=os.path.abspath(found['transcript'] or found['json'])
+            )
+        except Exception as e:
+            failed += 1
+            print(f"❌ {path}: {e}")
+            continue
+        print(f"✅ {found['slug']}: {status}")
+    return 1 if failed else 0
+
+
+def command_search(archive, args):
+    started = time.perf_counter()
+    try:
+        results = archive.search(args.query, args.limit)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    elapsed = (time.perf_counter() - started) * 1000
+    for result in results:
+        location = ' / '.join(part for part in (result['section'], result['subtitle']) if part) or '嘉宾与主题'
+        print(f"📄 {result['slug']}（{result['guest_name']}）{location}")
+        print(f"   {result['snippet']}")
+    print(f"🔍 {len(results)} 条结果，用时 {elapsed:.1f} ms")
+    return 0
+
+
+def command_list(archive, args):
+    rows = archive.list()
+    for row in rows:
+        print(f"   {row['slug']:<32} {row['guest_name'] or '':<12} {row['updated_at']}  {row['html_chars'] or 0:>9,} 字符")
+    print(f"📚 共 {len(rows)} 篇文章")
+    return 0
+
+
+def command_show(archive, args):
+    article = archive.get(args.slug)
+    if article is None:
+        print(f"❌ 文章不存在: {args.slug}")
+        return 1
+    field = 'html' if args.html else args.field
+    sys.stdout.write(article[field] or '')
+    return 0
+
+
+def command_rerender(archive, args):
+    started = time.perf_counter()
+    counts = {'updated': 0, 'unchanged': 0, 'failed': 0}
+    for slug, status, error in archive.rerender(args.workers, args.force, args.slugs, args.export):
+        counts[status] += 1
+        if error:
+            print(f"❌ {slug}: {error}")
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    print(f"✅ 重新渲染 {total} 篇文章：更新 {counts['updated']} 篇，没有变化 {counts['unchanged']} 篇，"
+          f"失败 {counts['failed']} 篇，用时 {elapsed:.1f}s")
+    return 1 if counts['failed'] else 0
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="文章库：存档、全文搜索和批量重新渲染")
+    parser.add_argument('--db', help=f"数据库路径（默认读取ARCHIVE_DB，未设置时为 {DEFAULT_DB}）")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest = commands.add_parser('ingest', help="导入pipeline输出目录或文章JSON")
+    ingest.add_argument('paths', nargs='+', help="输出目录（含 interview_data.json）或JSON文件")
+
+    search = commands.add_parser('search', help="全文搜索（多个词用空格分隔，全部命中）")
+    search.add_argument('query', help="搜索词")
+    search.add_argument('--limit', type=int, default=20, help="最多显示的结果数（默认20）")
+
+    commands.add_parser('list', help="列出所有文章")
+
+    show = commands.add_parser('show', help="输出一篇文章的内容")
+    show.add_argument('slug', help="文章名")
+    show.add_argument('--field', default='data', choices=['transcript', 'verbatim', 'data', 'html'], help="输出的内容（默认data）")
+    show.add_argument('--html', action='store_true', help="输出HTML（等同于 --field html）")
+
+    rerender = commands.add_parser('rerender', help="用当前模板批量重新渲染")
+    rerender.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="并行渲染的进程数（默认为CPU核数）")
+    rerender.add_argument('--force', action='store_true', help="渲染器版本没有变化的文章也重新渲染")
+    rerender.add_argument('--export', help="同时把HTML写到这个目录（<文章名>.html）")
+    rerender.add_argument('slugs', nargs='*', help="只重新渲染这些文章（默认全部）")
+    return parser.parse_args()
+
+
+COMMANDS = {
+    'ingest': command_ingest,
+    'search': command_search,
+    'list': command_list,
+    'show': command_show,
+    'rerender': command_rerender,
+}
+
+
+def main():
+    """主函数"""
+    args = parse_args()
+    if os.path.exists('.env'):
+        from dotenv import load_dotenv
+        load_dotenv('.env')
+    with ArticleArchive(args.db or os.getenv('ARCHIVE_DB') or DEFAULT_DB) as archive:
+        sys.exit(COMMANDS[args.command](archive, args))
+
+
+if __name__ == "__main__":
+    main()
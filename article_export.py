@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+多格式导出
+只遍历一次文章数据，同时生成微信公众号HTML、Markdown、纯文本和问答大纲（JSON），
+每种格式边生成边写入各自的文件，导出全部格式的耗时与只渲染一种格式相当。
+
+- Markdown：可以直接粘贴到 Markdown 转公众号的排版工具
+- 纯文本：不含任何标记，用于全文搜索和配音稿
+- 问答大纲：各章节的小标题和问题，用于审稿和排期
+
+用法:
+    python article_export.py interview_data.json                        # 全部格式写到JSON所在目录
+    python article_export.py interview_data.json -f md,txt -d export/   # 只导出Markdown和纯文本
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import article_stats
+import tolerant_json
+import interview_model
+from generate_article import ArticleSink, WeChatHTMLSink, walk_article
+from emphasis import wrap_matches
+from metrics import record_file_written
+
+
+# 提问方（与HTML模板中的问题前缀一致）
+INTERVIEWER_LABEL = '蜗壳进阶联盟'
+
+
+def _bold(phrase):
+    return f'**{phrase}**'
+
+
+class MarkdownSink(ArticleSink):
+    """Markdown：章节为二级标题、小标题为三级标题，关键短语加粗"""
+
+    uses_emphasis = True
+
+    def begin(self, interview):
+        self.out.append(f"# {interview.guest_name}\n\n")
+        self.out.append(f"> 长文预警，本文共 **{interview.word_count}** 字，预计阅读时间 **{interview.reading_time}** 分钟\n\n")
+        if interview.guest_intro:
+            self.out.append(interview.guest_intro.replace('\n', '  \n') + '\n\n')
+        if interview.interviewer:
+            self.out.append(f"**采访、编辑 | {interview.interviewer}**  \n")
+        if interview.proofreader:
+            self.out.append(f"**线下承办 | {interview.proofreader}**\n")
+        if interview.topics:
+            self.out.append("\n## 主题摘要\n\n")
+            self.out.extend(f"- **{topic}**\n" for topic in interview.topics)
+
+    def section(self, section):
+        self.out.append(f"\n## {section.id} {section.title}".rstrip() + '\n')
+
+    def subtitle(self, subtitle, count):
+        self.out.append(f"\n### {subtitle}\n")
+
+    def question(self, question):
+        self.out.append(f"\n**{INTERVIEWER_LABEL}：{question}**\n")
+
+    def answer(self, paragraphs, speaker, emphasis):
+        if emphasis is None:
+            emphasis = [()] * len(paragraphs)
+        first, *rest = paragraphs
+        if first.strip():
+            self.out.append(f"\n**{speaker}**{wrap_matches(first, emphasis[0], _bold)}\n")
+        self.out.extend(
+            f"\n{wrap_matches(para, matches, _bold)}\n" for para, matches in zip(rest, emphasis[1:]) if para.strip()
+        )
+
+
+class PlainTextSink(ArticleSink):
+    """纯文本：不含任何标记，每段一行"""
+
+    def begin(self, interview):
+        self.out.append(f"{interview.guest_name}\n")
+        if interview.guest_intro:
+            self.out.append(f"\n{interview.guest_intro}\n")
+        if interview.topics:
+            self.out.append('\n' + '\n'.join(interview.topics) + '\n')
+
+    def section(self, section):
+        self.out.append(f"\n\n{section.id} {section.title}".rstrip() + '\n')
+
+    def subtitle(self, subtitle, count):
+        self.out.append(f"\n{subtitle}\n")
+
+    def question(self, question):
+        self.out.append(f"\n{INTERVIEWER_LABEL}：{question}\n")
+
+    def answer(self, paragraphs, speaker, emphasis):
+        first, *rest = paragraphs
+        if first.strip():
+            self.out.append(f"{speaker}{first}\n")
+        self.out.extend(f"{para}\n" for para in rest if para.strip())
+
+
+class OutlineSink(ArticleSink):
+    """问答大纲（JSON）：每个章节按小标题分组列出问题，一个章节写一行"""
+
+    def begin(self, interview):
+        self.count = 0
+        self.out.append('{\n  "guest_name": ' + json.dumps(interview.guest_name, ensure_ascii=False) + ',\n')
+        self.out.append('  "topics": ' + json.dumps(interview.topics, ensure_ascii=False) + ',\n')
+        self.out.append('  "main_sections": [')
+
+    def section(self, section):
+        self.groups = []
+        self.group = None
+
+    def subtitle(self, subtitle, count):
+        self.group = {'subtitle': subtitle, 'questions': []}
+        self.groups.append(self.group)
+
+    def question(self, question):
+        # 章节开头没有小标题的问题单独成组
+        if self.group is None:
+            self.subtitle('', 0)
+        self.group['questions'].append(question)
+
+    def end_section(self, section):
+        outline = {'id': section.id, 'title': section.title, 'subtitles': self.groups}
+        self.out.append((',' if self.count else '') + '\n    ' + json.dumps(outline, ensure_ascii=False))
+        self.count += 1
+
+    def end(self, interview):
+        self.out.append('\n  ]\n}\n')
+
+
+# 格式名 -> (输出目标, 默认文件名)
+FORMATS = {
+    'html': (WeChatHTMLSink, 'interview_article.html'),
+    'md': (MarkdownSink, 'interview_article.md'),
+    'txt': (PlainTextSink, 'interview_article.txt'),
+    'outline': (OutlineSink, 'interview_outline.json'),
+}
+
+
+def parse_formats(text):
+    """'md,txt' -> ['md', 'txt']，有未知格式时抛出 ValueError"""
+    formats = [name.strip() for name in text.split(',') if name.strip()]
+    unknown = [name for name in formats if name not in FORMATS]
+    if unknown:
+        raise ValueError(f"未知的导出格式: {', '.join(unknown)}（可选 {', '.join(FORMATS)}）")
+    return formats
+
+
+def default_paths(formats, output_dir='.'):
+    """各格式在output_dir中的默认输出路径"""
+    return {name: os.path.join(output_dir, FORMATS[name][1]) for name in formats}
+
+
+def export_article(data, targets):
+    """
+    只遍历一次文章，同时写出多种格式
+    每个章节生成后立即写入各自的文件，内存峰值只取决于最大的单个章节；
+    先写临时文件，全部完成后再替换，失败时不会留下写了一半的文件
+
+    Args:
+        data: 文章数据（字典或 Interview）
+        targets: {格式名: 输出路径}
+
+    Returns:
+        dict: {格式名: 写入的字符数}
+    """
+    interview = interview_model.coerce(data)
+    sinks = {name: FORMATS[name][0]() for name in targets}
+    written = dict.fromkeys(targets, 0)
+    files = {}
+    try:
+        for name, path in targets.items():
+            files[name] = open(f'{path}.tmp', 'w', encoding='utf-8')
+        for _ in walk_article(interview, list(sinks.values())):
+            for name, sink in sinks.items():
+                if sink.out:
+                    text = ''.join(sink.out)
+                    sink.out.clear()
+                    files[name].write(text)
+                    written[name] += len(text)
+    except BaseException:
+        for name, f in files.items():
+            f.close()
+            os.remove(f'{targets[name]}.tmp')
+        raise
+    for name, f in files.items():
+        f.close()
+        os.replace(f'{targets[name]}.tmp', targets[name])
+        record_file_written(targets[name])
+    return written
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="一次遍历导出多种格式：微信公众号HTML、Markdown、纯文本、问答大纲")
+    parser.add_argument('json_path', help="文章JSON文件路径")
+    parser.add_argument('-f', '--formats', default=','.join(FORMATS), help=f"导出的格式，逗号分隔（默认全部：{','.join(FORMATS)}）")
+    parser.add_argument('-d', '--output-dir', help="输出目录（默认为JSON所在目录）")
+    return parser.parse_args()
+
+
+def main():
+    """主函数"""
+    args = parse_args()
+    if 'EMPHASIS_GLOSSARY' not in os.environ and os.path.exists('.env'):
+        from dotenv import load_dotenv
+        load_dotenv('.env')
+    try:
+        formats = parse_formats(args.formats)
+        data = tolerant_json.load_file(args.json_path)
+        article_stats.apply_stats(data)
+        output_dir = args.output_dir or os.path.dirname(os.path.abspath(args.json_path))
+        os.makedirs(output_dir, exist_ok=True)
+        targets = default_paths(formats, output_dir)
+        started = time.perf_counter()
+        written = export_article(data, targets)
+    except (OSError, ValueError) as e:
+        print(f"❌ 导出失败: {e}")
+        sys.exit(1)
+    elapsed = (time.perf_counter() - started) * 1000
+    for name, path in targets.items():
+        print(f"✅ {path}（{written[name]:,} 字符）")
+    print(f"📊 导出 {len(targets)} 种格式，用时 {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
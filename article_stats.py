@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+文章字数和阅读时间统计
+在本地根据 main_sections 中的问答内容计算字数（中文按字、英文按词）和预计阅读时间，
+不再由模型在JSON中输出这些数字
+"""
+
+import re
+import sys
+import json
+import math
+import argparse
+
+import tolerant_json
+
+
+# 中文字符（汉字），连续的汉字作为一次匹配，减少匹配次数
+CJK_RUN_PATTERN = re.compile(r'[㐀-䶿一-鿿豈-﫿]+')
+
+# 英文单词和数字（如 BitNet、b1.58、don't）
+LATIN_WORD_PATTERN = re.compile(r"[A-Za-z0-9]+(?:['.\-][A-Za-z0-9]+)*")
+
+# 阅读速度：中文字/分钟，英文词/分钟
+CJK_CHARS_PER_MINUTE = 450
+LATIN_WORDS_PER_MINUTE = 200
+
+
+def iter_paragraphs(data):
+    """依次产出文章正文中的所有问题和回答段落"""
+    for section in data.get('main_sections') or []:
+        for sub_section in section.get('sub_sections') or []:
+            question = sub_section.get('question')
+            if question:
+                yield question
+            answer = sub_section.get('answer')
+            if answer:
+                yield answer
+
+
+def count_text(text):
+    """
+    统计一段文本中的汉字数和英文词数
+
+    Returns:
+        tuple[int, int]: (汉字数, 英文词数)
+    """
+    cjk_chars = sum(map(len, CJK_RUN_PATTERN.findall(text)))
+    latin_words = len(LATIN_WORD_PATTERN.findall(text))
+    return cjk_chars, latin_words
+
+
+def compute_stats(data):
+    """
+    计算一篇文章的统计信息
+    所有段落拼接后只扫描一遍，避免逐段调用正则
+
+    Returns:
+        dict: word_count（汉字数+英文词数）、reading_time（分钟，至少为1）、
+              cjk_chars、latin_words、sections、questions
+    """
+    paragraphs = list(iter_paragraphs(data))
+    cjk_chars, latin_words = count_text('\n'.join(paragraphs))
+    minutes = cjk_chars / CJK_CHARS_PER_MINUTE + latin_words / LATIN_WORDS_PER_MINUTE
+    sections = data.get('main_sections') or []
+    return {
+        'word_count': cjk_chars + latin_words,
+        'reading_time': max(1, math.ceil(minutes)),
+        'cjk_chars': cjk_chars,
+        'latin_words': latin_words,
+        'sections': len(sections),
+        'questions': sum(len(section.get('sub_sections') or []) for section in sections),
+    }
+
+
+def apply_stats(data):
+    """用本地计算结果覆盖文章数据中的 word_count 和 reading_time，返回统计信息"""
+    stats = compute_stats(data)
+    # 与原有数据格式保持一致，使用字符串
+    data['word_count'] = str(stats['word_count'])
+    data['reading_time'] = str(stats['reading_time'])
+    return stats
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="统计文章JSON的字数和预计阅读时间")
+    parser.add_argument('json_paths', nargs='+', help="文章JSON文件路径（可以有多个）")
+    parser.add_argument('--update', action='store_true', help="把计算结果写回JSON文件")
+    return parser.parse_args()
+
+
+def main():
+    """主函数"""
+    args = parse_args()
+    failed = 0
+    for path in args.json_paths:
+        try:
+            data = tolerant_json.load_file(path)
+        except Exception as e:
+            print(f"❌ 无法读取 {path}: {e}")
+            failed += 1
+            continue
+        stats = apply_stats(data)
+        print(f"📊 {path}: {stats['word_count']} 字，预计阅读 {stats['reading_time']} 分钟"
+              f"（汉字 {stats['cjk_chars']}，英文词 {stats['latin_words']}，"
+              f"{stats['sections']} 个章节，{stats['questions']} 个问答）")
+        if args.update:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1060 @@
+#!/usr/bin/env python3
+"""
+录音稿处理Pipeline的异步引擎
+所有模型请求共用一个带连接池的 AsyncOpenAI 客户端，并通过信号量和令牌桶限制并发与速率
+
+可在其他异步服务中直接使用：
+
+    async with LLMEngine(config, cache=cache) as engine:
+        result = await run_pipeline(engine, txt_path, prompts)
+"""
+
+import os
+import json
+import time
+import shutil
+import asyncio
+
+import generate_article
+import templates
+import emphasis
+import article_stats
+import transcript_cleaner
+import incremental_render
+import interview_model
+import article_export
+from generate_article import render_to
+from chunking import (
+    CJK_PATTERN, split_transcript, build_chunk_content, estimate_tokens, ChunkStitcher, VerbatimSegmenter
+)
+from llm_cache import LLMCache
+from checkpoint import STAGES, StageManifest, manifest_path_for, hash_text, hash_file
+from metrics import PipelineMetrics, record_file_written
+from llm_retry import RetryPolicy, CircuitBreaker, parse_models, is_retryable, describe_error
+from tolerant_json import IncrementalJSONParser, JSONRepairError, format_path, load_file as load_json_file
+
+DEFAULT_TEMPERATURE = 0.3
+
+# 改动后需要重新渲染HTML的模块
+RENDERER_MODULES = (generate_article, templates, emphasis, article_stats, incremental_render, interview_model)
+
+# 步骤2的JSON被截断时，最多重新请求剩余章节的次数
+MAX_JSON_CONTINUATIONS = 3
+
+# 存入文章库的结果
+ARCHIVE_STATUS = {'added': '新增', 'updated': '已更新', 'unchanged': '没有变化'}
+
+# 按章节提取时，单个章节失败后的重试次数
+SECTION_RETRIES = 2
+
+# 流式输出中断后继续生成时追加的指令
+CONTINUE_PROMPT = "输出在上面的位置中断了。请紧接着中断处继续输出剩余内容，不要重复已经输出的部分，也不要添加任何说明。"
+
+
+class RateLimiter:
+    """令牌桶限流器，同时限制每分钟请求数（RPM）和每分钟token数（TPM），为0表示不限制"""
+
+    def __init__(self, rpm=0, tpm=0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    async def acquire(self, tokens=0):
+        """等待直到桶中有足够的请求数和token额度"""
+        if not self.rpm and not self.tpm:
+            return
+        # 单个请求超过整桶容量时按整桶计算，避免永远等待
+        tokens = min(tokens, self.tpm) if self.tpm else 0
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = 0.0
+                if self.rpm and self._requests < 1:
+                    wait = max(wait, (1 - self._requests) * 60 / self.rpm)
+                if self.tpm and self._tokens < tokens:
+                    wait = max(wait, (tokens - self._tokens) * 60 / self.tpm)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            if self.rpm:
+                self._requests -= 1
+            if self.tpm:
+                self._tokens -= tokens
+
+
+class LLMEngine:
+    """
+    共享的大模型调用引擎
+    持有唯一的 AsyncOpenAI 客户端（复用连接池中的TLS连接）、并发信号量、限流器、重试策略、
+    每个模型的熔断器、本地缓存和运行指标。
+    客户端在第一次请求模型时才创建（openai 导入很慢），只执行渲染或全部命中缓存时不会导入
+    """
+
+    def __init__(self, config, cache=None, max_concurrency=None, metrics=None):
+        """
+        Args:
+            config: load_config() 返回的配置
+            cache: 可选的 LLMCache
+            max_concurrency: 同时进行的模型请求上限，默认读取配置中的 max_concurrency
+            metrics: 记录调用次数和token数的 PipelineMetrics，默认新建一个
+        """
+        self.config = config
+        self.cache = cache
+        self.metrics = metrics or PipelineMetrics()
+        self._client = None
+        self.retry_policy = RetryPolicy(
+            config.get('max_retries', 5), config.get('retry_base_delay', 1.0), config.get('retry_max_delay', 60.0)
+        )
+        self.breakers = {}
+        self.semaphore = asyncio.Semaphore(max_concurrency or config['max_concurrency'])
+        self.rate_limiter = RateLimiter(config.get('rate_limit_rpm', 0), config.get('rate_limit_tpm', 0))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @property
+    def client(self):
+        """AsyncOpenAI 客户端（第一次使用时创建）"""
+        if self._client is None:
+            from openai import AsyncOpenAI
+            # 重试由 _schedule 统一处理，关闭SDK自带的重试
+            self._client = AsyncOpenAI(
+                api_key=self.config['api_key'],
+                base_url=self.config['base_url'],
+                timeout=self.config.get('request_timeout', 600.0),
+                max_retries=0
+            )
+        return self._client
+
+    async def close(self):
+        """关闭底层HTTP连接池"""
+        if self._client is not None:
+            await self._client.close()
+
+    def models_for(self, stage):
+        """某个阶段按顺序尝试的模型列表（STEP1_MODEL_NAME / STEP2_MODEL_NAME，默认MODEL_NAME）"""
+        return parse_models(self.config.get('models', {}).get(stage) or self.config['model_name'])
+
+    def _breaker(self, model_name):
+        breaker = self.breakers.get(model_name)
+        if breaker is None:
+            breaker = self.breakers[model_name] = CircuitBreaker(
+                self.config.get('breaker_threshold', 5), self.config.get('breaker_reset', 60.0)
+            )
+        return breaker
+
+    async def _schedule(self, models, tokens, request):
+        """
+        按顺序尝试models中的模型发起请求
+
+        每个模型失败后按退避策略重试（等待期间不占用并发名额），不可重试、重试用尽或已熔断时换下一个模型；
+        所有模型都在熔断中时，等到最早恢复的模型可以试探后再试一轮
+
+        Args:
+            request: 协程函数 request(model_name)，发起一次请求并返回结果
+        """
+        if not models:
+            raise ValueError("请在.env文件中设置MODEL_NAME")
+        last_error = None
+        for round_index in range(2):
+            for position, model_name in enumerate(models):
+                breaker = self._breaker(model_name)
+                attempt = 0
+                while breaker.allow():
+                    # 熔断到时后放行的试探请求（其他调用方在试探有结果之前被拒绝）
+                    probe = breaker.probing
+                    try:
+                        async with self.semaphore:
+                            await self.rate_limiter.acquire(tokens)
+                            result = await request(model_name)
+                    except Exception as e:
+                        last_error = e
+                        delay = self.retry_policy.next_delay(attempt, e)
+                        if is_retryable(e) and breaker.record_failure():
+                            print(f"   ⚠️ 模型 {model_name} 连续失败 {breaker.failures} 次，熔断 {breaker.reset_timeout:.0f}s")
+                            break
+                        if probe:
+                            breaker.release()
+                        if delay is None:
+                            break
+                        attempt += 1
+                        self.metrics.record_retry()
+                        print(f"   ⚠️ 模型 {model_name} 请求失败（{describe_error(e)}），{delay:.1f}s 后第 {attempt} 次重试")
+                        await asyncio.sleep(delay)
+                        continue
+                    except BaseException:
+                        if probe:
+                            breaker.release()
+                        raise
+                    breaker.record_success()
+                    return result
+                if position + 1 < len(models):
+                    print(f"   ⚠️ 模型 {model_name} 暂不可用，改用备选模型 {models[position + 1]}")
+            if last_error is not None or round_index:
+                break
+            # 熔断已到时、正在试探的模型剩余时间为0，稍等一下看试探结果
+            wait = max(min(self._breaker(model_name).remaining() for model_name in models), 1.0)
+            print(f"   ⏳ 所有模型都在熔断中，{wait:.0f}s 后重试")
+            await asyncio.sleep(wait)
+        print(f"❌ API调用失败: {last_error!r}" if last_error else "❌ API调用失败: 所有模型都在熔断中")
+        raise last_error or RuntimeError("所有模型都在熔断中")
+
+    async def complete(self, prompt, content, model_name=None, temperature=DEFAULT_TEMPERATURE):
+        """
+        调用大语言模型（优先读取本地缓存）
+        model_name可以是按顺序尝试的模型列表（或逗号分隔的字符串），缓存按整个列表记录
+        """
+        models = parse_models(model_name or self.config['model_name'])
+        key = LLMCache.make_key(prompt, content, ','.join(models), temperature)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.metrics.record_llm_call(cached=True)
+                return cached
+
+        async def request(name):
+            return await self.client.chat.completions.create(
+                model=name,
+                messages=[
+                    {"role": "system", "content": prompt},
+                    {"role": "user", "content": content}
+                ],
+                temperature=temperature
+            )
+
+        response = await self._schedule(models, estimate_tokens(prompt) + estimate_tokens(content), request)
+        result = response.choices[0].message.content
+        self._record_usage(getattr(response, 'usage', None), prompt, content, result)
+        if self.cache is not None:
+            self.cache.set(key, result, ','.join(models))
+        return result
+
+    async def complete_stream(self, prompt, content, output_path, model_name=None, temperature=DEFAULT_TEMPERATURE,
+                              on_delta=None):
+        """
+        流式调用大语言模型，边生成边写入output_path，并实时显示生成速度
+
+        生成过程中在旁边保留 <output_path>.partial 标记文件；若上次运行中断，
+        再次以相同请求调用时会保留已写入的内容，并让模型从中断处继续生成。
+        生成中途连接断开时，重试（或改用备选模型）同样从已生成的位置继续。
+        on_delta不为空时，按顺序收到完整输出的每一段（包括缓存结果和上次中断前的内容）
+        """
+        models = parse_models(model_name or self.config['model_name'])
+        key = LLMCache.make_key(prompt, content, ','.join(models), temperature)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.metrics.record_llm_call(cached=True)
+                await asyncio.to_thread(_write_text, output_path, cached)
+                if on_delta is not None:
+                    on_delta(cached)
+                return cached
+
+        marker_path = f'{output_path}.partial'
+        partial = ''
+        if os.path.exists(marker_path) and os.path.exists(output_path):
+            with open(marker_path, 'r', encoding='utf-8') as f:
+                marker_key = f.read().strip()
+            if marker_key == key:
+                with open(output_path, 'r', encoding='utf-8') as f:
+                    partial = f.read()
+                print(f"   ↩️ 从上次中断处继续生成（已有 {len(partial)} 字）")
+                if on_delta is not None:
+                    on_delta(partial)
+        _write_text(marker_path, key)
+
+        resumed_length = len(partial)
+        usage = None
+        # 进度中的token数按收到的文本估算（与 estimate_tokens 一致），而不是数chunk
+        cjk_chars = other_chars = 0
+        started = time.perf_counter()
+        last_report = 0.0
+
+        def received_tokens():
+            return cjk_chars + (other_chars + 3) // 4
+
+        async def request(name):
+            nonlocal partial, usage, cjk_chars, other_chars, last_report
+            messages = [
+                {"role": "system", "content": prompt},
+                {"role": "user", "content": content}
+            ]
+            if partial:
+                messages += [
+                    {"role": "assistant", "content": partial},
+                    {"role": "user", "content": CONTINUE_PROMPT}
+                ]
+            stream = await self.client.chat.completions.create(
+                model=name,
+                messages=messages,
+                temperature=temperature,
+                stream=True
+            )
+            pieces = []
+            try:
+                with open(output_path, 'a' if partial else 'w', encoding='utf-8') as f:
+                    async for chunk in stream:
+                        # 部分服务商会在最后一个chunk中附带usage
+                        usage = getattr(chunk, 'usage', None) or usage
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if not delta:
+                            continue
+                        f.write(delta)
+                        f.flush()
+                        if on_delta is not None:
+                            on_delta(delta)
+                        pieces.append(delta)
+                        cjk = len(CJK_PATTERN.findall(delta))
+                        cjk_chars += cjk
+                        other_chars += len(delta) - cjk
+                        elapsed = time.perf_counter() - started
+                        if elapsed - last_report >= 0.5:
+                            last_report = elapsed
+                            tokens = received_tokens()
+                            print(f"\r   ⏳ 已接收约 {tokens} tokens | {tokens / elapsed:.1f} tokens/s | 已用时 {elapsed:.1f}s",
+                                  end='', flush=True)
+            except BaseException:
+                if last_report:
+                    print()
+                raise
+            finally:
+                # 已经写入文件的内容保留下来，重试时从这里继续
+                partial += ''.join(pieces)
+
+        try:
+            await self._schedule(models, estimate_tokens(prompt) + estimate_tokens(content), request)
+        except BaseException as e:
+            print(f"❌ 流式生成中断: {e!r}，已保留部分输出，重新运行即可从中断处继续: {output_path}")
+            raise
+        elapsed = time.perf_counter() - started
+        tokens = received_tokens()
+        print(f"\r   ⏳ 已接收约 {tokens} tokens | {tokens / max(elapsed, 1e-6):.1f} tokens/s | 已用时 {elapsed:.1f}s")
+
+        os.remove(marker_path)
+        record_file_written(output_path)
+        self._record_usage(usage, prompt, content, partial[resumed_length:])
+        if self.cache is not None:
+            self.cache.set(key, partial, ','.join(models))
+        return partial
+
+    def _record_usage(self, usage, prompt, content, result):
+        """记录一次实际请求的token数，服务商没有返回usage时按文本估算"""
+        prompt_tokens = getattr(usage, 'prompt_tokens', None)
+        completion_tokens = getattr(usage, 'completion_tokens', None)
+        if not isinstance(prompt_tokens, int):
+            prompt_tokens = estimate_tokens(prompt) + estimate_tokens(content)
+        if not isinstance(completion_tokens, int):
+            completion_tokens = estimate_tokens(result or '')
+        self.metrics.record_llm_call(prompt_tokens, completion_tokens)
+
+    def discard_cached(self, prompt, content, model_name=None, temperature=DEFAULT_TEMPERATURE):
+        """删除某次调用的缓存结果"""
+        if self.cache is not None:
+            models = parse_models(model_name or self.config['model_name'])
+            self.cache.discard(LLMCache.make_key(prompt, content, ','.join(models), temperature))
+
+
+def output_path_for(name, output_dir=None):
+    """输出文件路径，未指定输出目录时写到当前目录"""
+    if not output_dir:
+        return name
+    os.makedirs(output_dir, exist_ok=True)
+    return os.path.join(output_dir, name)
+
+
+def verbatim_path_for(txt_path, output_dir=None):
+    """逐字稿路径（默认与录音稿同目录）；只替换结尾的 .txt，任何输入都不会与录音稿本身同名"""
+    verbatim_path = (txt_path[:-len('.txt')] if txt_path.endswith('.txt') else txt_path) + '_verbatim.txt'
+    if output_dir:
+        verbatim_path = output_path_for(os.path.basename(verbatim_path), output_dir)
+    return verbatim_path
+
+
+def _write_text(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    record_file_written(path)
+
+
+async def transcript_to_verbatim_chunked(engine, transcript, prompts, on_segment=None):
+    """
+    分块并发转写长录音稿，按原顺序拼接结果
+    on_segment不为空时，每当前面的片段全部完成，就按顺序把新拼接好的部分交给 on_segment(index, text)
+    """
+    config = engine.config
+    chunks = split_transcript(
+        transcript,
+        max_tokens=config['chunk_tokens'],
+        overlap=config['chunk_overlap']
+    )
+    prompt = prompts['transcript_to_verbatim']['content']
+    template = prompts['transcript_chunk']['content']
+    print(f"   - 录音稿已切分为 {len(chunks)} 个片段")
+
+    stitcher = ChunkStitcher()
+    outputs = {}
+    paragraphs = []
+    next_index = 0
+    segment_count = 0
+
+    async def convert(chunk):
+        nonlocal next_index, segment_count
+        content = build_chunk_content(chunk, template)
+        result = await engine.complete(prompt, content, model_name=engine.models_for('verbatim'))
+        print(f"   - 片段 {chunk['index'] + 1}/{len(chunks)} 完成")
+        outputs[chunk['index']] = result
+        # 按顺序拼接已经连续完成的片段
+        while next_index in outputs:
+            new_paragraphs = stitcher.add(outputs.pop(next_index))
+            next_index += 1
+            paragraphs.extend(new_paragraphs)
+            if new_paragraphs and on_segment is not None:
+                on_segment(segment_count, '\n\n'.join(new_paragraphs))
+                segment_count += 1
+
+    await asyncio.gather(*(convert(chunk) for chunk in chunks))
+    return '\n\n'.join(paragraphs)
+
+
+async def step1_transcript_to_verbatim(engine, txt_path, prompts, chunked=False, stream=False, clean=False,
+                                       local_only=False, output_dir=None, on_segment=None):
+    """
+    步骤1: 录音稿转逐字稿
+    clean为True时（--clean）先在本地删除语气词、合并重复、统一发言人标记，缩短发给模型的录音稿；
+    local_only为True时直接把（预清洗后的）录音稿作为逐字稿，不调用模型；
+    stream为True时（非分块模式）边生成边写入逐字稿文件，中断后重跑可从中断处继续；
+    on_segment不为空时，逐字稿按段落边界切成片段，每生成完一个片段就调用一次 on_segment(index, text)
+    """
+    print("🎯 步骤1: 录音稿转逐字稿...")
+
+    # 读取录音稿
+    try:
+        with open(txt_path, 'r', encoding='utf-8') as f:
+            transcript = f.read()
+    except Exception as e:
+        print(f"❌ 无法读取录音稿文件: {e}")
+        raise
+
+    if clean:
+        transcript, report = await asyncio.to_thread(
+            transcript_cleaner.clean_transcript, transcript, engine.config.get('filler_lexicon')
+        )
+        removed = report['tokens_removed']
+        print(f"   - 本地预清洗: 移除约 {removed} tokens（{removed / max(report['tokens_before'], 1):.1%}），"
+              f"剩余约 {report['tokens_after']} tokens")
+
+    verbatim_path = verbatim_path_for(txt_path, output_dir)
+
+    # 调用大模型并保存逐字稿
+    prompt = prompts['transcript_to_verbatim']['content']
+    segmenter = None
+    if on_segment is not None and not chunked:
+        segmenter = VerbatimSegmenter(on_segment, engine.config['chunk_tokens'])
+    if local_only:
+        verbatim = transcript
+        await asyncio.to_thread(_write_text, verbatim_path, verbatim)
+    elif chunked:
+        verbatim = await transcript_to_verbatim_chunked(engine, transcript, prompts, on_segment)
+        await asyncio.to_thread(_write_text, verbatim_path, verbatim)
+    elif stream:
+        verbatim = await engine.complete_stream(
+            prompt, transcript, verbatim_path, model_name=engine.models_for('verbatim'),
+            on_delta=segmenter.feed if segmenter else None
+        )
+    else:
+        verbatim = await engine.complete(prompt, transcript, model_name=engine.models_for('verbatim'))
+        await asyncio.to_thread(_write_text, verbatim_path, verbatim)
+    if segmenter is not None:
+        if local_only or not stream:
+            segmenter.feed(verbatim)
+        segmenter.finish()
+
+    print(f"✅ 逐字稿已保存: {verbatim_path}")
+    return verbatim, verbatim_path
+
+
+def _completed_sections(result):
+    """
+    被截断的输出中已经完整的章节数
+    截断发生在 main_sections 之外（例如还在输出 guest_intro）时返回None
+    """
+    path = result.truncated_path
+    if not path or path[0] != 'main_sections' or not isinstance(result.value.get('main_sections'), list):
+        return None
+    return path[1] if len(path) > 1 else len(result.value['main_sections'])
+
+
+def _continuation_content(template, verbatim, sections):
+    """构造只请求剩余章节的用户内容"""
+    completed = '\n'.join(f"- {section.get('id', '')} {section.get('title', '')}" for section in sections) or '（无）'
+    return template.replace('{completed}', completed).replace('{verbatim}', verbatim)
+
+
+async def _request_json(engine, prompt, content, raw_path=None):
+    """用步骤2的模型请求并增量解析返回的JSON；raw_path不为空时流式生成，并把原始输出写入raw_path"""
+    parser = IncrementalJSONParser()
+    models = engine.models_for('json')
+    if raw_path:
+        await engine.complete_stream(prompt, content, raw_path, model_name=models, on_delta=parser.feed)
+    else:
+        parser.feed(await engine.complete(prompt, content, model_name=models))
+    try:
+        result = parser.finish()
+    except JSONRepairError:
+        engine.discard_cached(prompt, content, model_name=models)
+        raise
+    for issue in result.issues:
+        print(f"   ⚠️ JSON已修复: {issue}")
+    return result
+
+
+async def _request_part(engine, prompt, content, label, field=None, allow_empty=False):
+    """
+    请求文章的一部分（一个章节、一个片段等），JSON不完整或缺少field列表时重试这一部分
+
+    Returns:
+        dict: 解析后的JSON
+    """
+    for attempt in range(SECTION_RETRIES + 1):
+        try:
+            result = await _request_json(engine, prompt, content)
+            value = result.value.get(field) if field else result.value
+            if not result.complete or (field and (not isinstance(value, list) or not (value or allow_empty))):
+                raise JSONRepairError(f"{label}的JSON不完整" + (f"或缺少 {field}" if field else ''), result.line, result.column)
+        except Exception as e:
+            engine.discard_cached(prompt, content, model_name=engine.models_for('json'))
+            if attempt == SECTION_RETRIES:
+                print(f"❌ {label}提取失败: {e}")
+                raise
+            print(f"   ⚠️ {label}提取失败（{e}），重试第 {attempt + 1} 次...")
+            engine.metrics.record_retry()
+            continue
+        print(f"   - {label}完成")
+        return result.value
+
+
+async def verbatim_to_json(engine, verbatim, prompts, raw_path=None):
+    """
+    一次调用把整篇逐字稿转成JSON
+
+    模型输出用容错解析器解析；若输出在 main_sections 中途被截断，
+    保留已完整的章节，只请求剩余的章节再合并
+    """
+    prompt = prompts['verbatim_to_json']['content']
+    template = prompts['verbatim_to_json_continue']['content']
+
+    data = None
+    sections = []
+    content = verbatim
+    for attempt in range(MAX_JSON_CONTINUATIONS + 1):
+        result = await _request_json(engine, prompt, content, raw_path if attempt == 0 else None)
+        if data is None:
+            data = result.value
+        received = result.value.get('main_sections')
+        if result.complete:
+            if attempt and isinstance(received, list):
+                data['main_sections'] = sections + received
+            return data
+
+        location = f"第{result.line}行第{result.column}列（{format_path(result.truncated_path) or '顶层'}）"
+        completed = _completed_sections(result)
+        if completed is None:
+            # 不保留无法补全的结果，下次运行重新请求
+            engine.discard_cached(prompt, content, model_name=engine.models_for('json'))
+            raise JSONRepairError(f"模型输出的JSON在{location}处被截断，无法只补全剩余章节")
+        sections += received[:completed]
+        print(f"   ⚠️ 模型输出的JSON在{location}处被截断，保留 {len(sections)} 个完整章节，重新请求剩余章节...")
+        engine.metrics.record_retry()
+        content = _continuation_content(template, verbatim, sections)
+    raise JSONRepairError(f"重新请求 {MAX_JSON_CONTINUATIONS} 次后JSON仍不完整")
+
+
+def split_paragraphs(verbatim):
+    """把逐字稿按行切成段落（忽略空行）"""
+    return [line.strip() for line in verbatim.splitlines() if line.strip()]
+
+
+def section_ranges(sections, paragraph_count):
+    """
+    根据大纲中每个章节的起始段落编号（从1开始），计算各章节覆盖的段落区间
+
+    Returns:
+        list[tuple[int, int]]: 每个章节的 [start, end) 段落下标
+    """
+    starts = []
+    for index, section in enumerate(sections):
+        try:
+            start = int(section.get('start_paragraph')) - 1
+        except (TypeError, ValueError):
+            raise ValueError(f"大纲中第{index + 1}个章节缺少有效的 start_paragraph")
+        start = 0 if index == 0 else min(max(start, 0), paragraph_count - 1)
+        if starts and start <= starts[-1]:
+            raise ValueError(f"大纲中第{index + 1}个章节的起始段落 {start + 1} 不在上一章节之后")
+        starts.append(start)
+    return list(zip(starts, starts[1:] + [paragraph_count]))
+
+
+async def verbatim_to_json_by_section(engine, verbatim, prompts):
+    """
+    按章节并发把逐字稿转成JSON
+
+    先用一次输出很短的调用生成章节大纲（嘉宾信息、主题和每个章节的起始段落、小标题），
+    再按大纲切分逐字稿并发提取每个章节的问答，最后在本地按大纲顺序合并。
+    某个章节失败时只重试这个章节
+    """
+    paragraphs = split_paragraphs(verbatim)
+    numbered = '\n'.join(f"[{index + 1}] {paragraph}" for index, paragraph in enumerate(paragraphs))
+    outline_result = await _request_json(engine, prompts['verbatim_outline']['content'], numbered)
+    if not outline_result.complete:
+        engine.discard_cached(prompts['verbatim_outline']['content'], numbered, model_name=engine.models_for('json'))
+        raise JSONRepairError("章节大纲被截断", outline_result.line, outline_result.column)
+    outline = outline_result.value
+    sections = outline.get('main_sections')
+    if not isinstance(sections, list) or not sections:
+        engine.discard_cached(prompts['verbatim_outline']['content'], numbered, model_name=engine.models_for('json'))
+        raise JSONRepairError("章节大纲中没有 main_sections")
+    ranges = section_ranges(sections, len(paragraphs))
+    print(f"   - 章节大纲: {len(sections)} 个章节，共 {len(paragraphs)} 段")
+
+    prompt = prompts['verbatim_section']['content']
+    template = prompts['verbatim_section_content']['content']
+
+    async def extract(index, section, start, end):
+        label = f"章节 {index + 1}/{len(sections)}「{section.get('title', '')}」"
+        content = (
+            template
+            .replace('{title}', str(section.get('title', '')))
+            .replace('{subtitles}', '\n'.join(f"- {subtitle}" for subtitle in section.get('subtitles', [])) or '（无）')
+            .replace('{body}', '\n'.join(paragraphs[start:end]))
+        )
+        value = await _request_part(engine, prompt, content, label, 'sub_sections')
+        return {
+            'id': str(section.get('id') or f'{index + 1:02d}'),
+            'title': section.get('title', ''),
+            'sub_sections': value['sub_sections']
+        }
+
+    main_sections = await asyncio.gather(*(
+        extract(index, section, start, end)
+        for index, (section, (start, end)) in enumerate(zip(sections, ranges))
+    ))
+
+    data = {key: value for key, value in outline.items() if key != 'main_sections'}
+    data['main_sections'] = main_sections
+    return data
+
+
+async def step2_verbatim_to_json(engine, verbatim, prompts, by_section=False, stream=False, output_dir=None):
+    """
+    步骤2: 逐字稿转JSON
+    by_section为True时按章节并发提取；否则一次调用完成，stream为True时边生成边写入原始输出并解析
+    """
+    print("🎯 步骤2: 逐字稿转JSON...")
+
+    try:
+        if by_section:
+            data = await verbatim_to_json_by_section(engine, verbatim, prompts)
+        else:
+            raw_path = output_path_for('interview_data_raw.txt', output_dir) if stream else None
+            data = await verbatim_to_json(engine, verbatim, prompts, raw_path)
+    except ValueError as e:
+        print(f"❌ JSON解析失败: {e}")
+        raise
+    return await _save_json(data, output_dir)
+
+
+async def _save_json(data, output_dir=None):
+    """
+    在本地计算字数和阅读时间（不使用模型输出的数字），校验并规整后保存JSON
+    数据不符合要求时立即抛出 InterviewDataError，不会等到渲染时才失败
+
+    Returns:
+        tuple: (规整后的data, json_path)
+    """
+    stats = article_stats.apply_stats(data)
+    print(f"   - 本地统计: {stats['word_count']} 字，预计阅读 {stats['reading_time']} 分钟")
+    try:
+        data = interview_model.normalize(data)
+    except interview_model.InterviewDataError as e:
+        print(f"❌ JSON数据不完整: {e}")
+        raise
+
+    json_path = output_path_for('interview_data.json', output_dir)
+    await asyncio.to_thread(_write_text, json_path, json.dumps(data, ensure_ascii=False, indent=2))
+
+    print(f"✅ JSON数据已保存: {json_path}")
+    return data, json_path
+
+
+class SectionAssembler:
+    """
+    按片段顺序合并各片段提取出的章节
+
+    片段可能乱序完成，这里按片段编号依次处理：重新编号章节，把被片段边界切开的章节
+    （下一片段第一个章节标题为空或与上一章节相同）合并回上一章节。每个片段的最后一个章节要等
+    下一个片段到达后才能确定，确定的章节立即交给 renderer 预渲染
+    """
+
+    def __init__(self, renderer=None):
+        self.renderer = renderer
+        self.pending = {}
+        self.next_index = 0
+        self.sections = []
+        self.open_section = None
+        self.guest_name = ''
+
+    def add(self, index, value):
+        """加入第index个片段的提取结果"""
+        self.pending[index] = value
+        while self.next_index in self.pending:
+            value = self.pending.pop(self.next_index)
+            self.next_index += 1
+            self.guest_name = self.guest_name or value.get('guest_name') or ''
+            for section in value.get('main_sections') or []:
+                title = section.get('title') or ''
+                sub_sections = list(section.get('sub_sections') or [])
+                if self.open_section and title in ('', self.open_section['title']):
+                    self.open_section['sub_sections'].extend(sub_sections)
+                    continue
+                self._close_section()
+                self.open_section = {'id': f'{len(self.sections) + 1:02d}', 'title': title, 'sub_sections': sub_sections}
+
+    def _close_section(self):
+        if self.open_section is None:
+            return
+        self.sections.append(self.open_section)
+        if self.renderer is not None and self.guest_name:
+            self.renderer.prerender_section(self.open_section, self.guest_name, len(self.sections) - 1)
+        self.open_section = None
+
+    def finish(self):
+        """所有片段处理完后调用，返回合并后的章节列表"""
+        self._close_section()
+        return self.sections
+
+
+async def _wait_all(tasks, until=None):
+    """
+    等待一组任务全部完成（或 until 完成），任何一个任务出错时立即抛出它的异常，
+    由调用方取消其余任务
+    """
+    pending = set(tasks)
+    while pending and not (until is not None and until.done()):
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+
+
+async def verbatim_to_json_by_segment(engine, prompts, produce, output_dir=None, renderer=None):
+    """
+    按逐字稿片段并发提取JSON，可与逐字稿的生成重叠执行
+
+    produce(on_segment) 负责生成逐字稿并返回全文，每生成完一个片段就调用 on_segment(index, text)。
+    片段放入队列，max_concurrency 个worker并发把每个片段整理成章节，按顺序合并后立即交给
+    renderer 预渲染；逐字稿完成后再用一次输出很短的调用提取嘉宾信息和主题
+
+    Returns:
+        tuple: (data, json_path)
+    """
+    queue = asyncio.Queue()
+    assembler = SectionAssembler(renderer)
+    prompt = prompts['verbatim_segment']['content']
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            index, text = item
+            assembler.add(index, await _request_part(engine, prompt, text, f"逐字稿片段 {index + 1} ", 'main_sections', True))
+
+    with engine.metrics.stage('json'):
+        workers = [asyncio.create_task(worker()) for _ in range(engine.config['max_concurrency'])]
+        producer = asyncio.create_task(produce(lambda index, text: queue.put_nowait((index, text))))
+        tasks = [producer, *workers]
+        try:
+            # 逐字稿生成期间某个片段提取失败时立即停止，不必等到逐字稿全部生成完
+            await _wait_all(tasks, until=producer)
+            verbatim = producer.result()
+            print("   - 逐字稿已全部切分，等待剩余片段和文章信息...")
+            for _ in workers:
+                queue.put_nowait(None)
+            header_task = asyncio.create_task(
+                _request_part(engine, prompts['verbatim_header']['content'], verbatim, "文章信息")
+            )
+            tasks.append(header_task)
+            await _wait_all([header_task, *workers])
+            header = header_task.result()
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        main_sections = assembler.finish()
+        if not main_sections:
+            raise JSONRepairError("没有从逐字稿中提取到任何章节")
+        print(f"   - 共 {assembler.next_index} 个片段，合并为 {len(main_sections)} 个章节")
+        data = {key: header.get(key, '') for key in ('guest_name', 'guest_intro', 'interviewer', 'proofreader')}
+        data['guest_name'] = data['guest_name'] or assembler.guest_name
+        data['topics'] = header.get('topics') or []
+        data['main_sections'] = main_sections
+        data, json_path = await _save_json(data, output_dir)
+    return data, json_path
+
+
+def _render_html(data, html_path, renderer=None):
+    """有预渲染好的章节或上一次的片段索引时增量渲染，否则直接边生成边写入（不保存片段，内存峰值最低）"""
+    if renderer is not None and (
+        renderer.fragments or os.path.exists(incremental_render.fragment_index_path(html_path))
+    ):
+        renderer.write(data, html_path)
+        print(f"   - 增量渲染: {renderer.summary()}")
+        return
+    with open(html_path, 'w', encoding='utf-8') as f:
+        render_to(data, f)
+    record_file_written(html_path)
+
+
+def _export_formats(data, html_path, formats, output_dir=None):
+    targets = {'html': html_path}
+    targets.update((name, output_path_for(article_export.FORMATS[name][1], output_dir)) for name in formats if name != 'html')
+    written = article_export.export_article(data, targets)
+    for name, path in targets.items():
+        if name != 'html':
+            print(f"   - {name}: {path}（{written[name]:,} 字符）")
+
+
+async def step3_json_to_html(data, output_dir=None, renderer=None, export_formats=()):
+    """
+    步骤3: JSON转HTML（渲染在线程中执行，不阻塞事件循环）
+    renderer为 IncrementalRenderer 且有预渲染的章节或上一次的片段索引时，复用数据没有变化的章节，
+    只重新渲染改动过的章节，否则直接用 render_to 写入；
+    export_formats 不为空时改为一次遍历同时导出HTML和这些格式（见 article_export.py）
+    """
+    print("🎯 步骤3: JSON转HTML...")
+
+    html_path = output_path_for('interview_article.html', output_dir)
+    if export_formats:
+        await asyncio.to_thread(_export_formats, data, html_path, export_formats, output_dir)
+    else:
+        await asyncio.to_thread(_render_html, data, html_path, renderer)
+
+    print(f"✅ HTML文章已生成: {html_path}")
+    return html_path
+
+
+def preflight_check(txt_path, prompt, config):
+    """
+    发送前估算步骤1单次调用需要的token数（输入加上与录音稿大致等长的输出）
+
+    超过 context_tokens 时：auto_chunk 开启则返回True（切换为分块模式），否则只打印警告并返回False
+    """
+    context_tokens = config.get('context_tokens') or 0
+    if not context_tokens:
+        return False
+    with open(txt_path, 'r', encoding='utf-8') as f:
+        transcript_tokens = estimate_tokens(f.read())
+    needed = estimate_tokens(prompt) + transcript_tokens * 2
+    if needed <= context_tokens:
+        return False
+    message = f"⚠️ 录音稿约 {transcript_tokens:,} tokens，单次转写预计需要约 {needed:,} tokens，超过模型上下文窗口 {context_tokens:,}"
+    if config.get('auto_chunk'):
+        print(f"{message}，自动切换为分块模式")
+        return True
+    print(f"{message}，建议加上 --chunked")
+    return False
+
+
+def _resolve_stage(manifest, stage, inputs_hash, from_stage, output_path, copy=True):
+    """
+    判断阶段是复用上次输出还是重新执行
+    输入未变化、但这次的输出路径与上次不同（换了 --output-dir）时，把上次的输出复制到新路径后复用；
+    copy为False时（输出不止一个文件）重新执行
+    """
+    if from_stage:
+        if STAGES.index(stage) >= STAGES.index(from_stage):
+            return 'run'
+        output_path = manifest.output_path(stage)
+        if not output_path or not os.path.exists(output_path):
+            raise FileNotFoundError(f"阶段 {stage} 没有可复用的输出，请从更早的阶段开始执行")
+        manifest.accept_output(stage)
+        return 'reuse'
+    if not manifest.is_fresh(stage, inputs_hash):
+        return 'run'
+    previous_path = manifest.output_path(stage)
+    if os.path.abspath(previous_path) == os.path.abspath(output_path):
+        return 'reuse'
+    if not copy:
+        return 'run'
+    shutil.copyfile(previous_path, output_path)
+    record_file_written(output_path)
+    manifest.record(stage, inputs_hash, output_path)
+    print(f"📋 阶段 {stage} 的输入未变化，复制上次的输出 {previous_path} -> {output_path}")
+    return 'reuse'
+
+
+async def run_pipeline(engine, txt_path, prompts, chunked=False, stream=False, by_section=False, clean=False,
+                       local_only=False, from_stage=None, to_stage=None, output_dir=None, overlap=False):
+    """
+    按阶段执行pipeline，并在录音稿旁的检查点文件中记录每个阶段的输入和输出
+
+    输入未变化且输出完好的阶段直接复用上次结果；from_stage之前的阶段总是复用已有输出，
+    from_stage及之后的阶段强制重新执行，执行到to_stage为止。
+    overlap为True时步骤2按逐字稿片段并发提取（见 verbatim_to_json_by_segment），步骤1也需要执行时
+    三个步骤重叠执行：逐字稿边生成边提取，提取出的章节立即预渲染
+
+    Returns:
+        dict: 各阶段的输出路径、解析后的JSON数据（未执行到该阶段时为None），
+              以及各阶段耗时 timings（复用的阶段记为None）
+    """
+    config = engine.config
+    manifest = StageManifest(manifest_path_for(txt_path))
+    start_index = STAGES.index(from_stage) if from_stage else 0
+    end_index = STAGES.index(to_stage) if to_stage else len(STAGES) - 1
+    if start_index > end_index:
+        raise ValueError(f"起始阶段 {from_stage} 晚于结束阶段 {to_stage}")
+    # 导出格式有误时在调用模型之前就报错
+    export_formats = article_export.parse_formats(','.join(config.get('export_formats') or []))
+    result = {'verbatim_path': None, 'json_path': None, 'html_path': None, 'data': None, 'timings': {}}
+    # 只用于本次运行（重叠执行时预渲染章节），渲染完不在内存中保留片段
+    renderer = incremental_render.IncrementalRenderer(keep_fragments=False)
+
+    # 步骤1: 录音稿转逐字稿（发送前先估算token数，放不进上下文窗口时切换为分块模式）
+    if start_index == 0 and not chunked and not local_only:
+        chunked = preflight_check(txt_path, prompts['transcript_to_verbatim']['content'], config)
+    inputs_hash = hash_text(
+        hash_file(txt_path),
+        prompts['transcript_to_verbatim']['content'],
+        ','.join(engine.models_for('verbatim')),
+        chunked and (prompts['transcript_chunk']['content'], config['chunk_tokens'], config['chunk_overlap']),
+        clean and (hash_file(transcript_cleaner.__file__), hash_file(config.get('filler_lexicon') or '')),
+        local_only
+    )
+    if _resolve_stage(manifest, 'verbatim', inputs_hash, from_stage, verbatim_path_for(txt_path, output_dir)) == 'reuse':
+        verbatim_path = manifest.output_path('verbatim')
+        with open(verbatim_path, 'r', encoding='utf-8') as f:
+            verbatim = f.read()
+        print(f"⏭️ 步骤1: 复用已有逐字稿 {verbatim_path}")
+        result['timings']['verbatim'] = None
+    elif overlap and end_index >= STAGES.index('json'):
+        print("🔀 步骤1~3重叠执行：逐字稿每生成一个片段就开始提取JSON")
+        started = time.perf_counter()
+        produced = {}
+
+        async def produce(on_segment):
+            with engine.metrics.stage('verbatim'):
+                produced['verbatim'], produced['path'] = await step1_transcript_to_verbatim(
+                    engine, txt_path, prompts, chunked=chunked, stream=True, clean=clean, local_only=local_only,
+                    output_dir=output_dir, on_segment=on_segment
+                )
+            return produced['verbatim']
+
+        data, json_path = await verbatim_to_json_by_segment(engine, prompts, produce, output_dir, renderer)
+        verbatim, verbatim_path = produced['verbatim'], produced['path']
+        manifest.record('verbatim', inputs_hash, verbatim_path)
+        # 重叠执行时两个阶段同时结束，耗时都记为从开始到JSON保存的总时长
+        result['timings']['verbatim'] = result['timings']['json'] = time.perf_counter() - started
+    else:
+        started = time.perf_counter()
+        with engine.metrics.stage('verbatim'):
+            verbatim, verbatim_path = await step1_transcript_to_verbatim(
+                engine, txt_path, prompts, chunked=chunked, stream=stream, clean=clean, local_only=local_only,
+                output_dir=output_dir
+            )
+        manifest.record('verbatim', inputs_hash, verbatim_path)
+        result['timings']['verbatim'] = time.perf_counter() - started
+    result['verbatim_path'] = verbatim_path
+    if end_index < STAGES.index('json'):
+        return result
+
+    # 步骤2: 逐字稿转JSON
+    if overlap:
+        json_prompts = [prompts[name]['content'] for name in ('verbatim_segment', 'verbatim_header')]
+    elif by_section:
+        json_prompts = [prompts[name]['content'] for name in ('verbatim_outline', 'verbatim_section', 'verbatim_section_content')]
+    else:
+        json_prompts = [prompts[name]['content'] for name in ('verbatim_to_json', 'verbatim_to_json_continue')]
+    inputs_hash = hash_text(hash_file(verbatim_path), *json_prompts, ','.join(engine.models_for('json')))
+    if 'json' in result['timings']:
+        manifest.record('json', inputs_hash, json_path)
+    elif _resolve_stage(manifest, 'json', inputs_hash, from_stage,
+                        output_path_for('interview_data.json', output_dir)) == 'reuse':
+        json_path = manifest.output_path('json')
+        data = load_json_file(json_path)
+        article_stats.apply_stats(data)
+        data = interview_model.normalize(data)
+        print(f"⏭️ 步骤2: 复用已有JSON数据 {json_path}")
+        result['timings']['json'] = None
+    elif overlap:
+        print("🎯 步骤2: 逐字稿转JSON（按片段并发提取）...")
+        started = time.perf_counter()
+
+        async def produce(on_segment):
+            segmenter = VerbatimSegmenter(on_segment, config['chunk_tokens'])
+            segmenter.feed(verbatim)
+            segmenter.finish()
+            return verbatim
+
+        data, json_path = await verbatim_to_json_by_segment(engine, prompts, produce, output_dir, renderer)
+        manifest.record('json', inputs_hash, json_path)
+        result['timings']['json'] = time.perf_counter() - started
+    else:
+        started = time.perf_counter()
+        with engine.metrics.stage('json'):
+            data, json_path = await step2_verbatim_to_json(
+                engine, verbatim, prompts, by_section=by_section, stream=stream, output_dir=output_dir
+            )
+        manifest.record('json', inputs_hash, json_path)
+        result['timings']['json'] = time.perf_counter() - started
+    result['json_path'] = json_path
+    result['data'] = data
+    if end_index < STAGES.index('html'):
+        return result
+
+    # 步骤3: JSON转HTML（生成器代码、模板或加粗短语表改动后也需要重新渲染）
+    inputs_hash = hash_text(
+        hash_file(json_path),
+        *(hash_file(module.__file__) for module in RENDERER_MODULES),
+        os.getenv('EMPHASIS_GLOSSARY') and hash_file(os.getenv('EMPHASIS_GLOSSARY')),
+        export_formats and (','.join(export_formats), hash_file(article_export.__file__))
+    )
+    # 同时导出的其他格式也写在输出目录中，换了输出目录时重新渲染而不是只复制HTML
+    html_path = output_path_for('interview_article.html', output_dir)
+    if _resolve_stage(manifest, 'html', inputs_hash, from_stage, html_path, copy=False) == 'reuse':
+        html_path = manifest.output_path('html')
+        print(f"⏭️ 步骤3: 复用已有HTML文章 {html_path}")
+        result['timings']['html'] = None
+    else:
+        started = time.perf_counter()
+        with engine.metrics.stage('html'):
+            html_path = await step3_json_to_html(
+                data, output_dir=output_dir, renderer=renderer, export_formats=export_formats
+            )
+        manifest.record('html', inputs_hash, html_path)
+        result['timings']['html'] = time.perf_counter() - started
+    result['html_path'] = html_path
+
+    # 存入文章库（内容没有变化时不会重复写入）
+    if config.get('archive_db'):
+        import archive
+        slug, status = await asyncio.to_thread(archive.ingest_run, config['archive_db'], txt_path, verbatim, data, html_path)
+        print(f"🗄️ 文章库 {config['archive_db']}: {slug}（{ARCHIVE_STATUS[status]}）")
+    return result
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+批量处理录音稿
+并行处理一个目录（或glob匹配）下的所有录音稿，每个录音稿输出到独立目录，并汇总执行报告
+所有录音稿共用一个异步引擎（同一个连接池和并发上限）
+"""
+
+import os
+import sys
+import glob
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+from pipeline import load_config, load_prompts
+from async_pipeline import LLMEngine, run_pipeline
+from llm_cache import open_cache
+from checkpoint import STAGES
+from metrics import PipelineMetrics
+
+
+def collect_inputs(target):
+    """收集待处理的录音稿：目录下的所有txt文件，或glob匹配到的txt文件（逐字稿和其他类型的文件都跳过）"""
+    if os.path.isdir(target):
+        paths = glob.glob(os.path.join(target, '*.txt'))
+    else:
+        paths = glob.glob(target)
+    return sorted(p for p in paths if p.endswith('.txt') and not p.endswith('_verbatim.txt') and os.path.isfile(p))
+
+
+def find_duplicate_stems(paths):
+    """
+    文件名（不含扩展名）相同的录音稿会写到同一个输出目录、存成同一篇文章
+
+    Returns:
+        dict: {文件名: [路径, ...]}，没有重复时为空
+    """
+    by_stem = {}
+    for path in paths:
+        by_stem.setdefault(Path(path).stem, []).append(path)
+    return {stem: group for stem, group in by_stem.items() if len(group) > 1}
+
+
+async def process_one(engine, txt_path, output_root, prompts, options):
+    """处理单个录音稿，返回执行记录（失败时记录错误而不中断整个批次）"""
+    record = {'path': txt_path, 'status': 'ok', 'error': None, 'timings': {}, 'elapsed': 0.0}
+    started = time.perf_counter()
+    try:
+        result = await run_pipeline(
+            engine, txt_path, prompts,
+            chunked=options.chunked,
+            by_section=options.by_section,
+            overlap=options.overlap,
+            clean=options.clean,
+            local_only=options.local_only,
+            from_stage=options.from_stage,
+            to_stage=options.to_stage,
+            output_dir=os.path.join(output_root, Path(txt_path).stem)
+        )
+        record['timings'] = result['timings']
+    except Exception as e:
+        record['status'] = 'failed'
+        record['error'] = str(e)
+        print(f"❌ {txt_path} 处理失败: {e}")
+    record['elapsed'] = time.perf_counter() - started
+    return record
+
+
+def _format_seconds(value):
+    return '复用' if value is None else f'{value:.1f}s'
+
+
+def print_report(records, elapsed):
+    """打印批量执行报告：每个文件的状态、各阶段耗时和整体吞吐量"""
+    print("\n📊 批量处理报告:")
+    header = f"   {'状态':<4} {'文件':<36}" + ''.join(f"{stage:>10}" for stage in STAGES) + f"{'总计':>10}"
+    print(header)
+    for record in records:
+        status = '✅' if record['status'] == 'ok' else '❌'
+        stages = ''.join(
+            f"{_format_seconds(record['timings'][stage]) if stage in record['timings'] else '-':>10}"
+            for stage in STAGES
+        )
+        print(f"   {status:<4} {os.path.basename(record['path']):<36}{stages}{record['elapsed']:>9.1f}s")
+        if record['error']:
+            print(f"        错误: {record['error']}")
+
+    succeeded = sum(1 for record in records if record['status'] == 'ok')
+    print(f"\n   - 成功: {succeeded}/{len(records)}")
+    for stage in STAGES:
+        durations = [r['timings'][stage] for r in records if r['timings'].get(stage) is not None]
+        if durations:
+            print(f"   - {stage} 平均耗时: {sum(durations) / len(durations):.1f}s（执行 {len(durations)} 次）")
+    print(f"   - 总耗时: {elapsed:.1f}s")
+    if elapsed > 0:
+        print(f"   - 吞吐量: {succeeded / elapsed * 3600:.1f} 篇/小时")
+
+
+async def run_batch(inputs, config, prompts, cache, options, workers, max_requests, metrics=None):
+    """在一个事件循环中并行处理所有录音稿，返回执行记录列表（各阶段指标汇总到metrics）"""
+    slots = asyncio.Semaphore(workers)
+
+    async def worker(engine, txt_path):
+        async with slots:
+            return await process_one(engine, txt_path, options.output_dir, prompts, options)
+
+    async with LLMEngine(config, cache=cache, max_concurrency=max_requests, metrics=metrics) as engine:
+        return await asyncio.gather(*(worker(engine, path) for path in inputs))
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="批量处理录音稿")
+    parser.add_argument('target', help="录音稿所在目录，或glob模式（如 'interviews/*.txt'）")
+    parser.add_argument('--output-dir', default='output', help="输出根目录，每个录音稿写入 <输出根目录>/<文件名>/")
+    parser.add_argument('--workers', type=int, help="同时处理的录音稿数量（默认读取MAX_CONCURRENCY）")
+    parser.add_argument('--max-llm-requests', type=int, help="所有录音稿合计的最大并发LLM请求数（默认读取MAX_CONCURRENCY）")
+    parser.add_argument('--chunked', action='store_true', help="分块并发转写长录音稿")
+    parser.add_argument('--by-section', action='store_true', help="按章节并发提取JSON：先生成章节大纲，再并发提取各章节")
+    parser.add_argument('--overlap', action='store_true', help="三个步骤重叠执行：逐字稿边生成边切成片段并发提取JSON，章节提取完立即渲染")
+    parser.add_argument('--clean', action='store_true', help="调用模型前先在本地预清洗录音稿（删除语气词、合并重复、统一发言人标记）")
+    parser.add_argument('--local-only', action='store_true', help="录音稿已经很干净时使用：直接把录音稿（加 --clean 时为预清洗后的）作为逐字稿，不调用模型")
+    parser.add_argument('--no-cache', action='store_true', help="不读取也不写入本地LLM缓存")
+    parser.add_argument('--refresh', action='store_true', help="忽略已有缓存重新请求，并更新缓存")
+    parser.add_argument('--from-stage', choices=STAGES, help="从指定阶段开始强制重新执行")
+    parser.add_argument('--to-stage', choices=STAGES, help="执行完指定阶段后停止")
+    parser.add_argument('--metrics-out', help="运行指标输出文件：.prom 为Prometheus文本格式，其他扩展名为JSON Lines（追加写入）")
+    return parser.parse_args()
+
+
+def main():
+    """主函数"""
+    args = parse_args()
+    inputs = collect_inputs(args.target)
+    if not inputs:
+        print(f"❌ 没有找到录音稿: {args.target}")
+        sys.exit(1)
+    duplicates = find_duplicate_stems(inputs)
+    if duplicates:
+        print("❌ 以下录音稿文件名相同，会写到同一个输出目录，请重命名后再处理:")
+        for group in duplicates.values():
+            print(f"   - {', '.join(group)}")
+        sys.exit(1)
+
+    config = load_config()
+    prompts = load_prompts()
+    workers = args.workers or config['max_concurrency']
+    max_requests = args.max_llm_requests or config['max_concurrency']
+    cache = open_cache(config, no_cache=args.no_cache, refresh=args.refresh)
+
+    print(f"🚀 批量处理 {len(inputs)} 个录音稿，并行 {workers} 个，最大并发LLM请求 {max_requests}")
+    started = time.perf_counter()
+    metrics = PipelineMetrics()
+    records = asyncio.run(run_batch(inputs, config, prompts, cache, args, workers, max_requests, metrics))
+    print_report(records, time.perf_counter() - started)
+    metrics.print_summary()
+    if args.metrics_out:
+        metrics.write(args.metrics_out, source=args.target, model=config['model_name'] or '')
+        print(f"   - 指标已写入: {args.metrics_out}")
+
+    if cache is not None:
+        cache.evict()
+        print(f"   - LLM缓存: {cache.summary()}")
+    if any(record['status'] != 'ok' for record in records):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+关键短语加粗基准测试
+在大规模短语表下，对比逐个短语 str.replace 的原始做法与 Aho–Corasick 单次扫描的耗时
+
+用法: python benchmarks/bench_emphasis.py [--phrases 5000] [--scale 20]
+"""
+
+import os
+import sys
+import time
+import re
+import random
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from emphasis import EmphasisMatcher
+from benchmarks.bench_render import load_example_data
+
+BOLD = '<span textstyle="" style="font-weight: bold;">{}</span>'
+NESTED_PATTERN = re.compile(r'font-weight: bold;">[^<]*<span')
+
+
+def legacy_emphasis(text, patterns):
+    """原始实现：逐个短语检查并对整段调用 str.replace"""
+    for pattern in patterns:
+        if pattern in text and BOLD.format(pattern) not in text:
+            text = text.replace(pattern, BOLD.format(pattern))
+    return text
+
+
+def build_glossary(paragraphs, count, seed=0):
+    """从正文中随机截取短语，再混入不会出现的随机短语，组成指定规模的短语表"""
+    rng = random.Random(seed)
+    phrases = set()
+    while len(phrases) < count:
+        if rng.random() < 0.5:
+            para = rng.choice(paragraphs)
+            length = rng.randint(2, 8)
+            if len(para) > length:
+                start = rng.randrange(len(para) - length)
+                phrases.add(para[start:start + length])
+        else:
+            phrases.add(''.join(chr(rng.randint(0x4e00, 0x9fff)) for _ in range(rng.randint(2, 6))))
+    return sorted(phrases)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="关键短语加粗基准测试")
+    parser.add_argument('--data', default=os.path.join(ROOT, 'data_example.json'))
+    parser.add_argument('--phrases', type=int, default=5000, help="短语表规模")
+    parser.add_argument('--scale', type=int, default=20, help="段落放大倍数")
+    args = parser.parse_args()
+
+    data = load_example_data(args.data)
+    paragraphs = [
+        para
+        for section in data['main_sections']
+        for sub_section in section['sub_sections']
+        for para in sub_section['answer'].split('\n')
+    ] * args.scale
+    glossary = build_glossary(paragraphs, args.phrases)
+    print(f"📋 {len(paragraphs)} 个段落，共 {sum(map(len, paragraphs)):,} 字；短语表 {len(glossary)} 条")
+
+    started = time.perf_counter()
+    matcher = EmphasisMatcher(glossary)
+    build_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    fast = [matcher.apply(para, BOLD.format) for para in paragraphs]
+    fast_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    legacy = [legacy_emphasis(para, glossary) for para in paragraphs]
+    legacy_time = time.perf_counter() - started
+
+    # 加粗区间内又出现 <span 即为嵌套加粗
+    nested = sum(1 for output in fast if NESTED_PATTERN.search(output))
+    legacy_nested = sum(1 for output in legacy if NESTED_PATTERN.search(output))
+    print(f"   - 原始实现: {legacy_time * 1000:.1f} ms")
+    print(f"   - 自动机: 构建 {build_time * 1000:.1f} ms，匹配 {fast_time * 1000:.1f} ms")
+    print(f"   - 加速比（含构建）: {legacy_time / (build_time + fast_time):.1f}x")
+    print(f"   - 嵌套加粗的段落数: 原始实现 {legacy_nested}，自动机 {nested}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+多格式导出基准测试
+在放大后的 data_example.json 上对比：只渲染HTML、每种格式各遍历一次、一次遍历同时生成全部格式（export_article）。
+HTML和Markdown都要加粗关键短语，一次遍历时每段只匹配一次短语表
+
+用法: python benchmarks/bench_export.py [--scale 100] [--repeat 5] [--phrases 2000]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import tolerant_json
+import interview_model
+from generate_article import walk_article, set_emphasis_patterns
+from article_export import FORMATS, export_article, default_paths
+from benchmarks.bench_emphasis import build_glossary
+
+
+def scale_data(data, scale):
+    """把章节重复scale次，模拟长篇文章"""
+    scaled = dict(data)
+    scaled['main_sections'] = data['main_sections'] * scale
+    return scaled
+
+
+def best_of(run, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def render_separately(interview, formats):
+    """每种格式单独遍历一次"""
+    outputs = {}
+    for name in formats:
+        sink = FORMATS[name][0]()
+        for _ in walk_article(interview, [sink]):
+            pass
+        outputs[name] = ''.join(sink.out)
+    return outputs
+
+
+def render_together(interview, formats):
+    """一次遍历同时生成所有格式"""
+    sinks = {name: FORMATS[name][0]() for name in formats}
+    for _ in walk_article(interview, list(sinks.values())):
+        pass
+    return {name: ''.join(sink.out) for name, sink in sinks.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多格式导出基准测试")
+    parser.add_argument('--data', default=os.path.join(ROOT, 'data_example.json'))
+    parser.add_argument('--scale', type=int, default=100, help="章节放大倍数")
+    parser.add_argument('--repeat', type=int, default=5, help="计时重复次数（取最短）")
+    parser.add_argument('--phrases', type=int, default=2000, help="加粗短语表规模（0表示不加粗）")
+    args = parser.parse_args()
+
+    example = tolerant_json.load_file(args.data)
+    interview = interview_model.Interview.from_dict(scale_data(example, args.scale))
+    paragraphs = [
+        para
+        for section in example['main_sections']
+        for sub_section in section['sub_sections']
+        for para in sub_section['answer'].split('\n')
+    ]
+    set_emphasis_patterns(build_glossary(paragraphs, args.phrases) if args.phrases else [])
+    formats = list(FORMATS)
+    qa_count = sum(len(section.sub_sections) for section in interview.main_sections)
+    print(f"📋 数据: {len(interview.main_sections)} 个章节，{qa_count} 组问答（放大 {args.scale} 倍）；"
+          f"短语表 {args.phrases} 条")
+
+    html_only = best_of(lambda: render_separately(interview, ['html']), args.repeat)
+    separately = best_of(lambda: render_separately(interview, formats), args.repeat)
+    together = best_of(lambda: render_together(interview, formats), args.repeat)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        targets = default_paths(formats, tmp_dir)
+        to_files = best_of(lambda: export_article(interview, targets), args.repeat)
+
+    print(f"   - 只渲染HTML: {html_only * 1000:.1f} ms")
+    print(f"   - 每种格式各遍历一次: {separately * 1000:.1f} ms")
+    print(f"   - 一次遍历全部格式: {together * 1000:.1f} ms（只渲染HTML的 {together / html_only:.2f} 倍）")
+    print(f"   - 一次遍历并写入 {len(formats)} 个文件: {to_files * 1000:.1f} ms")
+    same = render_separately(interview, formats) == render_together(interview, formats)
+    print(f"   - 两种方式输出一致: {'是' if same else '否'}")
+
+
+if __name__ == "__main__":
+    main()
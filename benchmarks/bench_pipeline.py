@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+端到端基准测试
+启动离线模型服务（mock_llm_server.py），在 1k ~ 1M 字的合成录音稿上依次计时
+step1_transcript_to_verbatim、step2_verbatim_to_json 和 generate_wechat_article_html，
+记录各阶段耗时、吞吐量（输入字符/秒）和内存峰值（RSS）。不需要网络和API Key。
+
+每个规模在单独的子进程中运行，内存峰值互不影响；模型服务运行在主进程中，不计入内存峰值。
+用 --output 保存结果，之后用 --baseline 对比，变慢超过 --threshold 时以非零状态退出。
+
+用法: python benchmarks/bench_pipeline.py [--sizes 1k,10k,100k,1M] [--chunked] [--by-section] [--stream]
+      [--latency 0] [--tps 0] [--repeat 3] [--output results.json] [--baseline results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+import contextlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.mock_llm_server import MockLLM, start_server, load_prompts
+
+STAGES = ('step1', 'step2', 'render')
+
+SPEAKERS = ('主持人', '嘉宾')
+
+FRAGMENTS = (
+    '我们当时做的是大模型的低比特量化', '其实最开始的时候并没有想到会有这么大的影响',
+    '训练过程中遇到了很多数值稳定性的问题', '后来我们把注意力层的归一化重新设计了一下',
+    '这个方向在学术界一开始并不被看好', '在消费级显卡上也可以跑起来',
+    '导师给了我很大的自由度', '本科的时候我主要是在打比赛', '科研的第一步是找到一个好问题',
+    '论文投出去之后被拒了两次', '开源之后社区的反馈非常积极', '推理框架的性能比我们预期的还要好',
+    'BitNet b1.58 用的是三值权重', '我们在 GPU 和 CPU 上都做了测试', '数据和算力同样重要',
+    '和工业界合作能接触到真实的问题', '读博期间最重要的是保持好奇心', '给学弟学妹的建议是多动手'
+)
+
+FILLERS = ('嗯，', '呃，', '那个，', '就是，', '然后，', '对吧，')
+
+
+def synthetic_transcript(chars, seed=0):
+    """
+    生成约chars个字符的合成录音稿
+    主持人和嘉宾交替发言，夹杂语气词、口头禅和口吃式的重复，与真实录音稿类似
+    """
+    rng = random.Random(seed)
+    lines = []
+    total = 0
+    turn = 0
+    while total < chars:
+        clauses = []
+        for _ in range(rng.randint(2, 8)):
+            clause = rng.choice(FRAGMENTS)
+            if rng.random() < 0.3:
+                clause = rng.choice(FILLERS) + clause
+            if rng.random() < 0.1:
+                clause = clause[:2] + clause[:2] + clause
+            clauses.append(clause)
+        line = f"{SPEAKERS[turn % 2]}：{'，'.join(clauses)}。"
+        lines.append(line)
+        total += len(line) + 1
+        turn += 1
+    return '\n'.join(lines)[:chars] + '\n'
+
+
+def parse_size(text):
+    """解析 1k / 10K / 1M / 5000 这样的规模"""
+    text = text.strip().lower()
+    for suffix, factor in (('k', 1000), ('m', 1000000)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * factor)
+    return int(text)
+
+
+def peak_rss_mb():
+    """当前进程到目前为止的内存峰值（MB），不支持的平台返回None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux单位为KB，macOS为字节
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+async def run_stages(config, prompts, txt_path, output_dir, chunked, by_section, stream):
+    """在当前进程中依次执行三个阶段，返回各阶段的耗时、输入字符数和内存峰值"""
+    import async_pipeline
+    from async_pipeline import LLMEngine
+    from generate_article import generate_wechat_article_html
+
+    results = {}
+    async with LLMEngine(config) as engine:
+        with open(txt_path, 'r', encoding='utf-8') as f:
+            transcript_chars = len(f.read())
+        started = time.perf_counter()
+        verbatim, _ = await async_pipeline.step1_transcript_to_verbatim(
+            engine, txt_path, prompts, chunked=chunked, stream=stream, output_dir=output_dir
+        )
+        results['step1'] = {'seconds': time.perf_counter() - started, 'chars': transcript_chars, 'rss_mb': peak_rss_mb()}
+
+        started = time.perf_counter()
+        data, _ = await async_pipeline.step2_verbatim_to_json(
+            engine, verbatim, prompts, by_section=by_section, stream=stream, output_dir=output_dir
+        )
+        results['step2'] = {'seconds': time.perf_counter() - started, 'chars': len(verbatim), 'rss_mb': peak_rss_mb()}
+
+    started = time.perf_counter()
+    html = generate_wechat_article_html(data)
+    results['render'] = {
+        'seconds': time.perf_counter() - started,
+        'chars': len(json.dumps(data, ensure_ascii=False)),
+        'rss_mb': peak_rss_mb(),
+        'output_chars': len(html)
+    }
+    results['llm_calls'] = engine.metrics.totals()['llm_calls']
+    return results
+
+
+def worker(args):
+    """子进程入口：执行一个规模并把结果以JSON输出到标准输出的最后一行"""
+    # 从环境变量读取其余配置（并发数、分块大小等），但模型服务固定为离线服务，并关闭客户端限流
+    os.environ.update({'API_KEY': 'mock', 'BASE_URL': args.base_url, 'MODEL_NAME': 'mock'})
+    import pipeline
+    config = pipeline.load_config()
+    config.update({
+        'models': {'verbatim': 'mock', 'json': 'mock'},
+        'rate_limit_rpm': 0,
+        'rate_limit_tpm': 0
+    })
+    # 各阶段的进度输出不计入结果
+    with contextlib.redirect_stdout(open(os.devnull, 'w', encoding='utf-8')):
+        results = asyncio.run(run_stages(
+            config, load_prompts(), args.transcript, args.output_dir, args.chunked, args.by_section, args.stream
+        ))
+    print(json.dumps(results))
+
+
+def run_size(chars, base_url, tmp_dir, args):
+    """在子进程中执行一个规模repeat次，各阶段取最短耗时和最大内存峰值"""
+    case_dir = os.path.join(tmp_dir, str(chars))
+    os.makedirs(case_dir, exist_ok=True)
+    txt_path = os.path.join(case_dir, 'transcript.txt')
+    with open(txt_path, 'w', encoding='utf-8') as f:
+        f.write(synthetic_transcript(chars, seed=args.seed))
+    command = [
+        sys.executable, os.path.abspath(__file__), '--worker',
+        '--transcript', txt_path, '--output-dir', case_dir, '--base-url', base_url
+    ]
+    command += [flag for flag, enabled in (
+        ('--chunked', args.chunked), ('--by-section', args.by_section), ('--stream', args.stream)
+    ) if enabled]
+    best = None
+    for _ in range(args.repeat):
+        completed = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, encoding='utf-8')
+        if completed.returncode != 0:
+            raise RuntimeError(f"规模 {chars} 运行失败:\n{completed.stderr.strip()}")
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        if best is None:
+            best = result
+            continue
+        for stage in STAGES:
+            best[stage]['seconds'] = min(best[stage]['seconds'], result[stage]['seconds'])
+            if result[stage]['rss_mb'] is not None:
+                best[stage]['rss_mb'] = max(best[stage]['rss_mb'], result[stage]['rss_mb'])
+    return best
+
+
+def format_row(label, stage):
+    rss = f"{stage['rss_mb']:.0f}MB" if stage['rss_mb'] is not None else 'N/A'
+    throughput = stage['chars'] / max(stage['seconds'], 1e-9)
+    return f"{label:>12}{stage['seconds'] * 1000:>12.1f}{throughput / 1000:>14.1f}{rss:>10}"
+
+
+def compare(results, baseline, threshold, min_seconds=0.05):
+    """与基准结果对比，返回变慢超过阈值的 (规模, 阶段, 比例) 列表（两次都短于min_seconds的阶段误差太大，不比较）"""
+    regressions = []
+    for size, stages in results['sizes'].items():
+        old_stages = baseline.get('sizes', {}).get(size)
+        if not old_stages:
+            continue
+        for stage in STAGES:
+            old, new = old_stages[stage]['seconds'], stages[stage]['seconds']
+            if max(old, new) < min_seconds:
+                continue
+            if old > 0 and new / old - 1 > threshold:
+                regressions.append((size, stage, new / old))
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="端到端基准测试（离线模型服务）")
+    parser.add_argument('--sizes', default='1k,10k,100k,1M', help="录音稿字符数，逗号分隔（支持k/M后缀）")
+    parser.add_argument('--chunked', action='store_true', help="步骤1使用分块模式")
+    parser.add_argument('--by-section', action='store_true', help="步骤2按章节并发提取")
+    parser.add_argument('--stream', action='store_true', help="使用流式输出")
+    parser.add_argument('--latency', type=float, default=0.0, help="模拟的首token延迟（秒）")
+    parser.add_argument('--tps', type=float, default=0.0, help="模拟的流式生成速度（tokens/s，0表示不限制）")
+    parser.add_argument('--seed', type=int, default=0, help="合成录音稿的随机种子")
+    parser.add_argument('--repeat', type=int, default=1, help="每个规模重复运行的次数（耗时取最短）")
+    parser.add_argument('--output', help="把结果写入JSON文件")
+    parser.add_argument('--baseline', help="与之前保存的结果对比")
+    parser.add_argument('--threshold', type=float, default=0.2, help="对比时允许变慢的比例（默认0.2）")
+    parser.add_argument('--min-seconds', type=float, default=0.05, help="两次都短于这个时长的阶段不参与对比")
+    # 子进程参数
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--transcript', help=argparse.SUPPRESS)
+    parser.add_argument('--output-dir', help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.worker:
+        worker(args)
+        return
+
+    sizes = [parse_size(size) for size in args.sizes.split(',') if size.strip()]
+    llm = MockLLM(load_prompts(), latency=args.latency, tokens_per_second=args.tps)
+    server, base_url = start_server(llm)
+    mode = ', '.join(name for name, enabled in (
+        ('分块', args.chunked), ('按章节', args.by_section), ('流式', args.stream)
+    ) if enabled) or '默认'
+    print(f"🚀 离线模型服务: {base_url}（模式: {mode}，延迟 {args.latency}s）")
+
+    results = {'mode': mode, 'latency': args.latency, 'tps': args.tps, 'sizes': {}}
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for chars in sizes:
+                result = run_size(chars, base_url, tmp_dir, args)
+                results['sizes'][str(chars)] = result
+                print(f"\n📋 {chars:,} 字（{result['llm_calls']} 次模型调用）")
+                print(f"{'阶段':>10}{'耗时(ms)':>10}{'吞吐(千字/s)':>10}{'内存峰值':>8}")
+                for stage in STAGES:
+                    print(format_row(stage, result[stage]))
+    finally:
+        server.shutdown()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n✅ 结果已保存: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_seconds)
+        if regressions:
+            print(f"\n❌ 以下阶段比基准慢了 {args.threshold:.0%} 以上:")
+            for size, stage, ratio in regressions:
+                print(f"   - {int(size):,} 字 {stage}: {ratio:.2f}x")
+            sys.exit(1)
+        print(f"\n✅ 与基准相比没有超过 {args.threshold:.0%} 的性能退化")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+HTML渲染基准测试
+对比原始实现、模板化渲染和流式写入（render_to）在放大后的 data_example.json 上的渲染耗时、内存峰值和输出大小
+
+用法: python benchmarks/bench_render.py [--scale 100] [--repeat 5]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import tolerant_json
+from generate_article import generate_wechat_article_html, render_to
+from benchmarks import legacy_generate_article
+
+
+def load_example_data(path):
+    """读取 data_example.json（含 # 注释和字符串内未转义的引号，用容错解析器读取）"""
+    return tolerant_json.load_file(path)
+
+
+def scale_data(data, scale):
+    """把章节重复scale次，模拟长篇文章"""
+    scaled = dict(data)
+    scaled['main_sections'] = data['main_sections'] * scale
+    return scaled
+
+
+def measure(render, data, repeat):
+    """返回 (最短耗时秒, 内存峰值字节, 输出)"""
+    best = float('inf')
+    output = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = render(data)
+        best = min(best, time.perf_counter() - started)
+        del output
+    tracemalloc.start()
+    output = render(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, output
+
+
+def render_to_file(path):
+    """返回把文章流式写入path的渲染函数（包含编码和写文件的耗时），渲染函数返回文件路径"""
+    def render(data):
+        with open(path, 'w', encoding='utf-8') as f:
+            render_to(data, f)
+        return path
+    return render
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML渲染基准测试")
+    parser.add_argument('--data', default=os.path.join(ROOT, 'data_example.json'))
+    parser.add_argument('--scale', type=int, default=100, help="章节放大倍数")
+    parser.add_argument('--repeat', type=int, default=5, help="计时重复次数（取最短）")
+    args = parser.parse_args()
+
+    data = scale_data(load_example_data(args.data), args.scale)
+    qa_count = sum(len(section['sub_sections']) for section in data['main_sections'])
+    print(f"📋 数据: {len(data['main_sections'])} 个章节，{qa_count} 组问答（放大 {args.scale} 倍）")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = {}
+        for name, render in [
+            ('原始实现', legacy_generate_article.generate_wechat_article_html),
+            ('模板渲染', generate_wechat_article_html),
+            ('流式写入', render_to_file(os.path.join(tmp_dir, 'article.html'))),
+        ]:
+            elapsed, peak, output = measure(render, data, args.repeat)
+            if name == '流式写入':
+                with open(output, 'r', encoding='utf-8') as f:
+                    output = f.read()
+            results[name] = (elapsed, peak, output)
+            print(f"   - {name}: {elapsed * 1000:.1f} ms，内存峰值 {peak / 1024 / 1024:.1f} MB，输出 {len(output):,} 字符")
+
+    # 模板改为共享样式表并压缩后，输出不再与原始实现逐字相同，改为比较输出大小
+    legacy = results['原始实现']
+    for name in ('模板渲染', '流式写入'):
+        current = results[name]
+        print(f"   - {name}: 输出缩小 {len(legacy[2].encode('utf-8')) / len(current[2].encode('utf-8')):.2f}x，"
+              f"加速比 {legacy[0] / current[0]:.2f}x，内存峰值降低 {legacy[1] / current[1]:.2f}x")
+    print(f"   - 模板渲染与流式写入输出一致: {'是' if results['模板渲染'][2] == results['流式写入'][2] else '否'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+离线的OpenAI兼容模型服务
+实现 /v1/chat/completions（含流式输出）和 /v1/models，把 BASE_URL 指向它即可在没有网络和API Key的情况下运行pipeline：
+
+- 回放录制的响应：录制文件为JSON Lines，每行 {"key": 请求哈希, "content": ...}，
+  或 {"prompt": prompt.yaml中的名字, "content": ...}（该prompt的所有请求都返回这段内容）
+- 没有录制结果时按 prompt.yaml 识别请求类型，根据输入内容生成格式正确的合成响应
+  （逐字稿原样返回录音稿，JSON按段落生成章节和问答）
+- 模拟首token延迟、流式生成速度和每分钟请求数限流（超出时返回429和Retry-After）
+- 指定 --record 时把请求转发给真实服务并写入录制文件，之后可离线回放
+
+用法: python benchmarks/mock_llm_server.py [--port 8765] [--latency 0.5] [--tps 50] [--rpm 60]
+      然后设置 BASE_URL=http://127.0.0.1:8765/v1
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import hashlib
+import argparse
+import threading
+import urllib.request
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from chunking import estimate_tokens
+
+
+# 合成JSON时每个章节包含的段落数，以及每组问答包含的段落数
+SECTION_PARAGRAPHS = 20
+QA_PARAGRAPHS = 2
+
+# 流式输出时每个chunk的字符数
+STREAM_CHUNK_CHARS = 16
+
+
+def request_key(messages):
+    """一次请求的哈希（只取决于消息内容，与模型名无关，换模型后录制结果仍可回放）"""
+    payload = json.dumps(messages, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def load_recordings(path):
+    """读取录制文件，返回 (按请求哈希的响应, 按prompt名的响应)"""
+    by_key, by_prompt = {}, {}
+    if not path or not os.path.exists(path):
+        return by_key, by_prompt
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if 'key' in record:
+                by_key[record['key']] = record['content']
+            elif 'prompt' in record:
+                by_prompt[record['prompt']] = record['content']
+    return by_key, by_prompt
+
+
+def _strip_speaker(paragraph):
+    """去掉段落开头的 "姓名：" 发言人标记"""
+    head, sep, rest = paragraph.partition('：')
+    return rest.strip() if sep and len(head) <= 20 else paragraph
+
+
+def _qa_pairs(paragraphs, subtitles=()):
+    """把连续的段落按 QA_PARAGRAPHS 个一组整理成问答"""
+    sub_sections = []
+    for index in range(0, len(paragraphs), QA_PARAGRAPHS):
+        group = [_strip_speaker(p) for p in paragraphs[index:index + QA_PARAGRAPHS]]
+        position = len(sub_sections)
+        sub_sections.append({
+            'subtitle': subtitles[position] if position < len(subtitles) else f"小标题{position + 1}",
+            'question': group[0],
+            'answer': '\n'.join(group[1:]) or group[0]
+        })
+    return sub_sections
+
+
+def _article_header():
+    return {
+        'guest_name': '测试嘉宾',
+        'guest_intro': '这是离线模型服务生成的嘉宾介绍。',
+        'interviewer': '测试采访者',
+        'proofreader': '测试校对者',
+        'topics': ['离线测试主题1', '离线测试主题2']
+    }
+
+
+def synthetic_article(verbatim):
+    """按段落生成整篇文章的JSON（verbatim_to_json）"""
+    paragraphs = [line.strip() for line in verbatim.splitlines() if line.strip()]
+    data = _article_header()
+    data['main_sections'] = [
+        {
+            'id': f'{index // SECTION_PARAGRAPHS + 1:02d}',
+            'title': f"第{index // SECTION_PARAGRAPHS + 1}章",
+            'sub_sections': _qa_pairs(paragraphs[index:index + SECTION_PARAGRAPHS])
+        }
+        for index in range(0, len(paragraphs), SECTION_PARAGRAPHS)
+    ]
+    return data
+
+
+def synthetic_outline(numbered):
+    """按编号段落生成章节大纲（verbatim_outline）"""
+    count = sum(1 for line in numbered.splitlines() if line.startswith('['))
+    data = _article_header()
+    data['main_sections'] = [
+        {
+            'id': f'{index // SECTION_PARAGRAPHS + 1:02d}',
+            'title': f"第{index // SECTION_PARAGRAPHS + 1}章",
+            'start_paragraph': index + 1,
+            'subtitles': [
+                f"小标题{n + 1}"
+                for n in range((min(SECTION_PARAGRAPHS, count - index) + QA_PARAGRAPHS - 1) // QA_PARAGRAPHS)
+            ]
+        }
+        for index in range(0, max(count, 1), SECTION_PARAGRAPHS)
+    ]
+    return data
+
+
+def synthetic_section(content):
+    """按章节内容生成问答（verbatim_section）"""
+    _, _, rest = content.partition('【小标题】')
+    subtitle_text, _, body = rest.partition('【章节逐字稿】')
+    subtitles = [line.strip()[2:] for line in subtitle_text.splitlines() if line.strip().startswith('- ')]
+    paragraphs = [line.strip() for line in body.splitlines() if line.strip()]
+    return {'sub_sections': _qa_pairs(paragraphs, subtitles)}
+
+
+def synthetic_segment(text):
+    """按段落生成一个逐字稿片段的章节（verbatim_segment），第一个章节标题留空表示延续上一片段"""
+    data = synthetic_article(text)
+    for section in data['main_sections']:
+        del section['id']
+    data['main_sections'][0]['title'] = ''
+    return {'guest_name': data['guest_name'], 'main_sections': data['main_sections']}
+
+
+class MockLLM:
+    """根据请求生成响应，并模拟延迟、生成速度和限流（可在多个线程中同时使用）"""
+
+    def __init__(self, prompts=None, recordings_path=None, latency=0.0, tokens_per_second=0.0, rpm=0,
+                 record_url=None, record_api_key=None):
+        """
+        Args:
+            prompts: load_prompts() 返回的prompt配置，用于识别请求类型
+            recordings_path: 录制文件路径（回放，或 record_url 不为空时追加写入）
+            latency: 首token延迟（秒）
+            tokens_per_second: 流式生成速度，0表示不限制
+            rpm: 每分钟请求数上限，0表示不限制
+            record_url: 真实服务的BASE_URL，不为空时转发请求并录制响应
+        """
+        self.prompt_names = {item['content']: name for name, item in (prompts or {}).items()}
+        self.recordings_path = recordings_path
+        self.by_key, self.by_prompt = load_recordings(recordings_path)
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.rpm = rpm
+        self.record_url = record_url.rstrip('/') if record_url else None
+        self.record_api_key = record_api_key
+        self.requests = 0
+        self._recent = deque()
+        self._lock = threading.Lock()
+
+    def throttle(self):
+        """记录一次请求；超过每分钟请求数上限时返回需要等待的秒数，否则返回None"""
+        now = time.monotonic()
+        with self._lock:
+            self.requests += 1
+            if not self.rpm:
+                return None
+            while self._recent and now - self._recent[0] >= 60:
+                self._recent.popleft()
+            if len(self._recent) >= self.rpm:
+                return 60 - (now - self._recent[0])
+            self._recent.append(now)
+        return None
+
+    def respond(self, body):
+        """返回一次请求的完整输出文本"""
+        messages = body.get('messages') or []
+        key = request_key(messages)
+        if key in self.by_key:
+            return self.by_key[key]
+        system = next((m['content'] for m in messages if m.get('role') == 'system'), '')
+        name = self.prompt_names.get(system)
+        if name in self.by_prompt:
+            return self.by_prompt[name]
+        if self.record_url:
+            content = self._forward(body)
+            self._save(key, content)
+            return content
+        users = [m['content'] for m in messages if m.get('role') == 'user']
+        # 续写请求（流式中断后带上已生成内容）：合成响应总是一次生成完，不需要再续写
+        if any(m.get('role') == 'assistant' for m in messages):
+            return ''
+        return self.synthesize(name, users[0] if users else '')
+
+    def synthesize(self, name, content):
+        """按prompt类型生成合成响应"""
+        if name == 'transcript_to_verbatim':
+            # 分块模式下只转写【本段录音稿】部分
+            _, marker, body = content.partition('【本段录音稿】\n')
+            return body if marker else content
+        if name == 'verbatim_to_json':
+            return json.dumps(synthetic_article(content), ensure_ascii=False, indent=2)
+        if name == 'verbatim_to_json_continue':
+            return json.dumps({'main_sections': []})
+        if name == 'verbatim_outline':
+            return json.dumps(synthetic_outline(content), ensure_ascii=False, indent=2)
+        if name == 'verbatim_section':
+            return json.dumps(synthetic_section(content), ensure_ascii=False, indent=2)
+        if name == 'verbatim_segment':
+            return json.dumps(synthetic_segment(content), ensure_ascii=False, indent=2)
+        if name == 'verbatim_header':
+            return json.dumps(_article_header(), ensure_ascii=False, indent=2)
+        return content
+
+    def _forward(self, body):
+        """把请求（非流式）转发给真实服务，返回输出文本"""
+        payload = dict(body, stream=False)
+        payload.pop('stream_options', None)
+        request = urllib.request.Request(
+            f'{self.record_url}/chat/completions',
+            data=json.dumps(payload, ensure_ascii=False).encode('utf-8'),
+            headers={'Content-Type': 'application/json', 'Authorization': f'Bearer {self.record_api_key}'}
+        )
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())['choices'][0]['message']['content']
+
+    def _save(self, key, content):
+        with self._lock:
+            self.by_key[key] = content
+            if self.recordings_path:
+                with open(self.recordings_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'key': key, 'content': content}, ensure_ascii=False) + '\n')
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """OpenAI Chat Completions 接口（self.server.llm 为 MockLLM）"""
+
+    server_version = 'MockLLM/1.0'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/models'):
+            self._send_json(200, {'object': 'list', 'data': [{'id': 'mock', 'object': 'model', 'owned_by': 'mock'}]})
+        else:
+            self._send_json(404, {'error': {'message': f'未知路径: {self.path}', 'type': 'not_found'}})
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': f'未知路径: {self.path}', 'type': 'not_found'}})
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError as e:
+            self._send_json(400, {'error': {'message': f'请求体不是合法JSON: {e}', 'type': 'invalid_request_error'}})
+            return
+
+        llm = self.server.llm
+        wait = llm.throttle()
+        if wait is not None:
+            self._send_json(429, {'error': {'message': '超出每分钟请求数限制', 'type': 'rate_limit_error'}},
+                            headers={'Retry-After': f'{wait:.3f}'})
+            return
+        try:
+            content = llm.respond(body)
+        except Exception as e:
+            self._send_json(500, {'error': {'message': repr(e), 'type': 'server_error'}})
+            return
+
+        if llm.latency:
+            time.sleep(llm.latency)
+        prompt_tokens = sum(estimate_tokens(m.get('content') or '') for m in body.get('messages') or [])
+        usage = {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': estimate_tokens(content),
+            'total_tokens': prompt_tokens + estimate_tokens(content)
+        }
+        model = body.get('model') or 'mock'
+        response_id = f'chatcmpl-{uuid.uuid4().hex}'
+        if body.get('stream'):
+            self._stream(response_id, model, content, usage)
+            return
+        self._send_json(200, {
+            'id': response_id,
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+            'usage': usage
+        })
+
+    def _stream(self, response_id, model, content, usage):
+        """以SSE格式分块输出，按 tokens_per_second 控制速度，最后一个chunk附带usage"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        created = int(time.time())
+        tokens_per_second = self.server.llm.tokens_per_second
+
+        def event(delta, finish_reason=None, extra=None):
+            chunk = {
+                'id': response_id,
+                'object': 'chat.completion.chunk',
+                'created': created,
+                'model': model,
+                'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]
+            }
+            chunk.update(extra or {})
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode('utf-8'))
+
+        try:
+            event({'role': 'assistant', 'content': ''})
+            for index in range(0, len(content), STREAM_CHUNK_CHARS):
+                piece = content[index:index + STREAM_CHUNK_CHARS]
+                event({'content': piece})
+                if tokens_per_second:
+                    self.wfile.flush()
+                    time.sleep(estimate_tokens(piece) / tokens_per_second)
+            event({}, 'stop', {'usage': usage})
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端中途断开
+            pass
+
+
+def start_server(llm, host='127.0.0.1', port=0, verbose=False):
+    """
+    在后台线程中启动服务
+
+    Returns:
+        tuple[ThreadingHTTPServer, str]: 服务对象（用 shutdown() 停止）和可以直接用作 BASE_URL 的地址
+    """
+    server = ThreadingHTTPServer((host, port), MockHandler)
+    server.daemon_threads = True
+    server.llm = llm
+    server.verbose = verbose
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}/v1'
+
+
+def load_prompts(path=os.path.join(ROOT, 'prompt.yaml')):
+    """读取prompt配置（不依赖当前目录）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)['prompts']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线的OpenAI兼容模型服务")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--recordings', help="录制文件（JSON Lines），用于回放；与 --record 一起使用时追加写入")
+    parser.add_argument('--record', metavar='BASE_URL', help="把请求转发给这个真实服务并录制响应（API Key读取环境变量API_KEY）")
+    parser.add_argument('--latency', type=float, default=0.0, help="首token延迟（秒）")
+    parser.add_argument('--tps', type=float, default=0.0, help="流式生成速度（tokens/s，0表示不限制）")
+    parser.add_argument('--rpm', type=int, default=0, help="每分钟请求数上限，超出时返回429（0表示不限制）")
+    parser.add_argument('--verbose', action='store_true', help="打印每个请求")
+    args = parser.parse_args()
+
+    llm = MockLLM(
+        load_prompts(),
+        recordings_path=args.recordings,
+        latency=args.latency,
+        tokens_per_second=args.tps,
+        rpm=args.rpm,
+        record_url=args.record,
+        record_api_key=os.getenv('API_KEY')
+    )
+    server, base_url = start_server(llm, args.host, args.port, verbose=args.verbose)
+    print(f"🚀 离线模型服务已启动: BASE_URL={base_url}")
+    if llm.by_key or llm.by_prompt:
+        print(f"   - 已加载 {len(llm.by_key) + len(llm.by_prompt)} 条录制响应")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print(f"\n👋 已停止，共处理 {llm.requests} 个请求")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
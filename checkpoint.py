@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Pipeline阶段检查点
+在输入文件旁记录每个阶段的输入哈希、输出路径和输出内容哈希，重跑时跳过输入未变化的阶段
+"""
+
+import os
+import json
+import time
+import hashlib
+from pathlib import Path
+
+
+# 按执行顺序排列的阶段名
+STAGES = ['verbatim', 'json', 'html']
+
+
+def hash_text(*parts):
+    """对若干段文本计算组合哈希"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def hash_file(path):
+    """计算文件内容哈希，文件不存在时返回None"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 16), b''):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def manifest_path_for(txt_path):
+    """录音稿对应的检查点文件路径，如 interview.txt -> interview_manifest.json"""
+    path = Path(txt_path)
+    return str(path.with_name(f'{path.stem}_manifest.json'))
+
+
+class StageManifest:
+    """记录各阶段执行情况的检查点文件"""
+
+    def __init__(self, path):
+        self.path = path
+        self.stages = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.stages = json.load(f).get('stages', {})
+            except (OSError, ValueError):
+                print(f"⚠️ 检查点文件损坏，将重新执行所有阶段: {path}")
+
+    def output_path(self, stage):
+        """阶段上次的输出路径"""
+        entry = self.stages.get(stage)
+        return entry['output_path'] if entry else None
+
+    def output_hash(self, stage):
+        """阶段上次输出内容的哈希"""
+        entry = self.stages.get(stage)
+        return entry['output_hash'] if entry else None
+
+    def has_output(self, stage):
+        """阶段输出文件仍存在且未被修改"""
+        entry = self.stages.get(stage)
+        return bool(entry) and hash_file(entry['output_path']) == entry['output_hash']
+
+    def is_fresh(self, stage, inputs_hash):
+        """阶段输入未变化且输出文件完好时返回True"""
+        entry = self.stages.get(stage)
+        return bool(entry) and entry['inputs_hash'] == inputs_hash and self.has_output(stage)
+
+    def record(self, stage, inputs_hash, output_path):
+        """记录阶段执行结果并立即落盘"""
+        self.stages[stage] = {
+            'inputs_hash': inputs_hash,
+            'output_path': str(output_path),
+            'output_hash': hash_file(output_path),
+            'updated': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        self.save()
+
+    def accept_output(self, stage):
+        """接受输出文件的当前内容（例如人工修改过的逐字稿），后续运行不再视其为失效"""
+        entry = self.stages[stage]
+        output_hash = hash_file(entry['output_path'])
+        if output_hash != entry['output_hash']:
+            entry['output_hash'] = output_hash
+            entry['updated'] = time.strftime('%Y-%m-%d %H:%M:%S')
+            self.save()
+
+    def save(self):
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'stages': self.stages}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
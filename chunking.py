@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+长录音稿分块工具
+按发言轮次和段落边界把录音稿切成按token预算划分的片段，并在转写后按顺序拼接
+"""
+
+import re
+
+
+# 形如 "张三：" / "主持人:" / "Host:" 的发言人标记
+SPEAKER_PATTERN = re.compile(r'^\s*[^\s：:，,。]{1,20}[：:]')
+
+# 超长单段落的兜底切分点（句末标点）
+SENTENCE_PATTERN = re.compile(r'(?<=[。！？!?；;.])')
+
+# 逐字稿中表示主题的小标题行（不带发言人标记和句中标点的短行），边生成边切分时优先在这里切开
+HEADING_PATTERN = re.compile(r'^\s*(?:#{1,6}\s*)?[^\s：:，,。！？!?；;]{1,30}\s*$')
+
+CJK_PATTERN = re.compile(r'[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]')
+
+
+def estimate_tokens(text):
+    """
+    粗略估算文本的token数
+    中日韩字符按每字约1个token计算，其余字符按每4个字符约1个token计算
+    """
+    cjk_count = len(CJK_PATTERN.findall(text))
+    other_count = len(text) - cjk_count
+    return cjk_count + (other_count + 3) // 4
+
+
+def split_units(transcript):
+    """
+    将录音稿拆成最小切分单元：
+    先按空行分段，段内再按发言人标记切分发言轮次
+    """
+    units = []
+    for block in re.split(r'\n\s*\n', transcript):
+        current = []
+        for line in block.split('\n'):
+            if SPEAKER_PATTERN.match(line) and current:
+                units.append('\n'.join(current).strip())
+                current = []
+            current.append(line)
+        if current:
+            units.append('\n'.join(current).strip())
+    return [unit for unit in units if unit]
+
+
+def _split_oversized(unit, max_tokens):
+    """将超出预算的单个发言按句子切开"""
+    pieces = []
+    current = ''
+    for sentence in SENTENCE_PATTERN.split(unit):
+        if current and estimate_tokens(current + sentence) > max_tokens:
+            pieces.append(current)
+            current = ''
+        current += sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_transcript(transcript, max_tokens=4000, overlap=1):
+    """
+    按token预算切分录音稿
+
+    Args:
+        transcript: 录音稿全文
+        max_tokens: 每个片段正文的token预算
+        overlap: 每个片段携带的上一片段末尾发言数，仅作为上下文，不参与转写
+
+    Returns:
+        list[dict]: 按顺序排列的片段，每项包含 index、context、body
+    """
+    units = []
+    for unit in split_units(transcript):
+        if estimate_tokens(unit) > max_tokens:
+            units.extend(_split_oversized(unit, max_tokens))
+        else:
+            units.append(unit)
+
+    groups = []
+    current = []
+    current_tokens = 0
+    for unit in units:
+        unit_tokens = estimate_tokens(unit)
+        if current and current_tokens + unit_tokens > max_tokens:
+            groups.append(current)
+            current = []
+            current_tokens = 0
+        current.append(unit)
+        current_tokens += unit_tokens
+    if current:
+        groups.append(current)
+
+    chunks = []
+    for index, group in enumerate(groups):
+        context = groups[index - 1][-overlap:] if index > 0 and overlap > 0 else []
+        chunks.append({
+            'index': index,
+            'context': '\n\n'.join(context),
+            'body': '\n\n'.join(group),
+        })
+    return chunks
+
+
+def build_chunk_content(chunk, template):
+    """根据prompt模板拼出单个片段发送给模型的内容"""
+    if not chunk['context']:
+        return chunk['body']
+    return template.replace('{context}', chunk['context']).replace('{body}', chunk['body'])
+
+
+def _normalize(paragraph):
+    """比较段落时忽略空白和标点差异"""
+    return re.sub(r'[\s\W_]+', '', paragraph)
+
+
+class ChunkStitcher:
+    """
+    按顺序逐个加入片段的转写结果
+    若某片段开头的段落与上一片段结尾段落重复（模型误转写了上下文），则去掉重复部分
+    """
+
+    def __init__(self):
+        self.tail = None
+
+    def add(self, output):
+        """加入下一个片段的转写结果，返回去重后新增的段落"""
+        chunk_paragraphs = [p.strip() for p in re.split(r'\n\s*\n', output.strip()) if p.strip()]
+        while self.tail is not None and chunk_paragraphs:
+            tail = _normalize(self.tail)
+            head = _normalize(chunk_paragraphs[0])
+            if head and (head == tail or (len(head) > 10 and head in tail)):
+                chunk_paragraphs.pop(0)
+            else:
+                break
+        if chunk_paragraphs:
+            self.tail = chunk_paragraphs[-1]
+        return chunk_paragraphs
+
+
+def stitch_chunks(outputs):
+    """按顺序拼接各片段的转写结果（去掉片段之间重复的段落）"""
+    stitcher = ChunkStitcher()
+    paragraphs = []
+    for output in outputs:
+        paragraphs.extend(stitcher.add(output))
+    return '\n\n'.join(paragraphs)
+
+
+class VerbatimSegmenter:
+    """
+    把边生成边到达的逐字稿切成片段，供下一步边生成边处理
+
+    累计超过 max_tokens 后在下一个段落开头切开；遇到表示主题的小标题行时，
+    累计超过一半预算即可提前切开，让片段尽量落在章节边界上。每切出一段调用一次 emit(index, text)
+    """
+
+    def __init__(self, emit, max_tokens=4000):
+        self.emit = emit
+        self.max_tokens = max_tokens
+        self.lines = []
+        self.tokens = 0
+        self.pending = ''
+        self.count = 0
+
+    def feed(self, text):
+        """加入新生成的一段文本（可以在行中间截断）"""
+        self.pending += text
+        *lines, self.pending = self.pending.split('\n')
+        for line in lines:
+            self._add_line(line)
+
+    def _add_line(self, line):
+        if line.strip():
+            heading = bool(HEADING_PATTERN.match(line))
+            starts_paragraph = not self.lines or not self.lines[-1].strip() or heading or SPEAKER_PATTERN.match(line)
+            budget = self.max_tokens // 2 if heading else self.max_tokens
+            if starts_paragraph and self.tokens >= budget:
+                self._flush()
+        self.lines.append(line)
+        self.tokens += estimate_tokens(line)
+
+    def _flush(self):
+        text = '\n'.join(self.lines).strip()
+        self.lines = []
+        self.tokens = 0
+        if text:
+            self.emit(self.count, text)
+            self.count += 1
+
+    def finish(self):
+        """输出最后一个片段，返回片段总数"""
+        if self.pending:
+            self._add_line(self.pending)
+            self.pending = ''
+        self._flush()
+        return self.count
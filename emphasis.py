@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+关键短语加粗匹配器
+基于 Aho–Corasick 自动机，一次扫描找出段落中所有关键短语，按最左最长、互不重叠的规则选出需要加粗的位置
+"""
+
+import hashlib
+
+
+class EmphasisMatcher:
+    """由关键短语表构建的多模式匹配自动机，构建一次后可重复用于所有段落"""
+
+    def __init__(self, phrases=()):
+        # goto[state] 为该状态的转移表，fail[state] 为失配指针，
+        # outputs[state] 为在该状态结束的所有短语长度（含失配链上的，按长度降序）
+        self.goto = [{}]
+        self.fail = [0]
+        self.outputs = [()]
+        self.size = 0
+        phrases = sorted({phrase.strip() for phrase in phrases if phrase.strip()})
+        for phrase in phrases:
+            self._insert(phrase)
+        self._build()
+        # 短语表的哈希，用于判断缓存的渲染结果是否仍然有效
+        self.fingerprint = hashlib.sha256('\n'.join(phrases).encode('utf-8')).hexdigest()
+
+    def _insert(self, phrase):
+        phrase = phrase.strip()
+        if not phrase:
+            return
+        state = 0
+        for char in phrase:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append(())
+            state = next_state
+        if len(phrase) not in self.outputs[state]:
+            self.outputs[state] = (len(phrase),)
+            self.size += 1
+
+    def _build(self):
+        """按层次遍历计算失配指针，并把失配链上的输出合并到每个状态"""
+        queue = list(self.goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for char, next_state in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                merged = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+                self.outputs[next_state] = tuple(sorted(set(merged), reverse=True))
+                queue.append(next_state)
+
+    def __len__(self):
+        return self.size
+
+    def find(self, text):
+        """
+        找出最左最长、互不重叠的匹配
+
+        Returns:
+            list[tuple[int, int]]: 按位置排列的 (start, end) 区间
+        """
+        if not self.size:
+            return []
+        goto = self.goto
+        fail = self.fail
+        outputs = self.outputs
+        longest_at = {}
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length in outputs[state]:
+                start = index + 1 - length
+                if longest_at.get(start, 0) < length:
+                    longest_at[start] = length
+
+        matches = []
+        last_end = 0
+        for start in sorted(longest_at):
+            if start >= last_end:
+                last_end = start + longest_at[start]
+                matches.append((start, last_end))
+        return matches
+
+    def apply(self, text, wrap):
+        """用wrap(phrase)替换每个匹配到的短语，未匹配部分原样保留"""
+        return wrap_matches(text, self.find(text), wrap)
+
+
+def wrap_matches(text, matches, wrap):
+    """
+    用wrap(phrase)替换text中 matches（find 的结果）标出的短语
+    同一段文字要生成多种格式时，只需 find 一次
+    """
+    if not matches:
+        return text
+    pieces = []
+    position = 0
+    for start, end in matches:
+        pieces.append(text[position:start])
+        pieces.append(wrap(text[start:end]))
+        position = end
+    pieces.append(text[position:])
+    return ''.join(pieces)
+
+
+def load_glossary(path):
+    """读取关键短语表：每行一个短语，空行和以 # 开头的行会被忽略"""
+    phrases = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                phrases.append(line)
+    return phrases
@@ -5,27 +5,49 @@
 """
 
 import html
-import re
-import json
 import os
-from datetime import datetime
 
+from templates import get_template
+from emphasis import EmphasisMatcher, load_glossary, wrap_matches
+from interview_model import Section, coerce
+import tolerant_json
 
-def process_text_with_emphasis(text):
+
+# 需要加粗的关键短语列表（也可以通过环境变量 EMPHASIS_GLOSSARY 指定短语表文件，每行一个短语）
+EMPHASIS_PATTERNS = [
+]
+
+_emphasis_matcher = None
+
+
+def set_emphasis_patterns(phrases):
+    """替换需要加粗的关键短语（重新构建匹配自动机）"""
+    global _emphasis_matcher
+    _emphasis_matcher = EmphasisMatcher(phrases)
+    return _emphasis_matcher
+
+
+def get_emphasis_matcher():
+    """获取关键短语匹配器，首次使用时由 EMPHASIS_PATTERNS 和短语表文件构建"""
+    if _emphasis_matcher is None:
+        phrases = list(EMPHASIS_PATTERNS)
+        glossary_path = os.getenv('EMPHASIS_GLOSSARY')
+        if glossary_path:
+            phrases.extend(load_glossary(glossary_path))
+        set_emphasis_patterns(phrases)
+    return _emphasis_matcher
+
+
+def _bold(phrase):
+    return get_template('emphasis').render(text=phrase)
+
+
+def process_text_with_emphasis(text, matcher=None):
     """
     处理文本中的加粗标记
-    将需要强调的文本转换为加粗格式
+    一次扫描找出最左最长、互不重叠的关键短语并转换为加粗格式
     """
-    # 需要加粗的关键短语列表
-    emphasis_patterns = [
-    ]
-    
-    # 应用加粗标记
-    for pattern in emphasis_patterns:
-        if pattern in text and f'<span textstyle="" style="font-weight: bold;">{pattern}</span>' not in text:
-            text = text.replace(pattern, f'<span textstyle="" style="font-weight: bold;">{pattern}</span>')
-    
-    return text
+    return (matcher or get_emphasis_matcher()).apply(text, _bold)
 
 
 def escape_html(text):
@@ -40,110 +62,225 @@ def format_guest_intro(intro_text):
 
 def generate_topics_summary(topics):
     """生成主题摘要HTML"""
-    summary_sections = []
+    out = []
+    template = get_template('topic')
     for topic in topics:
-        summary_sections.append(f'''<section style="margin-bottom: 16px;outline: 0px;font-family: &quot;PingFang SC&quot;, system-ui, -apple-system, BlinkMacSystemFont, &quot;Helvetica Neue&quot;, &quot;Hiragino Sans GB&quot;, &quot;Microsoft YaHei UI&quot;, &quot;Microsoft YaHei&quot;, Arial, sans-serif;text-indent: 0em;letter-spacing: 0.578px;background-color: rgb(255, 255, 255);color: rgb(62, 62, 62);text-align: center;line-height: 1.6em;margin-top: 8px;"><span leaf=""><span textstyle="" style="font-weight: bold;">{topic}</span></span></section>''')
-    return ''.join(summary_sections)
+        template.render_into(out, {'topic': topic})
+    return ''.join(out)
 
 
-def generate_section_html(section, data):
-    """生成单个章节的HTML"""
-
-    section_html = f'''
-                    <section style="margin-top: 8px;outline: 0px;letter-spacing: 0.578px;text-align: right;text-indent: 0em;line-height: 1.6em;">
-                        <span leaf=""><br></span>
-                    </section>
-                    <section
-                        style="padding-right: 20px;padding-left: 20px;outline: 0px;caret-color: rgba(0, 0, 0, 0.9);font-family: &quot;PingFang SC&quot;, system-ui, -apple-system, BlinkMacSystemFont, &quot;Helvetica Neue&quot;, &quot;Hiragino Sans GB&quot;, &quot;Microsoft YaHei UI&quot;, &quot;Microsoft YaHei&quot;, Arial, sans-serif;font-size: 17px;letter-spacing: 0.544px;line-height: 0.8;visibility: visible;">
-                        <section
-                            style="outline: 0px;letter-spacing: 0.578px;background-color: rgb(255, 255, 255);font-size: 16px;color: rgb(62, 62, 62);text-align: center;text-indent: 0em;line-height: 1.6em;margin-top: 8px;margin-bottom: 32px;">
-                            <span
-                                style="outline: 0px;font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;orphans: 4;caret-color: rgb(0, 122, 255);white-space-collapse: preserve;color: rgb(44, 42, 143);font-size: 24px;font-weight: 700;text-decoration: underline;letter-spacing: 0.5px;"><span
-                                    leaf="">{section['id']} &nbsp;{section['title']}</span></span></section>'''
-    
-    section_html += '''
-                    </section>'''
-    
-    # 格式化章节HTML
-    section_html = section_html.format(
-        section_id=section['id'],
-        section_title=section['title']
-    )
-    
-    # 生成问答内容
-    qa_html = ''
+class ArticleSink:
+    """
+    walk_article 的输出目标：按文章顺序接收开头、章节、小标题、问题和回答，把生成的文本追加到 self.out
+    子类只需要实现关心的部分，多个输出目标可以共用一次遍历
+    """
+
+    # 需要加粗关键短语的输出目标设为True，遍历时每段只匹配一次，结果由这些目标共用
+    uses_emphasis = False
+
+    def __init__(self, out=None):
+        self.out = [] if out is None else out
+
+    def begin(self, interview):
+        """文章开头"""
+
+    def section(self, section):
+        """章节开始"""
+
+    def subtitle(self, subtitle, count):
+        """小标题（只在变化处出现），count 为本章节中的第几个小标题"""
+
+    def question(self, question):
+        """问题"""
+
+    def answer(self, paragraphs, speaker, emphasis):
+        """
+        回答的各个段落（按换行切分），speaker 为带冒号的说话人，
+        emphasis 为每段中关键短语的 (start, end) 区间列表（短语表为空或没有输出目标需要时为None）
+        """
+
+    def end_section(self, section):
+        """章节结束"""
+
+    def end(self, interview):
+        """文章结尾"""
+
+
+class WeChatHTMLSink(ArticleSink):
+    """微信公众号文章HTML（唯一的HTML渲染实现，整篇、逐块和单个章节的渲染都经过它）"""
+
+    uses_emphasis = True
+
+    def __init__(self, out=None):
+        super().__init__(out)
+        self.subtitle_into = get_template('subtitle').render_into
+        self.question_into = get_template('question').render_into
+        self.first_answer_into = get_template('first_answer').render_into
+        self.answer_into = get_template('answer').render_into
+
+    def begin(self, interview):
+        render_header_into(self.out, interview)
+
+    def section(self, section):
+        get_template('section_header').render_into(self.out, {
+            'section_id': section.id,
+            'section_title': section.title
+        })
+
+    def subtitle(self, subtitle, count):
+        # 如果是第二个及之后的副标题，先添加空行
+        if count > 1:
+            get_template('subtitle_spacer').render_into(self.out, {})
+        self.subtitle_into(self.out, {'subtitle': subtitle})
+
+    def question(self, question):
+        self.question_into(self.out, {'question': question})
+
+    def answer(self, paragraphs, speaker, emphasis):
+        out = self.out
+        # 第一段带说话人
+        para = paragraphs[0]
+        if para.strip():
+            self.first_answer_into(out, {
+                'speaker': speaker,
+                'content': wrap_matches(para, emphasis[0], _bold) if emphasis else para
+            })
+        if emphasis:
+            for para, matches in zip(paragraphs[1:], emphasis[1:]):
+                self.answer_into(out, {'content': wrap_matches(para, matches, _bold)})
+        else:
+            for para in paragraphs[1:]:
+                self.answer_into(out, {'content': para})
+
+    def end(self, interview):
+        get_template('footer').render_into(self.out, {})
+
+
+def walk_section(section, guest_name, sinks):
+    """遍历一个章节，把各部分依次交给每个输出目标"""
+    for sink in sinks:
+        sink.section(section)
+
+    speaker = f"{guest_name}："
+    # 短语表为空或没有输出目标需要加粗时不做匹配
+    find = None
+    if any(sink.uses_emphasis for sink in sinks):
+        matcher = get_emphasis_matcher()
+        if matcher.size:
+            find = matcher.find
     current_subtitle = None
-    subtitle_count = 0  # 添加副标题计数器
-    
-    for i, sub_section in enumerate(section['sub_sections']):
-        # 检查是否需要显示副标题
-        subtitle = sub_section.get('subtitle', '')
+    subtitle_count = 0  # 副标题计数器
+
+    for sub_section in section.sub_sections:
+        # 小标题变化时才显示（空小标题不显示）
+        subtitle = sub_section.subtitle
         if subtitle != current_subtitle:
-            # 新的副标题，需要显示
             if subtitle:
                 subtitle_count += 1
-                # 如果是第二个及之后的副标题，先添加空行
-                if subtitle_count > 1:
-                    qa_html += '''
-                    <section style="margin-top: 8px;outline: 0px;letter-spacing: 0.578px;text-align: right;text-indent: 0em;line-height: 1.6em;">
-                        <span leaf=""><br></span>
-                    </section>'''
-                
-                qa_html += f'''
-                    <section
-                        style="outline: 0px;letter-spacing: 0.578px;background-color: rgb(255, 255, 255);font-size: 16px;color: rgb(62, 62, 62);text-align: center;text-indent: 0em;line-height: 1.6em;margin-top: 8px;margin-bottom: 24px;">
-                        <span
-                            style="outline: 0px;font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;font-size: 20px;font-weight: 700;letter-spacing: 0.5px;orphans: 4;caret-color: rgb(0, 122, 255);white-space-collapse: preserve;text-indent: 0em;"><span
-                                leaf="">"{subtitle}"</span></span></section>'''
+                for sink in sinks:
+                    sink.subtitle(subtitle, subtitle_count)
             current_subtitle = subtitle
-        
-        # 问题
-        question_html = f'''
-                    <section
-                        style="margin-bottom: 24px;outline: 0px;font-family: &quot;PingFang SC&quot;, system-ui, -apple-system, BlinkMacSystemFont, &quot;Helvetica Neue&quot;, &quot;Hiragino Sans GB&quot;, &quot;Microsoft YaHei UI&quot;, &quot;Microsoft YaHei&quot;, Arial, sans-serif;letter-spacing: 0.578px;visibility: visible;margin-top: 8px;">
-                        <span leaf=""
-                            style="outline: 0px;font-size: 15px;text-indent: 0em;color: rgb(0, 0, 0);letter-spacing: 0.5px;font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;orphans: 4;caret-color: rgb(0, 122, 255);white-space-collapse: preserve;"><span
-                                textstyle=""
-                                style="color: rgb(171, 25, 66);font-weight: bold;">蜗壳进阶联盟：{sub_section['question']}</span></span>
-                    </section>'''
-        
-        qa_html += question_html
-        
-        # 回答（处理多段落）
-        answer_paragraphs = sub_section['answer'].split('\n')
-        para = answer_paragraphs[0]
-        if para.strip():
-            # 处理带有说话人的段落
-            speaker = f"{data['guest_name']}："
-            content = process_text_with_emphasis(para)
-            
-            answer_html = f'''
-            <section
-                style="box-sizing: border-box;font-style: normal;font-weight: 400;text-align: justify;font-size: 16px;color: rgb(62, 62, 62);"
-                data-pm-slice="0 0 []">
-                <section style="color: rgb(0, 0, 0);font-size: 15px;box-sizing: border-box;">
-                    <p style="white-space: normal;margin: 8px 0px 24px;padding: 0px;box-sizing: border-box;">
-                        <strong style="box-sizing: border-box;"><span leaf="">{speaker}</span></strong><span
-                            leaf="">{content}</span>
-                    </p>
-                </section>
-            </section>'''
-            qa_html += answer_html
-        for para in answer_paragraphs[1:]:
-            content = process_text_with_emphasis(para)
-            answer_html = f'''
-            <section
-                style="box-sizing: border-box;font-style: normal;font-weight: 400;text-align: justify;font-size: 16px;color: rgb(62, 62, 62);"
-                data-pm-slice="0 0 []">
-                <section style="color: rgb(0, 0, 0);font-size: 15px;box-sizing: border-box;">
-                    <p style="white-space: normal;margin: 8px 0px 24px;padding: 0px;box-sizing: border-box;">
-                        <span leaf="">{content}</span>
-                    </p>
-                </section>
-            </section>'''
-            qa_html += answer_html
-
-    return section_html + qa_html
+
+        question = sub_section.question
+        paragraphs = sub_section.answer.split('\n')
+        emphasis = [find(para) for para in paragraphs] if find else None
+        for sink in sinks:
+            sink.question(question)
+            sink.answer(paragraphs, speaker, emphasis)
+
+    for sink in sinks:
+        sink.end_section(section)
+
+
+def walk_article(interview, sinks):
+    """
+    只遍历一次文章（Interview），同时生成所有输出目标的内容
+    生成器：开头、每个章节和结尾完成后各产出一次，调用方可以在这时把各目标的 out 写入文件并清空
+    """
+    for sink in sinks:
+        sink.begin(interview)
+    yield
+
+    for section in interview.main_sections:
+        walk_section(section, interview.guest_name, sinks)
+        yield
+
+    for sink in sinks:
+        sink.end(interview)
+    yield
+
+
+def _guest_name(data):
+    """章节渲染需要的嘉宾姓名：data 可以是文章字典、Interview，或直接传入姓名"""
+    if isinstance(data, str):
+        return data
+    if isinstance(data, dict):
+        return data['guest_name']
+    return data.guest_name
+
+
+def render_section_into(out, section, data):
+    """把单个章节（Section）的HTML逐段追加到out，data 为文章数据（取嘉宾姓名）"""
+    walk_section(section, _guest_name(data), [WeChatHTMLSink(out)])
+
+
+def generate_section_html(section, data):
+    """生成单个章节的HTML（section 可以是字典或 Section，data 为文章字典、Interview 或嘉宾姓名）"""
+    if not isinstance(section, Section):
+        section = Section.from_dict(section)
+    out = []
+    render_section_into(out, section, data)
+    return ''.join(out)
+
+
+def render_header_into(out, data):
+    """把文章开头（头图、文章信息、嘉宾介绍和主题摘要）逐段追加到out（data 为文章字典或 Interview）"""
+    interview = coerce(data)
+    get_template('base').render_into(out, {
+        'word_count': interview.word_count,
+        'reading_time': interview.reading_time,
+        'guest_intro': format_guest_intro(interview.guest_intro),
+        'interviewer': interview.interviewer,
+        'proofreader': interview.proofreader,
+        'topics_summary': generate_topics_summary(interview.topics)
+    })
+
+
+def render_article_into(out, data):
+    """把整篇文章的HTML按顺序逐段追加到out（data 为文章字典或 Interview）"""
+    for _ in walk_article(coerce(data), [WeChatHTMLSink(out)]):
+        pass
+
+
+def iter_article_html(data):
+    """
+    按顺序逐块生成文章HTML：开头、每个章节、结尾
+    每次只持有一个章节的HTML，适合直接写入文件的长文章。
+    数据在生成第一块之前就完成校验，不符合要求时不会输出半篇文章
+    """
+    interview = coerce(data)
+    return _iter_article_html(interview)
+
+
+def _iter_article_html(interview):
+    sink = WeChatHTMLSink()
+    for _ in walk_article(interview, [sink]):
+        yield ''.join(sink.out)
+        sink.out.clear()
+
+
+def render_to(data, fp):
+    """
+    把文章HTML边生成边写入文件对象fp，内存峰值只取决于最大的单个章节
+
+    Returns:
+        int: 写入的字符数
+    """
+    written = 0
+    for fragment in iter_article_html(data):
+        fp.write(fragment)
+        written += len(fragment)
+    return written
 
 
 def generate_wechat_article_html(data):
@@ -151,233 +288,14 @@ def generate_wechat_article_html(data):
     主函数：根据结构化数据生成微信公众号文章HTML
     
     Args:
-        data: 包含文章信息的字典
+        data: 包含文章信息的字典或 Interview（字典先经 interview_model 校验，不符合要求时抛出 InterviewDataError）
     
     Returns:
-        str: 生成的HTML字符串
+        str: 生成的HTML字符串（直接写文件时可改用 render_to）
     """
-    
-    # HTML模板开头部分（保持原有的样式和结构）
-    html_template = '''<div class="rich_media_content js_underline_content autoTypeSetting24psection fix_apple_default_style" id="js_content"
-    style="">
-    <section
-        style="margin-bottom: 0px;outline: 0px;font-family: &quot;PingFang SC&quot;, system-ui, -apple-system, BlinkMacSystemFont, &quot;Helvetica Neue&quot;, &quot;Hiragino Sans GB&quot;, &quot;Microsoft YaHei UI&quot;, &quot;Microsoft YaHei&quot;, Arial, sans-serif;letter-spacing: 0.578px;font-size: 16px;visibility: visible;"
-        data-pm-slice="0 0 []">
-        <section style="padding-right: 10px;padding-left: 10px;outline: 0px;line-height: 1.6;visibility: visible;">
-            <section style="outline: 0px;visibility: visible;">
-                <section style="margin-top: 8px;outline: 0px;visibility: visible;margin-bottom: 24px;">
-                    <section
-                        style="margin-top: 10px;margin-bottom: 10px;outline: 0px;text-align: left;justify-content: flex-start;display: flex;flex-flow: row;visibility: visible;">
-                        <section
-                            style="outline: 0px;display: inline-block;vertical-align: bottom;width: 100.438px;flex: 0 0 auto;height: auto;align-self: flex-end;visibility: visible;">
-                            <section
-                                style="outline: 0px;line-height: 0;transform: translate3d(10px, 0px, 0px);visibility: visible;">
-                                <span leaf="" style="visibility: visible;"><br style="visibility: visible;"></span>
-                                <section
-                                    style="outline: 0px;vertical-align: middle;display: inline-block;line-height: 0;width: 74.3203px;height: auto;border-top-left-radius: 647px;border-top-right-radius: 647px;border-bottom-left-radius: 647px;overflow: hidden;visibility: visible;"
-                                    nodeleaf=""><img
-                                        data-src="https://mmbiz.qpic.cn/mmbiz_png/twW3euR3BMLsyBeyHbW3q5Uc4FG2ktl4MtsRbfzMks2ZYWELA3KH47IV3Xod2f6obGoGyTsI64U1vUiaUgK1VibQ/640?wx_fmt=other&amp;from=appmsg&amp;tp=webp&amp;wxfrom=5&amp;wx_lazy=1&amp;wx_co=1"
-                                        class="rich_pages wxw-img" data-ratio="1.0046296296296295" data-s="300,640"
-                                        data-type="png" data-w="1080"
-                                        style="outline: 0px; vertical-align: middle; width: 74.3125px !important; visibility: visible !important; height: auto !important;"
-                                        data-cropselx1="0" data-cropselx2="75" data-cropsely1="0" data-cropsely2="75"
-                                        data-backw="74" data-backh="75" data-imgfileid="100000981"
-                                        data-original-style="outline: 0px;vertical-align: middle;width: 74.3125px !important;visibility: visible !important;height: auto !important;"
-                                        data-index="1"
-                                        src="https://mmbiz.qpic.cn/mmbiz_png/twW3euR3BMLsyBeyHbW3q5Uc4FG2ktl4MtsRbfzMks2ZYWELA3KH47IV3Xod2f6obGoGyTsI64U1vUiaUgK1VibQ/640?wx_fmt=other&amp;from=appmsg&amp;wxfrom=5&amp;wx_lazy=1&amp;wx_co=1&amp;tp=webp"
-                                        _width="74.3125px" alt="Image" data-report-img-idx="5" data-fail="0"></section>
-                            </section>
-                        </section>
-                        <section
-                            style="outline: 0px;display: inline-block;vertical-align: bottom;width: auto;align-self: flex-end;flex: 100 100 0%;height: auto;visibility: visible;">
-                            <section
-                                style="outline: 0px;text-align: justify;font-size: 12px;color: rgb(141, 141, 141);visibility: visible;">
-                                <p style="outline: 0px;visibility: visible;"><span
-                                        style="outline: 0px;letter-spacing: 0.5px;visibility: visible;"><strong
-                                            style="outline: 0px;visibility: visible;"><span leaf=""
-                                                style="visibility: visible;">专注打破大学信息差</span></strong></span></p>
-                            </section>
-                            <section style="margin-top: 3px;margin-bottom: 3px;outline: 0px;visibility: visible;">
-                                <section
-                                    style="outline: 0px;background-color: rgb(141, 141, 141);height: 1px;visibility: visible;">
-                                    <svg viewBox="0 0 1 1"
-                                        style="float: left;line-height: 0;width: 0px;vertical-align: top;visibility: visible;"></svg>
-                                </section>
-                            </section>
-                            <section
-                                style="margin-top: 7px;margin-bottom: 7px;outline: 0px;justify-content: flex-start;display: flex;flex-flow: row;visibility: visible;">
-                                <section
-                                    style="padding-right: 4px;padding-left: 4px;outline: 0px;display: inline-block;vertical-align: bottom;width: auto;align-self: flex-end;flex: 0 0 auto;background-color: rgb(92, 170, 233);min-width: 5%;height: auto;visibility: visible;">
-                                    <section style="outline: 0px;text-align: center;visibility: visible;">
-                                        <section
-                                            style="outline: 0px;font-size: 17px;color: rgb(255, 255, 255);visibility: visible;">
-                                            <p style="outline: 0px;visibility: visible;"><span
-                                                    style="outline: 0px;letter-spacing: 0.5px;visibility: visible;"><strong
-                                                        style="outline: 0px;visibility: visible;"><span leaf=""
-                                                            style="visibility: visible;">点击蓝字</span></strong></span></p>
-                                        </section>
-                                    </section>
-                                </section>
-                                <section
-                                    style="padding-left: 5px;outline: 0px;display: inline-block;vertical-align: bottom;width: auto;min-width: 5%;flex: 0 0 auto;height: auto;align-self: flex-end;visibility: visible;">
-                                    <section style="outline: 0px;visibility: visible;">
-                                        <section style="outline: 0px;font-size: 17px;visibility: visible;">
-                                            <p style="outline: 0px;visibility: visible;"><span
-                                                    style="outline: 0px;letter-spacing: 0.5px;visibility: visible;"><strong
-                                                        style="outline: 0px;visibility: visible;"><span leaf=""
-                                                            style="visibility: visible;">关注我们</span></strong></span></p>
-                                        </section>
-                                    </section>
-                                </section>
-                            </section>
-                        </section>
-                    </section>
-                </section>
-                <section style="text-align: center; margin-bottom: 24px; visibility: visible;"><span leaf=""
-                        style="visibility: visible;"><img
-                            data-src="https://mmbiz.qpic.cn/mmbiz_png/twW3euR3BMIlU2KI3CgvzhkAYcwQw5ctw8IvZAq0l1Nl1QQyHcMSAKDqgduNY2TqO1YJd41YrHTfMTU9C1Pw3A/640?wx_fmt=png&amp;from=appmsg"
-                            class="rich_pages wxw-img" data-ratio="0.512962962962963" data-s="300,640" data-type="png"
-                            data-w="1080"
-                            style="vertical-align: middle; max-width: 100%; width: 657px !important; box-sizing: border-box; height: auto !important; visibility: visible !important;"
-                            data-imgfileid="100001361"
-                            data-original-style="vertical-align: middle;max-width: 100%;width: 100%;box-sizing: border-box;height: auto !important;"
-                            data-index="2"
-                            src="https://mmbiz.qpic.cn/mmbiz_png/twW3euR3BMIlU2KI3CgvzhkAYcwQw5ctw8IvZAq0l1Nl1QQyHcMSAKDqgduNY2TqO1YJd41YrHTfMTU9C1Pw3A/640?wx_fmt=png&amp;from=appmsg&amp;tp=webp&amp;wxfrom=5&amp;wx_lazy=1"
-                            _width="100%" alt="Image" data-report-img-idx="4" data-fail="0"></span></section>
-                <section
-                    style="margin-top: 8px;outline: 0px;letter-spacing: 0.578px;text-align: left;text-indent: 0em;line-height: 1.6em;visibility: visible;margin-bottom: 24px;">
-                    <span style="outline: 0px;letter-spacing: 0.5px;visibility: visible;"><span
-                            style="outline: 0px;color: rgb(106, 106, 106);font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;orphans: 4;caret-color: rgb(0, 122, 255);white-space-collapse: preserve;font-size: 14px;visibility: visible;"><span
-                                leaf="" style="visibility: visible;">长文预警，本文共</span></span><span
-                            style="outline: 0px;font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;orphans: 4;caret-color: rgb(0, 122, 255);white-space-collapse: preserve;font-size: 14px;color: rgb(44, 42, 143);visibility: visible;"><strong
-                                style="outline: 0px;visibility: visible;"><span leaf=""
-                                    style="visibility: visible;">{word_count}</span></strong></span><span
-                            style="outline: 0px;color: rgb(106, 106, 106);font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;orphans: 4;caret-color: rgb(0, 122, 255);white-space-collapse: preserve;font-size: 14px;visibility: visible;"><span
-                                leaf="" style="visibility: visible;">字，预计阅读时间</span></span><span
-                            style="outline: 0px;font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;orphans: 4;caret-color: rgb(0, 122, 255);white-space-collapse: preserve;font-size: 14px;color: rgb(44, 42, 143);visibility: visible;"><strong
-                                style="outline: 0px;visibility: visible;"><span leaf=""
-                                    style="visibility: visible;">{reading_time}</span></strong></span><span
-                            style="outline: 0px;color: rgb(106, 106, 106);font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;orphans: 4;caret-color: rgb(0, 122, 255);white-space-collapse: preserve;font-size: 14px;visibility: visible;"><span
-                                leaf="" style="visibility: visible;">分钟</span></span></span></section>
-                <section
-                    style="margin-top: 8px;outline: 0px;letter-spacing: normal;white-space-collapse: preserve;orphans: 4;caret-color: rgb(0, 122, 255);font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;text-align: start;text-indent: 0em;line-height: 1.75em;visibility: visible;margin-bottom: 24px;">
-                    <span
-                        style="outline: 0px;color: rgb(106, 106, 106);letter-spacing: 0.5px;font-size: 15px;visibility: visible;"><span
-                            leaf=""
-                            style="visibility: visible;">「对话」是蜗壳进阶联盟推出的系列深度访谈栏目，我们邀请了科大的优秀前辈，讲述他们在求学路上曾经历的挫折与迷茫，以及收获的成长与荣光。通过深度对话，展现他们独特的人生轨迹与关键抉择，希望这些经验能为后来的科大学子提供切实的参考与支持。</span></span>
-                </section>
-                <section
-                    style="margin-top: 8px;outline: 0px;letter-spacing: normal;white-space-collapse: preserve;orphans: 4;caret-color: rgb(0, 122, 255);font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;text-align: start;text-indent: 0em;line-height: 1.75em;visibility: visible;margin-bottom: 24px;">
-                    <span
-                        style="outline: 0px;color: rgb(106, 106, 106);letter-spacing: 0.5px;font-size: 15px;visibility: visible;"><span
-                            leaf="">{guest_intro}</span></span>
-                </section>
-                <section
-                    style="margin-top: 8px;outline: 0px;letter-spacing: 0.578px;text-align: left;text-indent: 0em;line-height: 1.6em;margin-bottom: 24px;">
-                    <span style="outline: 0px;letter-spacing: 0.5px;"><strong
-                            style="outline: 0px;color: rgb(171, 25, 66);font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;font-size: 14px;letter-spacing: normal;orphans: 4;caret-color: rgb(0, 122, 255);white-space-collapse: preserve;"><span
-                                leaf="">本文由蜗壳进阶联盟原创 未经允许 不得转载</span></strong></span></section>
-                <section
-                    style="margin-top: 8px;outline: 0px;letter-spacing: 0.578px;text-align: right;text-indent: 0em;line-height: 1.6em;">
-                    <span leaf=""><br></span></section>
-                <section
-                    style="margin-top: 8px;outline: 0px;letter-spacing: 0.578px;text-align: right;text-indent: 0em;line-height: 1.6em;">
-                    <span leaf=""><br></span></section>
-                <section
-                    style="margin-top: 8px;outline: 0px;letter-spacing: 0.578px;text-align: right;text-indent: 0em;line-height: 1.6em;">
-                    <span style="outline: 0px;letter-spacing: 0.5px;"><strong style="outline: 0px;"><span leaf="">采访、编辑
-                                | {interviewer}</span></strong></span></section>
-                <section
-                    style="margin-top: 8px;outline: 0px;letter-spacing: 0.578px;text-align: right;text-indent: 0em;line-height: 1.6em;">
-                    <span style="outline: 0px;letter-spacing: 0.5px;"><strong style="outline: 0px;"><span leaf="">线下承办 |
-                                {proofreader}</span></strong></span></section>
-                <section
-                    style="margin-top: 8px;outline: 0px;letter-spacing: 0.578px;text-align: right;text-indent: 0em;line-height: 1.6em;">
-                    <span style="outline: 0px;letter-spacing: 0.5px;"><strong style="outline: 0px;"><span
-                                leaf=""><br></span></strong></span></section>
-                <p
-                    style="outline: 0px;letter-spacing: 0.578px;text-align: right;text-indent: 0em;line-height: 1.6em;margin-top: 8px;">
-                    <span style="outline: 0px;letter-spacing: 0.5px;"><strong style="outline: 0px;"><span
-                                leaf=""><br></span></strong></span></p>
-            </section>
-            <p
-                style="outline: 0px;color: rgb(62, 62, 62);background-color: rgb(255, 255, 255);visibility: visible;margin-top: 8px;">
-                <span leaf=""><br></span></p>
-            <p
-                style="margin-bottom: 8px;outline: 0px;font-family: &quot;PingFang SC&quot;, system-ui, -apple-system, BlinkMacSystemFont, &quot;Helvetica Neue&quot;, &quot;Hiragino Sans GB&quot;, &quot;Microsoft YaHei UI&quot;, &quot;Microsoft YaHei&quot;, Arial, sans-serif;text-indent: 0em;letter-spacing: 0.578px;background-color: rgb(255, 255, 255);color: rgb(62, 62, 62);text-align: center;line-height: 1.6em;margin-top: 8px;">
-                <span
-                    style="outline: 0px;font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;orphans: 4;caret-color: rgb(0, 122, 255);white-space-collapse: preserve;color: rgb(44, 42, 143);font-size: 24px;font-weight: 700;text-decoration: underline;letter-spacing: 0.5px;"><span
-                        leaf="">&nbsp;主题摘要&nbsp;</span></span></p>
-            <p
-                style="margin-bottom: 8px;outline: 0px;font-family: &quot;PingFang SC&quot;, system-ui, -apple-system, BlinkMacSystemFont, &quot;Helvetica Neue&quot;, &quot;Hiragino Sans GB&quot;, &quot;Microsoft YaHei UI&quot;, &quot;Microsoft YaHei&quot;, Arial, sans-serif;text-indent: 0em;letter-spacing: 0.578px;background-color: rgb(255, 255, 255);color: rgb(62, 62, 62);text-align: center;line-height: 1.6em;margin-top: 8px;">
-                <span leaf=""><br></span></p>
-            {topics_summary}
-            <p
-                style="margin-top: 8px;margin-bottom: 16px;outline: 0px;font-family: &quot;PingFang SC&quot;, system-ui, -apple-system, BlinkMacSystemFont, &quot;Helvetica Neue&quot;, &quot;Hiragino Sans GB&quot;, &quot;Microsoft YaHei UI&quot;, &quot;Microsoft YaHei&quot;, Arial, sans-serif;text-indent: 0em;letter-spacing: 0.578px;background-color: rgb(255, 255, 255);color: rgb(62, 62, 62);text-align: center;line-height: 1.6em;">
-                <strong style="outline: 0px;"><span leaf="">...</span></strong></p>
-            <section
-                style="outline: 0px;font-family: &quot;PingFang SC&quot;, system-ui, -apple-system, BlinkMacSystemFont, &quot;Helvetica Neue&quot;, &quot;Hiragino Sans GB&quot;, &quot;Microsoft YaHei UI&quot;, &quot;Microsoft YaHei&quot;, Arial, sans-serif;letter-spacing: 0.544px;visibility: visible;">
-                <section powered-by="xiumi.us" style="outline: 0px;visibility: visible;">
-                    <section
-                        style="outline: 0px;font-family: &quot;PingFang SC&quot;, system-ui, -apple-system, BlinkMacSystemFont, &quot;Helvetica Neue&quot;, &quot;Hiragino Sans GB&quot;, &quot;Microsoft YaHei UI&quot;, &quot;Microsoft YaHei&quot;, Arial, sans-serif;letter-spacing: 0.578px;visibility: visible;margin-top: 8px;margin-bottom: 24px;">
-                        <span leaf=""
-                            style="outline: 0px;font-size: 15px;text-indent: 0em;color: rgb(0, 0, 0);letter-spacing: 0.5px;font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;orphans: 4;caret-color: rgb(0, 122, 255);white-space-collapse: preserve;"><br></span>
-                    </section>'''
-    
-    # 处理数据
-    guest_intro_html = format_guest_intro(data['guest_intro'])
-    topics_summary = generate_topics_summary(data['topics'])
-    
-    # 填充基础信息
-    html_content = html_template.format(
-        word_count=data['word_count'],
-        reading_time=data['reading_time'],
-        guest_intro=guest_intro_html,
-        interviewer=data['interviewer'],
-        proofreader=data['proofreader'],
-        topics_summary=topics_summary
-    )
-    
-    # 生成各章节内容
-    for section in data['main_sections']:
-        html_content += generate_section_html(section, data)
-    
-    # HTML结尾部分
-    html_footer = '''
-                </section>
-            </section>
-        </section>
-        <section style="padding-right: 10px;padding-left: 10px;outline: 0px;line-height: 1.6;visibility: visible;">
-            <section style="outline: 0px;visibility: visible;">
-                <p
-                    style="margin: 8px 8px 24px;outline: 0px;letter-spacing: 0.578px;text-indent: 0em;line-height: 1.6em;">
-                    <span leaf=""><br></span></p>
-                <p
-                    style="margin: 8px 8px 24px;outline: 0px;letter-spacing: 0.578px;text-indent: 0em;line-height: 1.6em;">
-                    <span
-                        style="outline: 0px;font-size: 15px;text-indent: 0em;white-space-collapse: preserve;letter-spacing: 0.5px;color: rgb(0, 0, 0);font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;orphans: 4;caret-color: rgb(0, 122, 255);"><strong
-                            style="outline: 0px;color: rgb(171, 25, 66);background-color: rgb(255, 255, 255);"><span
-                                leaf=""><img
-                                    data-src="https://mmbiz.qpic.cn/mmbiz_jpg/twW3euR3BMJaBWaicHQq4icagaiageoklRIx6gcXphTa66cohxibYDMvuWfJArLV6HTFoKT4Aibqia0QcnZbnqhaHF5g/640?wx_fmt=jpeg"
-                                    class="rich_pages wxw-img"
-                                    data-ratio="0.44722222222222224" data-s="300,640" data-type="png" data-w="1080"
-                                    style="caret-color: rgb(0, 0, 0); color: rgb(0, 0, 0); font-weight: 400; letter-spacing: normal; text-align: start; white-space-collapse: collapse; outline: 0px; width: 579px !important; visibility: visible !important; height: auto !important;"
-                                    data-croporisrc="https://mmbiz.qpic.cn/mmbiz_png/twW3euR3BMIMkk15K4JCJKHQWSxSeEqicOju9uRCAvQ8C9aMibgKt4VE48VDHMTYjhoOOM4ciaMOLzDCZyEsytSjg/640?wx_fmt=other&amp;from=appmsg&amp;tp=webp&amp;wxfrom=5&amp;wx_lazy=1&amp;wx_co=1"
-                                    data-cropx2="1080" data-cropy2="483.1088082901554" data-imgfileid="100000983"
-                                    data-original-style="caret-color: rgb(0, 0, 0);color: rgb(0, 0, 0);font-weight: 400;letter-spacing: normal;text-align: start;white-space-collapse: collapse;outline: 0px;width: 579px;visibility: visible !important;height: auto !important;"
-                                    data-index="7"
-                                    src="https://mmbiz.qpic.cn/mmbiz_jpg/twW3euR3BMJaBWaicHQq4icagaiageoklRIx6gcXphTa66cohxibYDMvuWfJArLV6HTFoKT4Aibqia0QcnZbnqhaHF5g/640?wx_fmt=jpeg&amp;tp=webp&amp;wxfrom=5&amp;wx_lazy=1"
-                                    _width="579px" alt="Image" data-report-img-idx="6" data-fail="0"></span></strong></span></p>
-                <p><span leaf=""><br></span></p>
-            </section>
-        </section>
-    </section>
-    <p style="display: none;"><mp-style-type data-value="3"></mp-style-type></p>
-</div>'''
-    
-    html_content += html_footer
-    
-    return html_content
+    out = []
+    render_article_into(out, data)
+    return ''.join(out)
 
 
 def read_data_from_file(filename):
@@ -388,22 +306,8 @@ def read_data_from_file(filename):
             # 简单解析 - 假设文件中有 simple_data = {...} 的格式
             if 'simple_data = {' in content:
                 start = content.find('simple_data = {') + len('simple_data = ')
-                # 找到对应的结束大括号
-                brace_count = 0
-                end = start
-                for i in range(start, len(content)):
-                    if content[i] == '{':
-                        brace_count += 1
-                    elif content[i] == '}':
-                        brace_count -= 1
-                        if brace_count == 0:
-                            end = i + 1
-                            break
-                
-                data_str = content[start:end]
-                # 使用 ast.literal_eval 安全地解析Python字典
-                import ast
-                return ast.literal_eval(data_str)
+                # 解析器在对应的结束大括号处停止，后面的内容会被忽略
+                return tolerant_json.loads(content[start:])
     except Exception as e:
         print(f"读取文件出错: {e}")
         return None
@@ -415,8 +319,7 @@ def main():
     # 新增逻辑：如果没有准备好simple_data，则读取json文件
     if not simple_data:
         try:
-            with open('data_example.json', 'r', encoding='utf-8') as f:
-                simple_data = json.load(f)
+            simple_data = tolerant_json.load_file('data_example.json')
             print("已从 data_example.json 读取数据。")
         except Exception as e:
             print(f"❌ 无法读取 data_example.json: {e}")
@@ -424,15 +327,14 @@ def main():
 
     if simple_data:
         print("正在生成微信公众号文章HTML...")
-        html_output = generate_wechat_article_html(simple_data)
         
-        # 保存到文件
+        # 边生成边保存到文件
         output_filename = 'wechat_article_generated.html'
         with open(output_filename, 'w', encoding='utf-8') as f:
-            f.write(html_output)
+            html_length = render_to(simple_data, f)
         
         print(f"✅ HTML文件已成功生成: {output_filename}")
-        print(f"📊 文件大小: {len(html_output):,} 字符")
+        print(f"📊 文件大小: {html_length:,} 字符")
         print(f"📝 文章信息:")
         print(f"   - 嘉宾: {simple_data['guest_name']}")
         print(f"   - 字数: {simple_data['word_count']}")
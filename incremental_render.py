@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+增量渲染
+把文章拆成开头（含主题摘要）、每个章节和结尾几个片段，按各自数据的哈希记录在输出HTML旁的片段索引中，
+重新渲染时只生成数据有变化的片段，其余直接从上一次的输出中复用。编辑改动一个回答后重跑只需要重新渲染一个章节；
+--watch 模式在JSON保存后立即更新HTML，用于实时预览。
+
+用法: python incremental_render.py interview_data.json [-o interview_article.html] [--watch]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from functools import lru_cache
+
+import emphasis
+import templates
+import generate_article
+import article_stats
+import tolerant_json
+import interview_model
+from checkpoint import hash_text, hash_file
+from metrics import record_file_written
+
+
+# 这些模块的代码改动后，缓存的片段全部失效
+RENDERER_MODULES = (generate_article, templates, emphasis, interview_model)
+
+
+@lru_cache(maxsize=None)
+def renderer_version():
+    """渲染器代码的哈希"""
+    return hash_text(*(hash_file(module.__file__) for module in RENDERER_MODULES))
+
+
+def fragment_index_path(html_path):
+    """HTML旁边的片段索引文件，如 interview_article.html -> interview_article.html.fragments.json"""
+    return f'{html_path}.fragments.json'
+
+
+def _payload(value):
+    return json.dumps(value, ensure_ascii=False)
+
+
+class IncrementalRenderer:
+    """
+    带片段缓存的文章渲染器
+
+    片段的键由渲染器代码版本、加粗短语表和片段数据共同决定。写出HTML时在旁边保存片段索引
+    （每个片段的键和长度），下次渲染时按索引把上一次的HTML切回各个片段直接复用，
+    只需读一次文件；keep_fragments为True时上一次渲染用到的片段同时保存在内存中，
+    watch模式下连续渲染不需要读磁盘。只渲染一次的渲染器不保留片段，内存峰值与直接渲染相当
+    """
+
+    def __init__(self, keep_fragments=True):
+        self.keep_fragments = keep_fragments
+        self.fragments = {}
+        self.layout = []
+        self.rendered = 0
+        self.reused = 0
+        self.previous_loaded = False
+
+    def load_previous(self, html_path):
+        """
+        从上一次输出的HTML和片段索引中恢复片段（HTML被手动修改过时忽略）
+
+        Returns:
+            int: 恢复的片段数
+        """
+        try:
+            with open(fragment_index_path(html_path), 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            with open(html_path, 'r', encoding='utf-8', newline='') as f:
+                html = f.read()
+        except (OSError, ValueError):
+            return 0
+        finally:
+            self.previous_loaded = True
+        if index.get('html_hash') != hashlib.sha256(html.encode('utf-8')).hexdigest():
+            return 0
+        position = 0
+        for key, length in index['fragments']:
+            self.fragments.setdefault(key, html[position:position + length])
+            position += length
+        return len(index['fragments'])
+
+    def _fragment(self, used, kind, payload, render):
+        """取出一个片段，之前没有渲染过时调用render()生成"""
+        key = hash_text(renderer_version(), generate_article.get_emphasis_matcher().fingerprint, kind, payload)
+        html = self.fragments.get(key)
+        if html is None:
+            html = render()
+            self.rendered += 1
+        else:
+            self.reused += 1
+        if used is not None:
+            used[key] = html
+        return key, html
+
+    def prerender_section(self, section, guest_name, index=0):
+        """提前渲染第index个章节（其余部分还没生成时调用），之后渲染整篇文章时直接复用"""
+        section = interview_model.Section.from_dict(section, ('main_sections', index), index)
+        self._fragment(
+            self.fragments, 'section', _payload([guest_name, section.to_dict()]),
+            lambda: generate_article.generate_section_html(section, guest_name)
+        )
+
+    def iter_fragments(self, data):
+        """按顺序产出文章的各个片段，输出与 generate_wechat_article_html 完全一致"""
+        interview = interview_model.coerce(data)
+        self.rendered = self.reused = 0
+        self.layout = []
+        used = {} if self.keep_fragments else None
+        # 主题摘要嵌在开头中，和开头的其他字段一起计算哈希
+        header_fields = [
+            getattr(interview, name)
+            for name in ('word_count', 'reading_time', 'guest_intro', 'interviewer', 'proofreader', 'topics')
+        ]
+
+        def render_header():
+            out = []
+            generate_article.render_header_into(out, interview)
+            return ''.join(out)
+
+        fragments = [('header', _payload(header_fields), render_header)]
+        # 章节中的回答带有嘉宾姓名，姓名改动后所有章节都需要重新渲染
+        fragments += [
+            ('section', _payload([interview.guest_name, section.to_dict()]),
+             lambda section=section: generate_article.generate_section_html(section, interview.guest_name))
+            for section in interview.main_sections
+        ]
+        fragments.append(('footer', '', lambda: templates.get_template('footer').render()))
+
+        for kind, payload, render in fragments:
+            key, html = self._fragment(used, kind, payload, render)
+            self.layout.append((key, len(html)))
+            yield html
+        # 只保留这次用到的片段，内存占用不会随编辑次数增长
+        self.fragments = used if used is not None else {}
+
+    def render(self, data):
+        """渲染为字符串"""
+        return ''.join(self.iter_fragments(data))
+
+    def write(self, data, html_path, reuse_previous=True):
+        """
+        渲染并写入html_path，同时更新片段索引
+        先写临时文件再替换，预览页面不会读到写了一半的文件
+
+        Returns:
+            int: 写入的字符数
+        """
+        # 先校验数据，不符合要求时不会留下写了一半的临时文件
+        data = interview_model.coerce(data)
+        if reuse_previous and not self.previous_loaded:
+            self.load_previous(html_path)
+        digest = hashlib.sha256()
+        written = 0
+        tmp_path = f'{html_path}.tmp'
+        # newline='' 保证文件内容与片段逐字一致，下次可以按长度切分
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            for fragment in self.iter_fragments(data):
+                f.write(fragment)
+                digest.update(fragment.encode('utf-8'))
+                written += len(fragment)
+        os.replace(tmp_path, html_path)
+        record_file_written(html_path)
+        index_path = fragment_index_path(html_path)
+        with open(f'{index_path}.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'html_hash': digest.hexdigest(), 'fragments': self.layout}, f)
+        os.replace(f'{index_path}.tmp', index_path)
+        return written
+
+    def summary(self):
+        """上一次渲染的片段统计"""
+        return f"重新渲染 {self.rendered} 个片段，复用 {self.reused} 个"
+
+
+def load_article(json_path):
+    """读取文章JSON，并在本地重新计算字数和阅读时间"""
+    data = tolerant_json.load_file(json_path)
+    article_stats.apply_stats(data)
+    return data
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _reload_glossary(glossary_path):
+    """加粗短语表改动后重新构建匹配器"""
+    phrases = list(generate_article.EMPHASIS_PATTERNS)
+    if os.path.exists(glossary_path):
+        phrases.extend(emphasis.load_glossary(glossary_path))
+    generate_article.set_emphasis_patterns(phrases)
+
+
+def render_once(renderer, json_path, html_path, reuse_previous=True):
+    """渲染一次并打印耗时，JSON有错误时打印原因并返回False"""
+    started = time.perf_counter()
+    try:
+        data = load_article(json_path)
+        renderer.write(data, html_path, reuse_previous)
+    except Exception as e:
+        print(f"❌ 渲染失败: {e}")
+        return False
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"✅ {html_path}: {renderer.summary()}，用时 {elapsed:.1f} ms")
+    return True
+
+
+def watch(renderer, json_path, html_path, interval=0.2):
+    """轮询JSON文件（和加粗短语表），保存后立即重新渲染，Ctrl+C退出"""
+    glossary_path = os.getenv('EMPHASIS_GLOSSARY')
+    watched = [json_path] + ([glossary_path] if glossary_path else [])
+    mtimes = {path: _mtime(path) for path in watched}
+    print(f"👀 正在监视 {', '.join(watched)}，保存后自动更新 {html_path}（Ctrl+C 退出）")
+    try:
+        while True:
+            time.sleep(interval)
+            changed = [path for path in watched if _mtime(path) != mtimes[path]]
+            if not changed:
+                continue
+            for path in changed:
+                mtimes[path] = _mtime(path)
+            if glossary_path in changed:
+                _reload_glossary(glossary_path)
+            if mtimes[json_path] is not None:
+                render_once(renderer, json_path, html_path)
+    except KeyboardInterrupt:
+        print("\n👋 已停止监视")
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="增量渲染文章HTML：只重新生成数据有变化的章节")
+    parser.add_argument('json_path', help="文章JSON文件路径")
+    parser.add_argument('-o', '--output', default='interview_article.html', help="输出HTML路径（默认 interview_article.html）")
+    parser.add_argument('--watch', action='store_true', help="监视JSON文件，保存后自动重新渲染")
+    parser.add_argument('--interval', type=float, default=0.2, help="监视模式的检查间隔（秒）")
+    parser.add_argument('--no-cache', action='store_true', help="忽略上一次输出的片段，全部重新渲染")
+    return parser.parse_args()
+
+
+def main():
+    """主函数"""
+    args = parse_args()
+    from dotenv import load_dotenv
+    load_dotenv()
+    # 只有watch模式需要在内存中保留片段
+    renderer = IncrementalRenderer(keep_fragments=args.watch)
+    ok = render_once(renderer, args.json_path, args.output, reuse_previous=not args.no_cache)
+    if args.watch:
+        watch(renderer, args.json_path, args.output, args.interval)
+    elif not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+访谈数据模型
+把文章JSON一次遍历校验并规整为 Interview / Section / SubSection 对象，渲染器只读取这些对象的属性。
+模型输出缺字段或类型不对时，在步骤2结束时就报出具体位置（如 main_sections[2].sub_sections[1].answer），
+而不是渲染到一半才抛出 KeyError。
+
+对象使用 __slots__，连续重复的小标题共用同一个字符串，批量任务在内存中保留大量文章时
+比原始的嵌套字典省内存。
+
+用法: python interview_model.py interview_data.json [更多JSON...]   # 校验文章JSON
+"""
+
+import re
+import sys
+import argparse
+
+import article_stats
+import tolerant_json
+from tolerant_json import format_path
+
+
+# 字符串形式的数字，如 "4,521"、"约15分钟"
+NUMBER_PATTERN = re.compile(r'\d[\d,，]*')
+
+
+class InterviewDataError(ValueError):
+    """文章数据不符合要求，path 为出错字段的位置"""
+
+    def __init__(self, path, message):
+        self.path = list(path)
+        super().__init__(f"{format_path(self.path) or '文章数据'}: {message}")
+
+
+def _text(value, path, required=False):
+    """字符串字段：None 视为空字符串，必填字段不能为空"""
+    if value is None:
+        value = ''
+    elif not isinstance(value, str):
+        raise InterviewDataError(path, f"应为字符串，实际为 {type(value).__name__}")
+    if required and not value.strip():
+        raise InterviewDataError(path, "不能为空")
+    return value
+
+
+def _count(value, path):
+    """字数、阅读时间：接受整数或含数字的字符串，缺失时返回None"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise InterviewDataError(path, f"应为数字，实际为 {type(value).__name__}")
+    if isinstance(value, str):
+        match = NUMBER_PATTERN.search(value)
+        if not match:
+            raise InterviewDataError(path, f"无法识别的数字 {value!r}")
+        value = re.sub(r'[,，]', '', match.group())
+    return int(value)
+
+
+def _object(value, path):
+    if not isinstance(value, dict):
+        raise InterviewDataError(path, f"应为对象，实际为 {type(value).__name__}")
+    return value
+
+
+def _items(value, path, name):
+    if not isinstance(value, list) or not value:
+        raise InterviewDataError(path, f"至少需要一个{name}")
+    return value
+
+
+def _sub_section_fields(item, path):
+    """逐个字段检查一组问答，返回 (小标题, 问题, 回答)"""
+    item = _object(item, path)
+    return (
+        _text(item.get('subtitle'), (*path, 'subtitle')),
+        _text(item.get('question'), (*path, 'question'), required=True),
+        _text(item.get('answer'), (*path, 'answer'), required=True)
+    )
+
+
+class SubSection:
+    """一组问答"""
+
+    __slots__ = ('subtitle', 'question', 'answer')
+
+    def __init__(self, subtitle, question, answer):
+        self.subtitle = subtitle
+        self.question = question
+        self.answer = answer
+
+    def to_dict(self):
+        return {'subtitle': self.subtitle, 'question': self.question, 'answer': self.answer}
+
+
+class Section:
+    """一个章节"""
+
+    __slots__ = ('id', 'title', 'sub_sections')
+
+    def __init__(self, id, title, sub_sections):
+        self.id = id
+        self.title = title
+        self.sub_sections = sub_sections
+
+    @classmethod
+    def from_dict(cls, value, path=(), index=0):
+        """
+        校验并规整一个章节
+        缺少 id 时按位置编号；小标题为空时沿用上一组问答的小标题（渲染时只在小标题变化处显示一次），
+        与上一组相同的小标题共用同一个字符串
+        """
+        value = _object(value, path)
+        section_id = value.get('id')
+        if section_id is None or section_id == '':
+            section_id = f'{index + 1:02d}'
+        elif isinstance(section_id, int) and not isinstance(section_id, bool):
+            section_id = f'{section_id:02d}'
+        else:
+            section_id = _text(section_id, (*path, 'id')).strip()
+        # 重叠执行时第一个片段开头的章节可能没有标题，这里不强制要求
+        title = _text(value.get('title'), (*path, 'title')).strip()
+
+        sub_path = (*path, 'sub_sections')
+        sub_sections = []
+        subtitle = ''
+        for sub_index, item in enumerate(_items(value.get('sub_sections'), sub_path, '问答')):
+            # 常见情况（字段都是字符串，问题和回答非空）只做一次判断，否则逐个字段检查并报出具体位置
+            if type(item) is dict:
+                current, question, answer = item.get('subtitle'), item.get('question'), item.get('answer')
+            else:
+                current = question = answer = None
+            if not (type(question) is str and type(answer) is str and question.strip() and answer.strip()
+                    and (current is None or type(current) is str)):
+                current, question, answer = _sub_section_fields(item, (*sub_path, sub_index))
+            current = current.strip() if current else ''
+            if current and current != subtitle:
+                subtitle = current
+            sub_sections.append(SubSection(subtitle, question, answer))
+        return cls(section_id, title, sub_sections)
+
+    def to_dict(self):
+        return {'id': self.id, 'title': self.title, 'sub_sections': [item.to_dict() for item in self.sub_sections]}
+
+
+class Interview:
+    """一篇访谈文章"""
+
+    __slots__ = ('guest_name', 'guest_intro', 'interviewer', 'proofreader', 'word_count', 'reading_time',
+                 'topics', 'main_sections')
+
+    def __init__(self, guest_name, guest_intro, interviewer, proofreader, word_count, reading_time,
+                 topics, main_sections):
+        self.guest_name = guest_name
+        self.guest_intro = guest_intro
+        self.interviewer = interviewer
+        self.proofreader = proofreader
+        self.word_count = word_count
+        self.reading_time = reading_time
+        self.topics = topics
+        self.main_sections = main_sections
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        一次遍历校验并规整文章数据，不符合要求时抛出 InterviewDataError
+
+        字数和阅读时间可以是整数或字符串（"4,521"），缺失时在本地统计；未知字段被忽略
+        """
+        data = _object(data, ())
+        sections_path = ('main_sections',)
+        main_sections = [
+            Section.from_dict(section, (*sections_path, index), index)
+            for index, section in enumerate(_items(data.get('main_sections'), sections_path, '章节'))
+        ]
+        topics = data.get('topics')
+        if topics is None:
+            topics = []
+        elif not isinstance(topics, list):
+            raise InterviewDataError(('topics',), f"应为字符串列表，实际为 {type(topics).__name__}")
+        topics = [topic.strip() for index, topic in enumerate(topics) if _text(topic, ('topics', index)).strip()]
+
+        word_count = _count(data.get('word_count'), ('word_count',))
+        reading_time = _count(data.get('reading_time'), ('reading_time',))
+        if word_count is None or reading_time is None:
+            stats = article_stats.compute_stats(data)
+            word_count = stats['word_count'] if word_count is None else word_count
+            reading_time = stats['reading_time'] if reading_time is None else reading_time
+
+        return cls(
+            _text(data.get('guest_name'), ('guest_name',), required=True).strip(),
+            _text(data.get('guest_intro'), ('guest_intro',)),
+            _text(data.get('interviewer'), ('interviewer',)),
+            _text(data.get('proofreader'), ('proofreader',)),
+            word_count,
+            reading_time,
+            topics,
+            main_sections
+        )
+
+    def to_dict(self):
+        """转换为与原有JSON格式一致的字典（字数和阅读时间为字符串）"""
+        return {
+            'guest_name': self.guest_name,
+            'guest_intro': self.guest_intro,
+            'interviewer': self.interviewer,
+            'proofreader': self.proofreader,
+            'word_count': str(self.word_count),
+            'reading_time': str(self.reading_time),
+            'topics': list(self.topics),
+            'main_sections': [section.to_dict() for section in self.main_sections]
+        }
+
+
+def coerce(data):
+    """渲染器的入口：字典先校验转换为 Interview，已经是 Interview 的直接返回"""
+    return data if isinstance(data, Interview) else Interview.from_dict(data)
+
+
+def normalize(data):
+    """校验并规整文章数据，返回规整后的字典"""
+    return Interview.from_dict(data).to_dict()
+
+
+def loads(text):
+    """从JSON文本（容错解析）加载文章"""
+    return Interview.from_dict(tolerant_json.loads(text))
+
+
+def load_file(path):
+    """从JSON文件（容错解析）加载文章"""
+    return Interview.from_dict(tolerant_json.load_file(path))
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="校验文章JSON")
+    parser.add_argument('json_paths', nargs='+', help="文章JSON文件路径（可以有多个）")
+    return parser.parse_args()
+
+
+def main():
+    """主函数"""
+    args = parse_args()
+    failed = 0
+    for path in args.json_paths:
+        try:
+            interview = load_file(path)
+        except (OSError, ValueError) as e:
+            print(f"❌ {path}: {e}")
+            failed += 1
+            continue
+        questions = sum(len(section.sub_sections) for section in interview.main_sections)
+        print(f"✅ {path}: {interview.guest_name}，{len(interview.main_sections)} 个章节，{questions} 个问答")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
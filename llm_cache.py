@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+大模型调用结果的本地磁盘缓存
+以 (system prompt, 用户内容, 模型, temperature) 的哈希为键，内容寻址存储模型返回结果
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+
+
+class LLMCache:
+    """基于文件的大模型响应缓存，支持按大小和时间淘汰"""
+
+    def __init__(self, cache_dir='.llm_cache', max_size_mb=200, max_age_days=30, refresh=False):
+        """
+        Args:
+            cache_dir: 缓存目录
+            max_size_mb: 缓存总大小上限（MB），超出后淘汰最久未使用的条目
+            max_age_days: 条目最长未使用天数，超过后视为过期
+            refresh: 为True时忽略已有缓存重新请求，但仍写入新结果
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.max_age = max_age_days * 24 * 3600
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(prompt, content, model_name, temperature):
+        """计算请求的内容哈希"""
+        payload = json.dumps(
+            [prompt, content, model_name, temperature],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return self.cache_dir / key[:2] / f'{key}.json'
+
+    def get(self, key):
+        """读取缓存，未命中返回None"""
+        path = self._path(key)
+        entry = None
+        if not self.refresh:
+            try:
+                if not self.max_age or time.time() - path.stat().st_mtime <= self.max_age:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        entry = json.load(f)
+            except (OSError, ValueError):
+                entry = None
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        # 更新访问时间，淘汰时按最近使用排序
+        os.utime(path, None)
+        with self._lock:
+            self.hits += 1
+        return entry['response']
+
+    def set(self, key, response, model_name=None):
+        """写入缓存（先写临时文件再替换，避免并发写入产生残缺文件）"""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created': time.time(),
+                'model': model_name,
+                'response': response
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def discard(self, key):
+        """删除单条缓存（例如模型返回内容无法解析时）"""
+        self._path(key).unlink(missing_ok=True)
+
+    def evict(self):
+        """淘汰过期条目，并在超出大小上限时按最近访问时间从旧到新删除"""
+        if not self.cache_dir.exists():
+            return 0
+        now = time.time()
+        entries = []
+        removed = 0
+        for path in self.cache_dir.glob('*/*.json'):
+            stat = path.stat()
+            if self.max_age and now - stat.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                removed += 1
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        if self.max_size and total > self.max_size:
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_size:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+        return removed
+
+    def summary(self):
+        """缓存命中统计"""
+        return f"命中 {self.hits} 次，未命中 {self.misses} 次"
+
+
+def open_cache(config, no_cache=False, refresh=False):
+    """
+    按 load_config() 的配置创建缓存（对应命令行的 --no-cache / --refresh）
+
+    Returns:
+        LLMCache: no_cache为True时返回None，不读取也不写入缓存
+    """
+    if no_cache:
+        return None
+    return LLMCache(
+        config['cache_dir'],
+        max_size_mb=config['cache_max_mb'],
+        max_age_days=config['cache_max_age_days'],
+        refresh=refresh
+    )
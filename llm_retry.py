@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+模型请求的重试、退避和熔断
+按指数退避加随机抖动重试限流、超时和服务端错误（优先遵循服务商返回的 Retry-After），
+并为每个模型维护熔断器：连续失败过多时暂时跳过该模型，改用备选模型
+"""
+
+import time
+import random
+import asyncio
+from email.utils import parsedate_to_datetime
+
+
+# 可以重试的HTTP状态码：请求超时、冲突、限流和服务端错误
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+def parse_models(value):
+    """把 "model-a, model-b" 或列表解析为按顺序尝试的模型名列表"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [name.strip() for name in value if name and name.strip()]
+
+
+def is_retryable(error):
+    """限流、超时、连接错误和5xx错误可以重试；参数错误、鉴权失败等重试也不会成功"""
+    # 只有发出过请求才会走到这里，此时 openai 已经导入
+    import openai
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS or error.status_code >= 500
+    return isinstance(error, (openai.APIConnectionError, asyncio.TimeoutError, ConnectionError, TimeoutError))
+
+
+def retry_after_seconds(error):
+    """读取错误响应中的 Retry-After（秒数或HTTP日期）或 retry-after-ms，没有时返回None"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not headers:
+        return None
+    value = headers.get('retry-after-ms')
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def describe_error(error):
+    """简短描述一次请求错误，用于日志"""
+    status = getattr(error, 'status_code', None)
+    name = type(error).__name__
+    return f"{name} {status}" if status else name
+
+
+class RetryPolicy:
+    """指数退避加全抖动：第n次重试等待 [0, min(max_delay, base_delay * 2^n)] 内的随机时长"""
+
+    def __init__(self, max_retries=5, base_delay=1.0, max_delay=60.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def next_delay(self, attempt, error):
+        """
+        第attempt次失败后（从0开始）需要等待的秒数
+
+        Returns:
+            float | None: 等待秒数；不应重试（错误不可重试或次数用尽）时为None
+        """
+        if attempt >= self.max_retries or not is_retryable(error):
+            return None
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+class CircuitBreaker:
+    """
+    单个模型的熔断器
+    连续失败 failure_threshold 次后熔断 reset_timeout 秒，期间直接跳过该模型；
+    到时后只放行第一个调用方作为试探请求，试探有结果之前其他调用方仍被拒绝，成功则恢复，失败则重新熔断
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def allow(self):
+        """当前是否可以向该模型发请求（熔断到时后第一个调用方得到True，成为试探请求）"""
+        if self.opened_at is None:
+            return True
+        if self.probing or self.remaining() > 0:
+            return False
+        self.probing = True
+        return True
+
+    def release(self):
+        """请求没有得出模型是否恢复的结论（不可重试的错误或被取消）时调用，让下一个调用方重新试探"""
+        self.probing = False
+
+    def remaining(self):
+        """熔断剩余秒数，未熔断时为0"""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self):
+        """记录一次失败，返回这次失败是否触发了熔断"""
+        self.failures += 1
+        half_open = self.opened_at is not None
+        self.probing = False
+        if self.failure_threshold and (half_open or self.failures >= self.failure_threshold):
+            self.opened_at = time.monotonic()
+            return True
+        return False
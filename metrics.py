@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Pipeline运行指标
+按阶段记录耗时、模型调用次数、prompt/completion token数、重试次数、缓存命中次数和写出的字节数，
+可以输出为JSON Lines或Prometheus文本格式，并在运行结束时打印汇总表
+"""
+
+import os
+import json
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+
+
+# 当前正在执行的 (PipelineMetrics, 阶段名)，asyncio任务和 asyncio.to_thread 都会继承
+_current = contextvars.ContextVar('pipeline_metrics_stage', default=(None, None))
+
+# 不在任何阶段中的模型调用和文件写入记在这个名字下
+OTHER_STAGE = 'other'
+
+FIELDS = (
+    'wall_seconds', 'runs', 'llm_calls', 'cache_hits', 'prompt_tokens',
+    'completion_tokens', 'retries', 'bytes_written'
+)
+
+# Prometheus指标名和说明
+PROMETHEUS_METRICS = {
+    'wall_seconds': ('interview_pipeline_stage_seconds_total', '阶段累计耗时（秒）'),
+    'runs': ('interview_pipeline_stage_runs_total', '阶段执行次数'),
+    'llm_calls': ('interview_pipeline_llm_calls_total', '模型调用次数（含缓存命中）'),
+    'cache_hits': ('interview_pipeline_llm_cache_hits_total', '本地缓存命中次数'),
+    'prompt_tokens': ('interview_pipeline_prompt_tokens_total', 'prompt token数'),
+    'completion_tokens': ('interview_pipeline_completion_tokens_total', 'completion token数'),
+    'retries': ('interview_pipeline_retries_total', '重试和补全请求次数'),
+    'bytes_written': ('interview_pipeline_bytes_written_total', '写出的文件字节数'),
+}
+
+
+class PipelineMetrics:
+    """一次运行（或一个批次）的指标，按阶段累计，可在多个协程和线程中同时记录"""
+
+    def __init__(self):
+        self.stages = {}
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self._lock = threading.Lock()
+
+    def _add(self, stage, **values):
+        stage = stage or OTHER_STAGE
+        with self._lock:
+            record = self.stages.setdefault(stage, dict.fromkeys(FIELDS, 0))
+            for name, value in values.items():
+                record[name] += value
+
+    @contextmanager
+    def stage(self, name):
+        """在with块中执行的模型调用、文件写入和耗时都记到阶段name下"""
+        token = _current.set((self, name))
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, wall_seconds=time.perf_counter() - started, runs=1)
+            _current.reset(token)
+
+    def record_llm_call(self, prompt_tokens=0, completion_tokens=0, cached=False):
+        """记录一次模型调用（缓存命中时token数记为0）"""
+        self._add(current_stage(), llm_calls=1, cache_hits=int(cached),
+                  prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+    def record_retry(self, count=1):
+        """记录一次重试或补全请求"""
+        self._add(current_stage(), retries=count)
+
+    def record_bytes(self, count):
+        """记录写出的字节数"""
+        self._add(current_stage(), bytes_written=count)
+
+    def totals(self):
+        """所有阶段的合计"""
+        totals = dict.fromkeys(FIELDS, 0)
+        with self._lock:
+            for record in self.stages.values():
+                for name in FIELDS:
+                    totals[name] += record[name]
+        return totals
+
+    def summary_lines(self):
+        """汇总表的各行文本"""
+        header = f"   {'阶段':<10}{'耗时':>9}{'调用':>6}{'缓存':>6}{'重试':>6}{'输入tokens':>12}{'输出tokens':>12}{'写出':>10}"
+        lines = [header]
+        with self._lock:
+            rows = list(self.stages.items())
+        for name, record in rows + [('合计', self.totals())]:
+            lines.append(
+                f"   {name:<10}{record['wall_seconds']:>8.1f}s{record['llm_calls']:>6}{record['cache_hits']:>6}"
+                f"{record['retries']:>6}{record['prompt_tokens']:>12,}{record['completion_tokens']:>12,}"
+                f"{_format_bytes(record['bytes_written']):>10}"
+            )
+        return lines
+
+    def print_summary(self):
+        """打印各阶段指标汇总表"""
+        print("\n⏱️ 运行指标:")
+        for line in self.summary_lines():
+            print(line)
+
+    def write_jsonl(self, path, **labels):
+        """以JSON Lines格式追加写入，每个阶段一行，labels会加到每一行中（如录音稿路径、模型）"""
+        with self._lock:
+            rows = [dict(stage=name, **record) for name, record in self.stages.items()]
+        with open(path, 'a', encoding='utf-8') as f:
+            for row in rows:
+                row = {'ts': self.started_at, **labels, **row}
+                row['wall_seconds'] = round(row['wall_seconds'], 3)
+                f.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+    def prometheus_text(self, **labels):
+        """Prometheus文本格式的指标"""
+        with self._lock:
+            rows = list(self.stages.items())
+        lines = []
+        for field, (metric, help_text) in PROMETHEUS_METRICS.items():
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for name, record in rows:
+                label_text = ','.join(f'{key}="{_escape_label(value)}"' for key, value in {**labels, 'stage': name}.items())
+                lines.append(f"{metric}{{{label_text}}} {record[field]:g}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path, **labels):
+        """以Prometheus文本格式覆盖写入（适合 node_exporter 的 textfile collector）"""
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text(**labels))
+        os.replace(tmp_path, path)
+
+    def write(self, path, **labels):
+        """按扩展名选择格式：.prom 为Prometheus文本，其余为JSON Lines"""
+        if path.endswith('.prom'):
+            self.write_prometheus(path, **labels)
+        else:
+            self.write_jsonl(path, **labels)
+
+
+def current_stage():
+    """当前阶段名，不在任何阶段中时为 OTHER_STAGE"""
+    return _current.get()[1] or OTHER_STAGE
+
+
+def record_file_written(path):
+    """记录当前阶段写出的文件大小（不在任何阶段中时忽略）"""
+    metrics = _current.get()[0]
+    if metrics is not None:
+        try:
+            metrics.record_bytes(os.path.getsize(path))
+        except OSError:
+            pass
+
+
+def _format_bytes(count):
+    for unit in ('B', 'KB', 'MB'):
+        if count < 1024:
+            return f"{count:.0f}{unit}" if unit == 'B' else f"{count:.1f}{unit}"
+        count /= 1024
+    return f"{count:.1f}GB"
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
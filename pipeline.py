@@ -5,16 +5,18 @@
 """
 
 import os
-import json
-import yaml
 import sys
-from pathlib import Path
-from dotenv import load_dotenv
-from openai import OpenAI
-from generate_article import generate_wechat_article_html
+import asyncio
+import argparse
+import async_pipeline
+from async_pipeline import LLMEngine
+from llm_cache import open_cache
+from checkpoint import STAGES
+from metrics import PipelineMetrics
 
 def load_config():
     """加载环境配置"""
+    from dotenv import load_dotenv
     load_dotenv()
     
     api_key = os.getenv('API_KEY')
@@ -27,112 +29,107 @@ def load_config():
     return {
         'api_key': api_key,
         'base_url': base_url,
-        'model_name': model_name
+        'model_name': model_name,
+        'chunk_tokens': int(os.getenv('CHUNK_TOKENS', '4000')),
+        'chunk_overlap': int(os.getenv('CHUNK_OVERLAP', '1')),
+        'max_concurrency': int(os.getenv('MAX_CONCURRENCY', '4')),
+        'rate_limit_rpm': int(os.getenv('RATE_LIMIT_RPM', '0')),
+        'rate_limit_tpm': int(os.getenv('RATE_LIMIT_TPM', '0')),
+        'cache_dir': os.getenv('LLM_CACHE_DIR', '.llm_cache'),
+        'cache_max_mb': float(os.getenv('LLM_CACHE_MAX_MB', '200')),
+        'cache_max_age_days': float(os.getenv('LLM_CACHE_MAX_AGE_DAYS', '30')),
+        'filler_lexicon': os.getenv('FILLER_LEXICON') or None,
+        'context_tokens': int(os.getenv('CONTEXT_TOKENS', '128000')),
+        'auto_chunk': os.getenv('AUTO_CHUNK', '1') == '1',
+        # 各步骤按顺序尝试的模型（逗号分隔），默认使用MODEL_NAME
+        'models': {
+            'verbatim': os.getenv('STEP1_MODEL_NAME') or model_name,
+            'json': os.getenv('STEP2_MODEL_NAME') or model_name
+        },
+        'request_timeout': float(os.getenv('REQUEST_TIMEOUT', '600')),
+        'max_retries': int(os.getenv('MAX_RETRIES', '5')),
+        'retry_base_delay': float(os.getenv('RETRY_BASE_DELAY', '1')),
+        'retry_max_delay': float(os.getenv('RETRY_MAX_DELAY', '60')),
+        'breaker_threshold': int(os.getenv('BREAKER_THRESHOLD', '5')),
+        'breaker_reset': float(os.getenv('BREAKER_RESET_SECONDS', '60')),
+        # 文章库路径，设置后每次生成的文章都存入文章库（见 archive.py）
+        'archive_db': os.getenv('ARCHIVE_DB') or None,
+        # 步骤3在HTML之外同时导出的格式（逗号分隔，可选 md、txt、outline，见 article_export.py）
+        'export_formats': [name.strip() for name in os.getenv('EXPORT_FORMATS', '').split(',') if name.strip()]
     }
 
-def load_prompts():
+def load_prompts(path='prompt.yaml'):
     """加载prompt配置"""
-    with open('prompt.yaml', 'r', encoding='utf-8') as f:
+    import yaml
+    with open(path, 'r', encoding='utf-8') as f:
         config = yaml.safe_load(f)
     return config['prompts']
 
-def call_llm(client, prompt, content, model_name):
-    """调用大语言模型"""
-    try:
-        response = client.chat.completions.create(
-            model=model_name,
-            messages=[
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": content}
-            ],
-            temperature=0.3
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        print(f"❌ API调用失败: {e}")
-        raise
+async def _run_with_engine(config, cache, work, metrics=None):
+    """创建共享引擎执行一段异步任务，结束后关闭连接池"""
+    async with LLMEngine(config, cache=cache, metrics=metrics) as engine:
+        return await work(engine)
 
-def step1_transcript_to_verbatim(txt_path, config, prompts):
-    """步骤1: 录音稿转逐字稿"""
-    print("🎯 步骤1: 录音稿转逐字稿...")
-    
-    # 读取录音稿
-    try:
-        with open(txt_path, 'r', encoding='utf-8') as f:
-            transcript = f.read()
-    except Exception as e:
-        print(f"❌ 无法读取录音稿文件: {e}")
-        raise
-    
-    # 调用大模型
-    client = OpenAI(api_key=config['api_key'], base_url=config['base_url'])
-    prompt = prompts['transcript_to_verbatim']['content']
-    
-    verbatim = call_llm(client, prompt, transcript, config['model_name'])
-    
-    # 保存逐字稿
-    verbatim_path = txt_path.replace('.txt', '_verbatim.txt')
-    with open(verbatim_path, 'w', encoding='utf-8') as f:
-        f.write(verbatim)
-    
-    print(f"✅ 逐字稿已保存: {verbatim_path}")
-    return verbatim, verbatim_path
+def step1_transcript_to_verbatim(txt_path, config, prompts, chunked=False, stream=False, clean=False, local_only=False,
+                                 cache=None, output_dir=None):
+    """步骤1: 录音稿转逐字稿（同步封装）"""
+    return asyncio.run(_run_with_engine(config, cache, lambda engine: async_pipeline.step1_transcript_to_verbatim(
+        engine, txt_path, prompts, chunked=chunked, stream=stream, clean=clean, local_only=local_only,
+        output_dir=output_dir
+    )))
 
-def step2_verbatim_to_json(verbatim, config, prompts):
-    """步骤2: 逐字稿转JSON"""
-    print("🎯 步骤2: 逐字稿转JSON...")
-    
-    # 调用大模型
-    client = OpenAI(api_key=config['api_key'], base_url=config['base_url'])
-    prompt = prompts['verbatim_to_json']['content']
-    
-    json_content = call_llm(client, prompt, verbatim, config['model_name'])
-    
-    # 解析JSON
-    try:
-        # 提取JSON内容（如果模型返回了额外的文本）
-        json_start = json_content.find('{')
-        json_end = json_content.rfind('}') + 1
-        if json_start != -1 and json_end > json_start:
-            json_content = json_content[json_start:json_end]
-        
-        data = json.loads(json_content)
-    except Exception as e:
-        print(f"❌ JSON解析失败: {e}")
-        print("原始返回内容:")
-        print(json_content)
-        raise
-    
-    # 保存JSON
-    json_path = 'interview_data.json'
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    
-    print(f"✅ JSON数据已保存: {json_path}")
-    return data, json_path
+def step2_verbatim_to_json(verbatim, config, prompts, by_section=False, stream=False, cache=None, output_dir=None):
+    """步骤2: 逐字稿转JSON（同步封装）"""
+    return asyncio.run(_run_with_engine(config, cache, lambda engine: async_pipeline.step2_verbatim_to_json(
+        engine, verbatim, prompts, by_section=by_section, stream=stream, output_dir=output_dir
+    )))
 
-def step3_json_to_html(data):
-    """步骤3: JSON转HTML"""
-    print("🎯 步骤3: JSON转HTML...")
-    
-    # 生成HTML
-    html_content = generate_wechat_article_html(data)
-    
-    # 保存HTML
-    html_path = 'interview_article.html'
-    with open(html_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    
-    print(f"✅ HTML文章已生成: {html_path}")
-    return html_path
+def step3_json_to_html(data, output_dir=None):
+    """步骤3: JSON转HTML（同步封装）"""
+    return asyncio.run(async_pipeline.step3_json_to_html(data, output_dir=output_dir))
+
+def run_pipeline(txt_path, config, prompts, chunked=False, stream=False, by_section=False, clean=False, local_only=False,
+                 cache=None, from_stage=None, to_stage=None, output_dir=None, metrics=None, overlap=False):
+    """按阶段执行pipeline（同步封装，参数和返回值见 async_pipeline.run_pipeline；metrics用于收集运行指标）"""
+    return asyncio.run(_run_with_engine(config, cache, lambda engine: async_pipeline.run_pipeline(
+        engine, txt_path, prompts,
+        chunked=chunked,
+        stream=stream,
+        by_section=by_section,
+        clean=clean,
+        local_only=local_only,
+        from_stage=from_stage,
+        to_stage=to_stage,
+        output_dir=output_dir,
+        overlap=overlap
+    ), metrics=metrics))
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="录音稿处理Pipeline")
+    parser.add_argument('txt_path', help="录音稿txt文件路径")
+    parser.add_argument('--chunked', action='store_true', help="分块并发转写长录音稿")
+    parser.add_argument('--chunk-tokens', type=int, help="每个片段的token预算（默认读取CHUNK_TOKENS）")
+    parser.add_argument('--concurrency', type=int, help="最大并发请求数（默认读取MAX_CONCURRENCY）")
+    parser.add_argument('--stream', action='store_true', help="流式生成逐字稿和JSON，边生成边写入文件，中断后可继续")
+    parser.add_argument('--by-section', action='store_true', help="按章节并发提取JSON：先生成章节大纲，再并发提取各章节")
+    parser.add_argument('--overlap', action='store_true', help="三个步骤重叠执行：逐字稿边生成边切成片段并发提取JSON，章节提取完立即渲染")
+    parser.add_argument('--clean', action='store_true', help="调用模型前先在本地预清洗录音稿（删除语气词、合并重复、统一发言人标记）")
+    parser.add_argument('--local-only', action='store_true', help="录音稿已经很干净时使用：直接把录音稿（加 --clean 时为预清洗后的）作为逐字稿，不调用模型")
+    parser.add_argument('--no-cache', action='store_true', help="不读取也不写入本地LLM缓存")
+    parser.add_argument('--refresh', action='store_true', help="忽略已有缓存重新请求，并更新缓存")
+    parser.add_argument('--from-stage', choices=STAGES, help="从指定阶段开始强制重新执行，之前的阶段复用已有输出")
+    parser.add_argument('--to-stage', choices=STAGES, help="执行完指定阶段后停止")
+    parser.add_argument('--output-dir', help="输出目录（默认逐字稿写到录音稿旁，JSON和HTML写到当前目录）")
+    parser.add_argument('--export', help="步骤3同时导出的其他格式，逗号分隔：md、txt、outline（默认读取EXPORT_FORMATS）")
+    parser.add_argument('--archive', help="把结果存入这个文章库（默认读取ARCHIVE_DB，见 archive.py）")
+    parser.add_argument('--metrics-out', help="运行指标输出文件：.prom 为Prometheus文本格式，其他扩展名为JSON Lines（追加写入）")
+    return parser.parse_args()
 
 def main():
     """主函数"""
-    if len(sys.argv) != 2:
-        print("用法: python pipeline.py <录音稿txt文件路径>")
-        sys.exit(1)
-    
-    txt_path = sys.argv[1]
+    args = parse_args()
+    txt_path = args.txt_path
     
     # 检查文件是否存在
     if not os.path.exists(txt_path):
@@ -142,24 +139,41 @@ def main():
     print("🚀 开始处理pipeline...")
     print(f"📁 输入文件: {txt_path}")
     
+    metrics = PipelineMetrics()
     try:
         # 加载配置
         config = load_config()
         prompts = load_prompts()
+        if args.chunk_tokens:
+            config['chunk_tokens'] = args.chunk_tokens
+        if args.concurrency:
+            config['max_concurrency'] = args.concurrency
+        if args.archive:
+            config['archive_db'] = args.archive
+        if args.export:
+            config['export_formats'] = [name.strip() for name in args.export.split(',') if name.strip()]
+        cache = open_cache(config, no_cache=args.no_cache, refresh=args.refresh)
         
-        # 步骤1: 录音稿转逐字稿
-        verbatim, verbatim_path = step1_transcript_to_verbatim(txt_path, config, prompts)
-        
-        # 步骤2: 逐字稿转JSON
-        data, json_path = step2_verbatim_to_json(verbatim, config, prompts)
-        
-        # 步骤3: JSON转HTML
-        html_path = step3_json_to_html(data)
+        result = run_pipeline(
+            txt_path, config, prompts,
+            chunked=args.chunked,
+            stream=args.stream,
+            by_section=args.by_section,
+            clean=args.clean,
+            local_only=args.local_only,
+            cache=cache,
+            from_stage=args.from_stage,
+            to_stage=args.to_stage,
+            output_dir=args.output_dir,
+            metrics=metrics,
+            overlap=args.overlap
+        )
+        data = result['data'] or {}
         
         print("\n🎉 Pipeline执行完成!")
-        print(f"📝 逐字稿: {verbatim_path}")
-        print(f"📋 JSON数据: {json_path}")
-        print(f"🌐 HTML文章: {html_path}")
+        print(f"📝 逐字稿: {result['verbatim_path']}")
+        print(f"📋 JSON数据: {result['json_path'] or '未执行'}")
+        print(f"🌐 HTML文章: {result['html_path'] or '未执行'}")
         
         # 显示文章信息
         print(f"\n📊 文章信息:")
@@ -167,10 +181,19 @@ def main():
         print(f"   - 字数: {data.get('word_count', 'N/A')}")
         print(f"   - 预计阅读时间: {data.get('reading_time', 'N/A')}分钟")
         print(f"   - 章节数: {len(data.get('main_sections', []))}")
+        if cache is not None:
+            cache.evict()
+            print(f"   - LLM缓存: {cache.summary()}")
         
     except Exception as e:
         print(f"❌ Pipeline执行失败: {e}")
         sys.exit(1)
+    finally:
+        if metrics.stages:
+            metrics.print_summary()
+            if args.metrics_out:
+                metrics.write(args.metrics_out, source=txt_path, model=os.getenv('MODEL_NAME') or '')
+                print(f"   - 指标已写入: {args.metrics_out}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+"""
+Pipeline常驻服务
+启动时加载一次配置、prompt和模板，所有任务共用一个异步引擎（同一个连接池和并发上限），
+通过本地HTTP接口（TCP端口或Unix socket）提交任务。任务队列保存在磁盘上，服务重启后
+未完成的任务会重新排队，并借助各阶段的检查点从中断处继续；prompt.yaml 改动后自动重新加载。
+
+用法: python pipeline_daemon.py [--port 8600 | --socket /tmp/pipeline.sock] [--workers 2]
+
+接口:
+    POST   /jobs              提交任务，JSON请求体：
+                              {"txt_path": "录音稿路径"} 或 {"transcript": "录音稿全文", "name": "文章名"}，
+                              可选 chunked / stream / by_section / overlap / clean / local_only / from_stage / to_stage
+    GET    /jobs              任务列表（?status=queued 按状态过滤）
+    GET    /jobs/<id>         任务详情：状态、当前阶段、进度、输出日志和结果（?wait=30 最多等待30秒直到任务结束）
+    GET    /jobs/<id>/html    生成的HTML文章
+    DELETE /jobs/<id>         取消排队中或执行中的任务
+    GET    /health            服务状态
+    GET    /metrics           Prometheus文本格式的运行指标
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import signal
+import asyncio
+import argparse
+import contextvars
+from pathlib import Path
+from datetime import datetime
+from urllib.parse import urlsplit, parse_qs
+
+from pipeline import load_config, load_prompts
+from async_pipeline import LLMEngine, run_pipeline
+from llm_cache import open_cache
+from checkpoint import STAGES
+from metrics import PipelineMetrics, current_stage, OTHER_STAGE
+import templates
+import generate_article
+import incremental_render
+
+
+# 任务状态
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+
+# 提交任务时可以指定的选项及默认值（与 pipeline.py 的命令行参数对应）
+JOB_OPTIONS = {
+    'chunked': False,
+    'stream': False,
+    'by_section': False,
+    'overlap': False,
+    'clean': False,
+    'local_only': False,
+    'from_stage': None,
+    'to_stage': None
+}
+
+# 每个任务保留的输出日志行数
+LOG_LINES = 200
+
+# 请求体大小上限（录音稿全文）
+MAX_BODY_BYTES = 20 * 1024 * 1024
+
+# LLM缓存淘汰的最小间隔（秒）
+EVICT_INTERVAL = 600
+
+HTTP_STATUS = {
+    200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    409: 'Conflict', 413: 'Payload Too Large', 500: 'Internal Server Error'
+}
+
+# 当前协程正在执行的任务，用于把pipeline的输出归到对应任务下
+_current_job = contextvars.ContextVar('pipeline_daemon_job', default=None)
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class PromptStore:
+    """prompt.yaml 热加载：每次取用时检查修改时间，改动后重新加载（解析失败时继续使用之前的版本）"""
+
+    def __init__(self, path='prompt.yaml'):
+        self.path = path
+        self.mtime = _mtime(path)
+        self.prompts = load_prompts(path)
+        self.loaded_at = _now()
+
+    def get(self):
+        """当前的prompt配置"""
+        mtime = _mtime(self.path)
+        if mtime != self.mtime:
+            self.mtime = mtime
+            try:
+                self.prompts = load_prompts(self.path)
+                self.loaded_at = _now()
+                print(f"🔄 已重新加载 {self.path}")
+            except Exception as e:
+                print(f"⚠️ {self.path} 加载失败，继续使用之前的版本: {e}")
+        return self.prompts
+
+
+class JobOutput(io.TextIOBase):
+    """
+    替换 sys.stdout：任务协程（及其 asyncio.to_thread 线程）中的输出记到对应任务的日志，
+    完整的行同时带上任务编号转发到服务的标准输出；其他输出原样转发
+    """
+
+    def __init__(self, queue, stream):
+        self.queue = queue
+        self.stream = stream
+
+    def write(self, text):
+        job = _current_job.get()
+        if job is None:
+            return self.stream.write(text)
+        for line in self.queue.append_output(job, text):
+            self.stream.write(f"[{job['id']}] {line}\n")
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+class JobQueue:
+    """
+    持久化的任务队列
+
+    每个任务保存为 jobs_dir 下的一个JSON文件，状态变化时原子写入。启动时排队中和执行中
+    （服务上次退出时被中断）的任务按提交顺序重新排队
+    """
+
+    def __init__(self, jobs_dir, output_root):
+        self.jobs_dir = Path(jobs_dir)
+        self.output_root = output_root
+        self.jobs = {}
+        self.pending = asyncio.Queue()
+        self.running = {}
+        self.finished = {}
+        self._buffers = {}
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        for path in sorted(self.jobs_dir.glob('*.json')):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    job = json.load(f)
+            except (OSError, ValueError):
+                print(f"⚠️ 任务文件损坏，已跳过: {path}")
+                continue
+            self.jobs[job['id']] = job
+            if job['status'] in (QUEUED, RUNNING):
+                job['status'] = QUEUED
+                self.pending.put_nowait(job['id'])
+
+    def save(self, job):
+        path = self.jobs_dir / f"{job['id']}.json"
+        tmp_path = path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(job, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def submit(self, request):
+        """
+        校验请求并加入队列
+
+        Returns:
+            dict: 新任务
+        Raises:
+            ValueError: 请求无效
+            FileExistsError: 同一篇文章已有任务在排队或执行
+        """
+        unknown = set(request) - set(JOB_OPTIONS) - {'txt_path', 'transcript', 'name'}
+        if unknown:
+            raise ValueError(f"不支持的参数: {', '.join(sorted(unknown))}")
+        options = {key: request.get(key, default) for key, default in JOB_OPTIONS.items()}
+        for key in ('from_stage', 'to_stage'):
+            if options[key] is not None and options[key] not in STAGES:
+                raise ValueError(f"{key} 必须是 {', '.join(STAGES)} 之一")
+
+        job_id = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+        if request.get('transcript') is not None:
+            # 同名文章输出到同一目录，重新提交时可以复用检查点和上一次的HTML片段
+            name = re.sub(r'[^\w.-]+', '_', str(request.get('name') or job_id)).strip('._') or job_id
+            output_dir = os.path.join(self.output_root, name)
+            txt_path = os.path.join(output_dir, f'{name}.txt')
+        elif request.get('txt_path'):
+            txt_path = os.path.abspath(request['txt_path'])
+            if not os.path.isfile(txt_path):
+                raise ValueError(f"录音稿不存在: {txt_path}")
+            output_dir = os.path.join(self.output_root, Path(txt_path).stem)
+        else:
+            raise ValueError("需要提供 txt_path 或 transcript")
+
+        for other in self.jobs.values():
+            if other['status'] in (QUEUED, RUNNING) and other['output_dir'] == output_dir:
+                raise FileExistsError(f"任务 {other['id']} 正在处理同一篇文章")
+        if request.get('transcript') is not None:
+            os.makedirs(output_dir, exist_ok=True)
+            with open(txt_path, 'w', encoding='utf-8') as f:
+                f.write(request['transcript'])
+
+        job = {
+            'id': job_id,
+            'status': QUEUED,
+            'submitted_at': _now(),
+            'started_at': None,
+            'finished_at': None,
+            'txt_path': txt_path,
+            'output_dir': output_dir,
+            'options': options,
+            'stage': None,
+            'progress': '',
+            'timings': {},
+            'result': None,
+            'error': None,
+            'log': []
+        }
+        self.jobs[job_id] = job
+        self.save(job)
+        self.pending.put_nowait(job_id)
+        return job
+
+    def cancel(self, job):
+        """取消排队中或执行中的任务，已结束的任务返回False"""
+        if job['status'] == QUEUED:
+            self.finish(job, CANCELLED)
+            return True
+        task = self.running.get(job['id'])
+        if task is None:
+            return False
+        job['cancel_requested'] = True
+        task.cancel()
+        return True
+
+    def finish(self, job, status, error=None):
+        job['status'] = status
+        job['error'] = error
+        job['finished_at'] = _now()
+        job.pop('cancel_requested', None)
+        self.save(job)
+        event = self.finished.pop(job['id'], None)
+        if event is not None:
+            event.set()
+
+    async def wait(self, job, timeout):
+        """等待任务结束，最多timeout秒"""
+        if job['status'] in FINISHED or timeout <= 0:
+            return
+        event = self.finished.setdefault(job['id'], asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def append_output(self, job, text):
+        """
+        记录任务的一段输出，返回其中完整的行
+        以 \\r 刷新的进度行只保留最后一次刷新的内容
+        """
+        *lines, rest = (self._buffers.pop(job['id'], '') + text).split('\n')
+        lines = [line.rsplit('\r', 1)[-1].rstrip() for line in lines]
+        lines = [line for line in lines if line.strip()]
+        if rest:
+            self._buffers[job['id']] = rest
+        job['log'] = (job['log'] + lines)[-LOG_LINES:]
+        progress = rest.rsplit('\r', 1)[-1].strip() or (lines[-1].strip() if lines else '')
+        if progress:
+            job['progress'] = progress
+        stage = current_stage()
+        if stage != OTHER_STAGE:
+            job['stage'] = stage
+        return lines
+
+
+def job_summary(job):
+    """任务列表中显示的字段"""
+    return {key: job[key] for key in ('id', 'status', 'stage', 'progress', 'submitted_at', 'finished_at', 'txt_path')}
+
+
+class PipelineDaemon:
+    """常驻服务：持有引擎、prompt和任务队列，workers 个任务同时执行"""
+
+    def __init__(self, config, prompts, queue, cache=None, workers=2):
+        self.config = config
+        self.prompts = prompts
+        self.queue = queue
+        self.cache = cache
+        self.workers = workers
+        self.metrics = PipelineMetrics()
+        self.engine = None
+        self.started = time.time()
+        self.last_evict = time.monotonic()
+
+    async def run_job(self, job):
+        """执行一个任务（在独立的协程中，输出记到任务日志）"""
+        _current_job.set(job)
+        job['status'] = RUNNING
+        job['started_at'] = _now()
+        job['stage'] = None
+        self.queue.save(job)
+        print(f"🚀 开始处理: {job['txt_path']}")
+        try:
+            result = await run_pipeline(
+                self.engine, job['txt_path'], self.prompts.get(), output_dir=job['output_dir'], **job['options']
+            )
+        except asyncio.CancelledError:
+            if not job.get('cancel_requested'):
+                # 服务退出：保持执行中状态，下次启动时重新排队
+                raise
+            print("🛑 任务已取消")
+            self.queue.finish(job, CANCELLED)
+        except Exception as e:
+            print(f"❌ 任务失败: {e}")
+            self.queue.finish(job, FAILED, str(e))
+        else:
+            job['timings'] = result['timings']
+            job['result'] = {key: result[key] for key in ('verbatim_path', 'json_path', 'html_path')}
+            print("🎉 任务完成")
+            self.queue.finish(job, DONE)
+
+    async def worker(self):
+        while True:
+            job_id = await self.queue.pending.get()
+            job = self.queue.jobs.get(job_id)
+            if job is None or job['status'] != QUEUED:
+                continue
+            # 任务在单独的task中执行，取消任务不会影响worker
+            task = asyncio.create_task(self.run_job(job))
+            self.queue.running[job_id] = task
+            try:
+                await asyncio.wait([task])
+            finally:
+                self.queue.running.pop(job_id, None)
+            if task.done() and not task.cancelled() and task.exception() is not None:
+                print(f"❌ 任务 {job_id} 异常退出: {task.exception()}")
+            await self._maybe_evict()
+
+    async def _maybe_evict(self):
+        if self.cache is None or time.monotonic() - self.last_evict < EVICT_INTERVAL:
+            return
+        self.last_evict = time.monotonic()
+        await asyncio.to_thread(self.cache.evict)
+
+    def health(self):
+        statuses = [job['status'] for job in self.queue.jobs.values()]
+        return {
+            'status': 'ok',
+            'uptime_seconds': round(time.time() - self.started),
+            'workers': self.workers,
+            'queued': statuses.count(QUEUED),
+            'running': statuses.count(RUNNING),
+            'prompts_loaded_at': self.prompts.loaded_at,
+            'cache': self.cache.summary() if self.cache is not None else None
+        }
+
+    async def dispatch(self, method, path, query, body):
+        """
+        处理一个请求
+
+        Returns:
+            tuple: (状态码, Content-Type, 响应内容)
+        """
+        parts = [part for part in path.split('/') if part]
+        if parts == ['health'] and method == 'GET':
+            return _json(200, self.health())
+        if parts == ['metrics'] and method == 'GET':
+            return 200, 'text/plain; version=0.0.4; charset=utf-8', self.metrics.prometheus_text().encode('utf-8')
+        if parts == ['jobs']:
+            if method == 'GET':
+                status = query.get('status', [None])[0]
+                jobs = [job_summary(job) for job in self.queue.jobs.values() if status in (None, job['status'])]
+                return _json(200, {'jobs': jobs})
+            if method == 'POST':
+                try:
+                    request = json.loads(body or b'{}')
+                    if not isinstance(request, dict):
+                        raise ValueError("请求体必须是JSON对象")
+                    job = self.queue.submit(request)
+                except FileExistsError as e:
+                    return _json(409, {'error': str(e)})
+                except ValueError as e:
+                    return _json(400, {'error': str(e)})
+                return _json(202, job)
+            return _json(405, {'error': f"不支持 {method}"})
+        if len(parts) in (2, 3) and parts[0] == 'jobs':
+            job = self.queue.jobs.get(parts[1])
+            if job is None:
+                return _json(404, {'error': f"任务不存在: {parts[1]}"})
+            if len(parts) == 3:
+                if parts[2] != 'html' or method != 'GET':
+                    return _json(404, {'error': f"未知路径: {path}"})
+                html_path = (job['result'] or {}).get('html_path')
+                if job['status'] != DONE or not html_path:
+                    return _json(409, {'error': "任务还没有生成HTML"})
+                return 200, 'text/html; charset=utf-8', await asyncio.to_thread(Path(html_path).read_bytes)
+            if method == 'GET':
+                try:
+                    timeout = float(query.get('wait', ['0'])[0])
+                except ValueError:
+                    return _json(400, {'error': "wait 必须是秒数"})
+                await self.queue.wait(job, timeout)
+                return _json(200, job)
+            if method == 'DELETE':
+                if not self.queue.cancel(job):
+                    return _json(409, {'error': f"任务已结束: {job['status']}"})
+                return _json(202, job_summary(job))
+            return _json(405, {'error': f"不支持 {method}"})
+        return _json(404, {'error': f"未知路径: {path}"})
+
+    async def handle_connection(self, reader, writer):
+        """处理一个HTTP/1.1连接（每个连接一个请求）"""
+        try:
+            try:
+                method, target, _ = (await reader.readline()).decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length') or 0)
+                if length > MAX_BODY_BYTES:
+                    response = _json(413, {'error': f"请求体超过 {MAX_BODY_BYTES // 1024 // 1024}MB"})
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    url = urlsplit(target)
+                    response = await self.dispatch(method.upper(), url.path, parse_qs(url.query), body)
+            except (ValueError, asyncio.IncompleteReadError):
+                response = _json(400, {'error': "请求格式错误"})
+            except Exception as e:
+                response = _json(500, {'error': str(e)})
+            status, content_type, payload = response
+            writer.write(
+                f"HTTP/1.1 {status} {HTTP_STATUS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\nContent-Length: {len(payload)}\r\nConnection: close\r\n\r\n"
+                .encode('latin-1') + payload
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8600, socket_path=None):
+        """启动引擎、worker和HTTP服务，直到被取消（Ctrl+C / SIGTERM）"""
+        async with LLMEngine(self.config, cache=self.cache, metrics=self.metrics) as engine:
+            self.engine = engine
+            # 客户端（和 openai 模块）默认在第一次请求时才创建，常驻服务提前创建
+            engine.client
+            if socket_path:
+                if os.path.exists(socket_path):
+                    os.unlink(socket_path)
+                server = await asyncio.start_unix_server(self.handle_connection, socket_path)
+                address = f"unix:{socket_path}"
+            else:
+                server = await asyncio.start_server(self.handle_connection, host, port)
+                address = f"http://{host}:{server.sockets[0].getsockname()[1]}"
+            workers = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+            print(f"🚀 Pipeline服务已启动: {address}（同时处理 {self.workers} 个任务，"
+                  f"排队中 {self.queue.pending.qsize()} 个）")
+            try:
+                async with server:
+                    await server.serve_forever()
+            finally:
+                for task in workers + list(self.queue.running.values()):
+                    task.cancel()
+                await asyncio.gather(*workers, *self.queue.running.values(), return_exceptions=True)
+                if socket_path and os.path.exists(socket_path):
+                    os.unlink(socket_path)
+
+
+def _json(status, value):
+    return status, 'application/json; charset=utf-8', json.dumps(value, ensure_ascii=False).encode('utf-8')
+
+
+def warm_up():
+    """预先编译模板、构建加粗短语匹配器并计算渲染器版本，第一个任务不用再等"""
+    for name in templates.TEMPLATE_SOURCES:
+        templates.get_template(name)
+    generate_article.get_emphasis_matcher()
+    incremental_render.renderer_version()
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="Pipeline常驻服务：通过本地HTTP接口提交和查询任务")
+    parser.add_argument('--host', default='127.0.0.1', help="监听地址（默认127.0.0.1）")
+    parser.add_argument('--port', type=int, default=8600, help="监听端口（默认8600）")
+    parser.add_argument('--socket', help="改为监听Unix socket")
+    parser.add_argument('--workers', type=int, default=2, help="同时处理的任务数（默认2）")
+    parser.add_argument('--jobs-dir', default='.jobs', help="任务队列目录（默认 .jobs）")
+    parser.add_argument('--output-dir', default='output', help="输出根目录，每篇文章写入 <输出根目录>/<文章名>/")
+    parser.add_argument('--prompts', default='prompt.yaml', help="prompt配置文件，改动后自动重新加载")
+    parser.add_argument('--concurrency', type=int, help="所有任务合计的最大并发LLM请求数（默认读取MAX_CONCURRENCY）")
+    parser.add_argument('--no-cache', action='store_true', help="不读取也不写入本地LLM缓存")
+    return parser.parse_args()
+
+
+async def run_daemon(args, config, cache):
+    """创建任务队列并运行服务，收到SIGTERM时正常退出"""
+    queue = JobQueue(args.jobs_dir, args.output_dir)
+    daemon = PipelineDaemon(config, PromptStore(args.prompts), queue, cache=cache, workers=args.workers)
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except NotImplementedError:
+        pass
+    sys.stdout = JobOutput(queue, sys.stdout)
+    try:
+        await daemon.serve(args.host, args.port, args.socket)
+    except asyncio.CancelledError:
+        pass
+    finally:
+        sys.stdout = sys.stdout.stream
+
+
+def main():
+    """主函数"""
+    args = parse_args()
+    config = load_config()
+    if args.concurrency:
+        config['max_concurrency'] = args.concurrency
+    cache = open_cache(config, no_cache=args.no_cache)
+    warm_up()
+    try:
+        asyncio.run(run_daemon(args, config, cache))
+    except KeyboardInterrupt:
+        pass
+    if cache is not None:
+        cache.evict()
+    print("👋 Pipeline服务已停止")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+只渲染HTML的命令行工具
+从已有的文章JSON生成HTML，不导入 openai、yaml 等只有模型调用才需要的模块，启动很快；
+一次可以渲染任意多个JSON文件，模板改动后批量重新生成时只需要启动一次解释器。
+
+用法:
+    python render.py interview_data.json                        # 写到同目录的 interview_article.html
+    python render.py a.json -o a.html
+    python render.py a.json b.json -d html/                     # 写到 html/a.html、html/b.html
+    python render.py - < interview_data.json > article.html     # 标准输入、标准输出
+    python render.py output/*/interview_data.json -j 4          # 4个进程并行渲染
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import generate_article
+import article_stats
+import interview_model
+import tolerant_json
+
+
+# pipeline 输出的JSON文件名，对应的HTML文件名与 pipeline 一致
+PIPELINE_JSON_NAME = 'interview_data.json'
+PIPELINE_HTML_NAME = 'interview_article.html'
+
+STDIO = '-'
+
+
+def log(*args):
+    # HTML可能写到标准输出，提示信息一律写到标准错误
+    print(*args, file=sys.stderr)
+
+
+def load_env():
+    """只在需要时读取 .env（dotenv 导入较慢）：目前渲染只用到 EMPHASIS_GLOSSARY"""
+    if 'EMPHASIS_GLOSSARY' not in os.environ and os.path.exists('.env'):
+        from dotenv import load_dotenv
+        load_dotenv('.env')
+
+
+def default_output_path(json_path, output_dir=None):
+    """
+    输入JSON对应的输出路径：
+    interview_data.json 写到同目录的 interview_article.html（与pipeline一致），其他文件把扩展名换成 .html；
+    指定输出目录时，interview_data.json 以所在目录名命名（如 output/a/interview_data.json -> a.html）
+    """
+    directory, name = os.path.split(os.path.abspath(json_path))
+    if name == PIPELINE_JSON_NAME:
+        if not output_dir:
+            return os.path.join(directory, PIPELINE_HTML_NAME)
+        stem = os.path.basename(directory)
+    else:
+        stem = os.path.splitext(name)[0]
+    return os.path.join(output_dir or directory, f'{stem}.html')
+
+
+def load_data(json_path):
+    """读取文章JSON（'-' 为标准输入），并在本地重新计算字数和阅读时间"""
+    if json_path == STDIO:
+        data = tolerant_json.loads(sys.stdin.read())
+    else:
+        data = tolerant_json.load_file(json_path)
+    article_stats.apply_stats(data)
+    return data
+
+
+def render_file(json_path, html_path, incremental=False):
+    """
+    渲染一个文件（'-' 为标准输入/输出）
+
+    Returns:
+        tuple: (json_path, html_path, 写入的字符数, 错误信息)
+    """
+    try:
+        data = load_data(json_path)
+        if html_path == STDIO:
+            written = generate_article.render_to(data, sys.stdout)
+            sys.stdout.flush()
+        elif incremental:
+            import incremental_render
+            written = incremental_render.IncrementalRenderer(keep_fragments=False).write(data, html_path)
+        else:
+            # 先校验数据再打开临时文件，渲染失败时删除临时文件，不会留下写了一半的 .tmp
+            data = interview_model.coerce(data)
+            tmp_path = f'{html_path}.tmp'
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    written = generate_article.render_to(data, f)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+            os.replace(tmp_path, html_path)
+    except Exception as e:
+        return json_path, html_path, 0, f"{type(e).__name__}: {e}"
+    return json_path, html_path, written, None
+
+
+def _render_job(job):
+    return render_file(*job)
+
+
+def render_many(jobs, workers=1):
+    """
+    依次或在workers个进程中并行渲染，按完成顺序产出 render_file 的结果
+
+    Args:
+        jobs: (json_path, html_path, incremental) 的列表
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield render_file(*job)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    # 先在主进程中构建加粗短语匹配器和编译模板，fork出的子进程直接继承
+    generate_article.get_emphasis_matcher()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_render_job, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+
+
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="从文章JSON渲染HTML（不调用模型）")
+    parser.add_argument('inputs', nargs='+', help="文章JSON文件，'-' 表示从标准输入读取")
+    parser.add_argument('-o', '--output', help="输出HTML路径，'-' 表示写到标准输出（只能有一个输入）")
+    parser.add_argument('-d', '--output-dir', help="输出目录（默认写到各JSON所在目录）")
+    parser.add_argument('-j', '--jobs', type=int, default=1, help="并行渲染的进程数（默认1）")
+    parser.add_argument('--incremental', action='store_true', help="增量渲染：复用上一次输出中数据没有变化的章节")
+    parser.add_argument('-q', '--quiet', action='store_true', help="只输出错误")
+    return parser.parse_args()
+
+
+def main():
+    """主函数"""
+    args = parse_args()
+    if args.output and len(args.inputs) > 1:
+        log("❌ 有多个输入时不能使用 -o，请改用 -d 指定输出目录")
+        sys.exit(2)
+    if args.inputs.count(STDIO) > 1:
+        log("❌ 只能有一个输入来自标准输入")
+        sys.exit(2)
+    load_env()
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    jobs = []
+    for json_path in args.inputs:
+        if args.output:
+            html_path = args.output
+        elif json_path == STDIO:
+            html_path = STDIO
+        else:
+            html_path = default_output_path(json_path, args.output_dir)
+        jobs.append((json_path, html_path, args.incremental))
+
+    started = time.perf_counter()
+    failed = 0
+    total = 0
+    for json_path, html_path, written, error in render_many(jobs, args.jobs):
+        if error:
+            failed += 1
+            log(f"❌ {json_path}: {error}")
+            continue
+        total += written
+        if not args.quiet and html_path != STDIO:
+            log(f"✅ {html_path}（{written:,} 字符）")
+    if len(jobs) > 1 and not args.quiet:
+        elapsed = time.perf_counter() - started
+        log(f"📊 渲染 {len(jobs) - failed}/{len(jobs)} 个文件，共 {total:,} 字符，用时 {elapsed:.2f}s")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+微信公众号文章HTML模板
+文章各组成部分的HTML模板，每个模板在进程内只解析一次，渲染时直接把片段追加到输出缓冲区。
+重复出现的样式集中在 STYLES 中，编译时内联到模板并压缩空白和样式，输出仍是微信编辑器接受的内联样式
+"""
+
+import re
+from functools import lru_cache
+
+
+# 模板中的占位符，形如 {word_count}
+FIELD_PATTERN = re.compile(r'\{(\w+)\}')
+
+# 模板中对样式表的引用，形如 [[answer]]
+STYLE_REF_PATTERN = re.compile(r'\[\[(\w+)\]\]')
+
+# 压缩模板用到的正则
+STYLE_ATTR_PATTERN = re.compile(r'(?<=\s)style="([^"]*)"')
+EMPTY_STYLE_PATTERN = re.compile(r'\s+style=""')
+# 标签（或占位符）之间带换行的缩进直接删除，其余带换行的空白合并为一个空格
+BREAK_BETWEEN_TAGS_PATTERN = re.compile(r'(^|[>}])\s*\n\s*(?=[<{]|$)')
+BREAK_PATTERN = re.compile(r'\s*\n\s*')
+RGB_PATTERN = re.compile(r'rgb\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*\)')
+ZERO_PX_PATTERN = re.compile(r'(?<![\d.])0px')
+
+# 复制自微信编辑器、对显示没有影响的声明（outline: 0px、visibility: visible 是默认值，
+# caret-color 只影响编辑时的光标，orphans 只影响打印分页）
+NOOP_DECLARATIONS = {('outline', '0'), ('visibility', 'visible')}
+NOOP_PROPERTIES = {'caret-color', 'orphans'}
+
+
+def _hex_color(match):
+    """rgb(62, 62, 62) -> #3e3e3e，能缩写时缩写为三位（#000）"""
+    color = '{:02x}{:02x}{:02x}'.format(*map(int, match.groups()))
+    if color[0::2] == color[1::2]:
+        color = color[0::2]
+    return f'#{color}'
+
+
+def compact_style(style):
+    """
+    压缩一个 style 属性的值
+    去掉空白和无效声明，同一属性出现多次时只保留最后一次，rgb() 颜色改写为十六进制，
+    字体名的 &quot; 改为单引号
+    """
+    declarations = {}
+    for declaration in style.replace('&quot;', "'").split(';'):
+        name, sep, value = declaration.partition(':')
+        name = name.strip().lower()
+        if not sep or not name:
+            continue
+        value = re.sub(r'\s*,\s*', ',', ' '.join(value.split()))
+        value = RGB_PATTERN.sub(_hex_color, value)
+        value = ZERO_PX_PATTERN.sub('0', value)
+        if (name, value) in NOOP_DECLARATIONS or name in NOOP_PROPERTIES:
+            continue
+        declarations.pop(name, None)
+        declarations[name] = value
+    return ';'.join(f'{name}:{value}' for name, value in declarations.items())
+
+
+def inline_styles(source, styles=None):
+    """把模板中的 [[名字]] 替换为样式表中的声明"""
+    styles = STYLES if styles is None else styles
+    return STYLE_REF_PATTERN.sub(lambda m: styles[m.group(1)], source)
+
+
+def compact_html(source):
+    """
+    压缩模板源码：删除标签之间的缩进和换行，压缩每个 style 属性并删除空的 style
+    只处理模板本身，不会改动填入的内容
+    """
+    source = BREAK_BETWEEN_TAGS_PATTERN.sub(r'\1', source)
+    source = BREAK_PATTERN.sub(' ', source)
+    source = STYLE_ATTR_PATTERN.sub(lambda m: f'style="{compact_style(m.group(1))}"', source)
+    return EMPTY_STYLE_PATTERN.sub('', source)
+
+
+class CompiledTemplate:
+    """
+    编译后的模板
+    模板源码在编译时切分成字面量片段与占位符，并生成一个专用的渲染函数，渲染时无需再次解析
+    """
+
+    __slots__ = ('literals', 'fields', 'render_into')
+
+    def __init__(self, source):
+        pieces = FIELD_PATTERN.split(source)
+        self.literals = tuple(pieces[0::2])
+        self.fields = tuple(pieces[1::2])
+
+        # 生成形如 out += (L0, str(values['a']), L1) 的渲染函数，字面量以常量形式传入
+        parts = ['L0']
+        for index, field in enumerate(self.fields):
+            parts.append(f'str(values[{field!r}])')
+            parts.append(f'L{index + 1}')
+        code = f"def render_into(out, values):\n    out += ({', '.join(parts)},)\n"
+        namespace = {f'L{index}': literal for index, literal in enumerate(self.literals)}
+        exec(code, namespace)
+        # render_into(out, values): 把渲染结果逐段追加到out（list）
+        self.render_into = namespace['render_into']
+
+    def render(self, **values):
+        """渲染为字符串"""
+        out = []
+        self.render_into(out, values)
+        return ''.join(out)
+
+
+# 文章开头：公众号头图、字数/阅读时间、嘉宾介绍、采访信息和主题摘要
+BASE_TEMPLATE = '''<div class="rich_media_content js_underline_content autoTypeSetting24psection fix_apple_default_style" id="js_content"
+    style="">
+    <section
+        style="margin-bottom: 0px;outline: 0px;font-family: &quot;PingFang SC&quot;, system-ui, -apple-system, BlinkMacSystemFont, &quot;Helvetica Neue&quot;, &quot;Hiragino Sans GB&quot;, &quot;Microsoft YaHei UI&quot;, &quot;Microsoft YaHei&quot;, Arial, sans-serif;letter-spacing: 0.578px;font-size: 16px;visibility: visible;"
+        data-pm-slice="0 0 []">
+        <section style="padding-right: 10px;padding-left: 10px;outline: 0px;line-height: 1.6;visibility: visible;">
+            <section style="outline: 0px;visibility: visible;">
+                <section style="margin-top: 8px;outline: 0px;visibility: visible;margin-bottom: 24px;">
+                    <section
+                        style="margin-top: 10px;margin-bottom: 10px;outline: 0px;text-align: left;justify-content: flex-start;display: flex;flex-flow: row;visibility: visible;">
+                        <section
+                            style="outline: 0px;display: inline-block;vertical-align: bottom;width: 100.438px;flex: 0 0 auto;height: auto;align-self: flex-end;visibility: visible;">
+                            <section
+                                style="outline: 0px;line-height: 0;transform: translate3d(10px, 0px, 0px);visibility: visible;">
+                                <span leaf="" style="visibility: visible;"><br style="visibility: visible;"></span>
+                                <section
+                                    style="outline: 0px;vertical-align: middle;display: inline-block;line-height: 0;width: 74.3203px;height: auto;border-top-left-radius: 647px;border-top-right-radius: 647px;border-bottom-left-radius: 647px;overflow: hidden;visibility: visible;"
+                                    nodeleaf=""><img
+                                        data-src="https://mmbiz.qpic.cn/mmbiz_png/twW3euR3BMLsyBeyHbW3q5Uc4FG2ktl4MtsRbfzMks2ZYWELA3KH47IV3Xod2f6obGoGyTsI64U1vUiaUgK1VibQ/640?wx_fmt=other&amp;from=appmsg&amp;tp=webp&amp;wxfrom=5&amp;wx_lazy=1&amp;wx_co=1"
+                                        class="rich_pages wxw-img" data-ratio="1.0046296296296295" data-s="300,640"
+                                        data-type="png" data-w="1080"
+                                        style="outline: 0px; vertical-align: middle; width: 74.3125px !important; visibility: visible !important; height: auto !important;"
+                                        data-cropselx1="0" data-cropselx2="75" data-cropsely1="0" data-cropsely2="75"
+                                        data-backw="74" data-backh="75" data-imgfileid="100000981"
+                                        data-original-style="outline: 0px;vertical-align: middle;width: 74.3125px !important;visibility: visible !important;height: auto !important;"
+                                        data-index="1"
+                                        src="https://mmbiz.qpic.cn/mmbiz_png/twW3euR3BMLsyBeyHbW3q5Uc4FG2ktl4MtsRbfzMks2ZYWELA3KH47IV3Xod2f6obGoGyTsI64U1vUiaUgK1VibQ/640?wx_fmt=other&amp;from=appmsg&amp;wxfrom=5&amp;wx_lazy=1&amp;wx_co=1&amp;tp=webp"
+                                        _width="74.3125px" alt="Image" data-report-img-idx="5" data-fail="0"></section>
+                            </section>
+                        </section>
+                        <section
+                            style="outline: 0px;display: inline-block;vertical-align: bottom;width: auto;align-self: flex-end;flex: 100 100 0%;height: auto;visibility: visible;">
+                            <section
+                                style="outline: 0px;text-align: justify;font-size: 12px;color: rgb(141, 141, 141);visibility: visible;">
+                                <p style="outline: 0px;visibility: visible;"><span
+                                        style="outline: 0px;letter-spacing: 0.5px;visibility: visible;"><strong
+                                            style="outline: 0px;visibility: visible;"><span leaf=""
+                                                style="visibility: visible;">专注打破大学信息差</span></strong></span></p>
+                            </section>
+                            <section style="margin-top: 3px;margin-bottom: 3px;outline: 0px;visibility: visible;">
+                                <section
+                                    style="outline: 0px;background-color: rgb(141, 141, 141);height: 1px;visibility: visible;">
+                                    <svg viewBox="0 0 1 1"
+                                        style="float: left;line-height: 0;width: 0px;vertical-align: top;visibility: visible;"></svg>
+                                </section>
+                            </section>
+                            <section
+                                style="margin-top: 7px;margin-bottom: 7px;outline: 0px;justify-content: flex-start;display: flex;flex-flow: row;visibility: visible;">
+                                <section
+                                    style="padding-right: 4px;padding-left: 4px;outline: 0px;display: inline-block;vertical-align: bottom;width: auto;align-self: flex-end;flex: 0 0 auto;background-color: rgb(92, 170, 233);min-width: 5%;height: auto;visibility: visible;">
+                                    <section style="outline: 0px;text-align: center;visibility: visible;">
+                                        <section
+                                            style="outline: 0px;font-size: 17px;color: rgb(255, 255, 255);visibility: visible;">
+                                            <p style="outline: 0px;visibility: visible;"><span
+                                                    style="outline: 0px;letter-spacing: 0.5px;visibility: visible;"><strong
+                                                        style="outline: 0px;visibility: visible;"><span leaf=""
+                                                            style="visibility: visible;">点击蓝字</span></strong></span></p>
+                                        </section>
+                                    </section>
+                                </section>
+                                <section
+                                    style="padding-left: 5px;outline: 0px;display: inline-block;vertical-align: bottom;width: auto;min-width: 5%;flex: 0 0 auto;height: auto;align-self: flex-end;visibility: visible;">
+                                    <section style="outline: 0px;visibility: visible;">
+                                        <section style="outline: 0px;font-size: 17px;visibility: visible;">
+                                            <p style="outline: 0px;visibility: visible;"><span
+                                                    style="outline: 0px;letter-spacing: 0.5px;visibility: visible;"><strong
+                                                        style="outline: 0px;visibility: visible;"><span leaf=""
+                                                            style="visibility: visible;">关注我们</span></strong></span></p>
+                                        </section>
+                                    </section>
+                                </section>
+                            </section>
+                        </section>
+                    </section>
+                </section>
+                <section style="text-align: center; margin-bottom: 24px; visibility: visible;"><span leaf=""
+                        style="visibility: visible;"><img
+                            data-src="https://mmbiz.qpic.cn/mmbiz_png/twW3euR3BMIlU2KI3CgvzhkAYcwQw5ctw8IvZAq0l1Nl1QQyHcMSAKDqgduNY2TqO1YJd41YrHTfMTU9C1Pw3A/640?wx_fmt=png&amp;from=appmsg"
+                            class="rich_pages wxw-img" data-ratio="0.512962962962963" data-s="300,640" data-type="png"
+                            data-w="1080"
+                            style="vertical-align: middle; max-width: 100%; width: 657px !important; box-sizing: border-box; height: auto !important; visibility: visible !important;"
+                            data-imgfileid="100001361"
+                            data-original-style="vertical-align: middle;max-width: 100%;width: 100%;box-sizing: border-box;height: auto !important;"
+                            data-index="2"
+                            src="https://mmbiz.qpic.cn/mmbiz_png/twW3euR3BMIlU2KI3CgvzhkAYcwQw5ctw8IvZAq0l1Nl1QQyHcMSAKDqgduNY2TqO1YJd41YrHTfMTU9C1Pw3A/640?wx_fmt=png&amp;from=appmsg&amp;tp=webp&amp;wxfrom=5&amp;wx_lazy=1"
+                            _width="100%" alt="Image" data-report-img-idx="4" data-fail="0"></span></section>
+                <section
+                    style="margin-top: 8px;outline: 0px;letter-spacing: 0.578px;text-align: left;text-indent: 0em;line-height: 1.6em;visibility: visible;margin-bottom: 24px;">
+                    <span style="outline: 0px;letter-spacing: 0.5px;visibility: visible;"><span
+                            style="outline: 0px;color: rgb(106, 106, 106);font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;orphans: 4;caret-color: rgb(0, 122, 255);white-space-collapse: preserve;font-size: 14px;visibility: visible;"><span
+                                leaf="" style="visibility: visible;">长文预警，本文共</span></span><span
+                            style="outline: 0px;font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;orphans: 4;caret-color: rgb(0, 122, 255);white-space-collapse: preserve;font-size: 14px;color: rgb(44, 42, 143);visibility: visible;"><strong
+                                style="outline: 0px;visibility: visible;"><span leaf=""
+                                    style="visibility: visible;">{word_count}</span></strong></span><span
+                            style="outline: 0px;color: rgb(106, 106, 106);font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;orphans: 4;caret-color: rgb(0, 122, 255);white-space-collapse: preserve;font-size: 14px;visibility: visible;"><span
+                                leaf="" style="visibility: visible;">字，预计阅读时间</span></span><span
+                            style="outline: 0px;font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;orphans: 4;caret-color: rgb(0, 122, 255);white-space-collapse: preserve;font-size: 14px;color: rgb(44, 42, 143);visibility: visible;"><strong
+                                style="outline: 0px;visibility: visible;"><span leaf=""
+                                    style="visibility: visible;">{reading_time}</span></strong></span><span
+                            style="outline: 0px;color: rgb(106, 106, 106);font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;orphans: 4;caret-color: rgb(0, 122, 255);white-space-collapse: preserve;font-size: 14px;visibility: visible;"><span
+                                leaf="" style="visibility: visible;">分钟</span></span></span></section>
+                <section
+                    style="margin-top: 8px;outline: 0px;letter-spacing: normal;white-space-collapse: preserve;orphans: 4;caret-color: rgb(0, 122, 255);font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;text-align: start;text-indent: 0em;line-height: 1.75em;visibility: visible;margin-bottom: 24px;">
+                    <span
+                        style="outline: 0px;color: rgb(106, 106, 106);letter-spacing: 0.5px;font-size: 15px;visibility: visible;"><span
+                            leaf=""
+                            style="visibility: visible;">「对话」是蜗壳进阶联盟推出的系列深度访谈栏目，我们邀请了科大的优秀前辈，讲述他们在求学路上曾经历的挫折与迷茫，以及收获的成长与荣光。通过深度对话，展现他们独特的人生轨迹与关键抉择，希望这些经验能为后来的科大学子提供切实的参考与支持。</span></span>
+                </section>
+                <section
+                    style="margin-top: 8px;outline: 0px;letter-spacing: normal;white-space-collapse: preserve;orphans: 4;caret-color: rgb(0, 122, 255);font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;text-align: start;text-indent: 0em;line-height: 1.75em;visibility: visible;margin-bottom: 24px;">
+                    <span
+                        style="outline: 0px;color: rgb(106, 106, 106);letter-spacing: 0.5px;font-size: 15px;visibility: visible;"><span
+                            leaf="">{guest_intro}</span></span>
+                </section>
+                <section
+                    style="margin-top: 8px;outline: 0px;letter-spacing: 0.578px;text-align: left;text-indent: 0em;line-height: 1.6em;margin-bottom: 24px;">
+                    <span style="outline: 0px;letter-spacing: 0.5px;"><strong
+                            style="outline: 0px;color: rgb(171, 25, 66);font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;font-size: 14px;letter-spacing: normal;orphans: 4;caret-color: rgb(0, 122, 255);white-space-collapse: preserve;"><span
+                                leaf="">本文由蜗壳进阶联盟原创 未经允许 不得转载</span></strong></span></section>
+                <section
+                    style="margin-top: 8px;outline: 0px;letter-spacing: 0.578px;text-align: right;text-indent: 0em;line-height: 1.6em;">
+                    <span leaf=""><br></span></section>
+                <section
+                    style="margin-top: 8px;outline: 0px;letter-spacing: 0.578px;text-align: right;text-indent: 0em;line-height: 1.6em;">
+                    <span leaf=""><br></span></section>
+                <section
+                    style="margin-top: 8px;outline: 0px;letter-spacing: 0.578px;text-align: right;text-indent: 0em;line-height: 1.6em;">
+                    <span style="outline: 0px;letter-spacing: 0.5px;"><strong style="outline: 0px;"><span leaf="">采访、编辑
+                                | {interviewer}</span></strong></span></section>
+                <section
+                    style="margin-top: 8px;outline: 0px;letter-spacing: 0.578px;text-align: right;text-indent: 0em;line-height: 1.6em;">
+                    <span style="outline: 0px;letter-spacing: 0.5px;"><strong style="outline: 0px;"><span leaf="">线下承办 |
+                                {proofreader}</span></strong></span></section>
+                <section
+                    style="margin-top: 8px;outline: 0px;letter-spacing: 0.578px;text-align: right;text-indent: 0em;line-height: 1.6em;">
+                    <span style="outline: 0px;letter-spacing: 0.5px;"><strong style="outline: 0px;"><span
+                                leaf=""><br></span></strong></span></section>
+                <p
+                    style="outline: 0px;letter-spacing: 0.578px;text-align: right;text-indent: 0em;line-height: 1.6em;margin-top: 8px;">
+                    <span style="outline: 0px;letter-spacing: 0.5px;"><strong style="outline: 0px;"><span
+                                leaf=""><br></span></strong></span></p>
+            </section>
+            <p
+                style="outline: 0px;color: rgb(62, 62, 62);background-color: rgb(255, 255, 255);visibility: visible;margin-top: 8px;">
+                <span leaf=""><br></span></p>
+            <p
+                style="margin-bottom: 8px;outline: 0px;font-family: &quot;PingFang SC&quot;, system-ui, -apple-system, BlinkMacSystemFont, &quot;Helvetica Neue&quot;, &quot;Hiragino Sans GB&quot;, &quot;Microsoft YaHei UI&quot;, &quot;Microsoft YaHei&quot;, Arial, sans-serif;text-indent: 0em;letter-spacing: 0.578px;background-color: rgb(255, 255, 255);color: rgb(62, 62, 62);text-align: center;line-height: 1.6em;margin-top: 8px;">
+                <span
+                    style="outline: 0px;font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;orphans: 4;caret-color: rgb(0, 122, 255);white-space-collapse: preserve;color: rgb(44, 42, 143);font-size: 24px;font-weight: 700;text-decoration: underline;letter-spacing: 0.5px;"><span
+                        leaf="">&nbsp;主题摘要&nbsp;</span></span></p>
+            <p
+                style="margin-bottom: 8px;outline: 0px;font-family: &quot;PingFang SC&quot;, system-ui, -apple-system, BlinkMacSystemFont, &quot;Helvetica Neue&quot;, &quot;Hiragino Sans GB&quot;, &quot;Microsoft YaHei UI&quot;, &quot;Microsoft YaHei&quot;, Arial, sans-serif;text-indent: 0em;letter-spacing: 0.578px;background-color: rgb(255, 255, 255);color: rgb(62, 62, 62);text-align: center;line-height: 1.6em;margin-top: 8px;">
+                <span leaf=""><br></span></p>
+            {topics_summary}
+            <p
+                style="margin-top: 8px;margin-bottom: 16px;outline: 0px;font-family: &quot;PingFang SC&quot;, system-ui, -apple-system, BlinkMacSystemFont, &quot;Helvetica Neue&quot;, &quot;Hiragino Sans GB&quot;, &quot;Microsoft YaHei UI&quot;, &quot;Microsoft YaHei&quot;, Arial, sans-serif;text-indent: 0em;letter-spacing: 0.578px;background-color: rgb(255, 255, 255);color: rgb(62, 62, 62);text-align: center;line-height: 1.6em;">
+                <strong style="outline: 0px;"><span leaf="">...</span></strong></p>
+            <section
+                style="outline: 0px;font-family: &quot;PingFang SC&quot;, system-ui, -apple-system, BlinkMacSystemFont, &quot;Helvetica Neue&quot;, &quot;Hiragino Sans GB&quot;, &quot;Microsoft YaHei UI&quot;, &quot;Microsoft YaHei&quot;, Arial, sans-serif;letter-spacing: 0.544px;visibility: visible;">
+                <section powered-by="xiumi.us" style="outline: 0px;visibility: visible;">
+                    <section
+                        style="outline: 0px;font-family: &quot;PingFang SC&quot;, system-ui, -apple-system, BlinkMacSystemFont, &quot;Helvetica Neue&quot;, &quot;Hiragino Sans GB&quot;, &quot;Microsoft YaHei UI&quot;, &quot;Microsoft YaHei&quot;, Arial, sans-serif;letter-spacing: 0.578px;visibility: visible;margin-top: 8px;margin-bottom: 24px;">
+                        <span leaf=""
+                            style="outline: 0px;font-size: 15px;text-indent: 0em;color: rgb(0, 0, 0);letter-spacing: 0.5px;font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;orphans: 4;caret-color: rgb(0, 122, 255);white-space-collapse: preserve;"><br></span>
+                    </section>'''
+
+# 章节、问答等重复出现的模板使用的样式表，模板中以 [[名字]] 引用，编译时内联为 style 属性
+# （微信编辑器会删除 <style> 和 class，样式只能内联）
+FONT_PINGFANG = ('&quot;PingFang SC&quot;, system-ui, -apple-system, BlinkMacSystemFont, &quot;Helvetica Neue&quot;, '
+                 '&quot;Hiragino Sans GB&quot;, &quot;Microsoft YaHei UI&quot;, &quot;Microsoft YaHei&quot;, Arial, sans-serif')
+FONT_OPEN_SANS = ('&quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, '
+                  '&quot;Segoe UI Emoji&quot;, sans-serif')
+
+STYLES = {
+    'topic': f'margin-top: 8px;margin-bottom: 16px;font-family: {FONT_PINGFANG};text-indent: 0em;letter-spacing: 0.578px;'
+             'background-color: rgb(255, 255, 255);color: rgb(62, 62, 62);text-align: center;line-height: 1.6em;',
+    'spacer': 'margin-top: 8px;letter-spacing: 0.578px;text-align: right;text-indent: 0em;line-height: 1.6em;',
+    # 章节标题的外层只提供左右留白，字体、字号和行高都由内层决定
+    'section_box': 'padding-right: 20px;padding-left: 20px;',
+    'section_title_box': 'margin-top: 8px;margin-bottom: 32px;letter-spacing: 0.578px;background-color: rgb(255, 255, 255);'
+                         'font-size: 16px;color: rgb(62, 62, 62);text-align: center;text-indent: 0em;line-height: 1.6em;',
+    'section_title': f'font-family: {FONT_OPEN_SANS};white-space-collapse: preserve;color: rgb(44, 42, 143);font-size: 24px;'
+                     'font-weight: 700;text-decoration: underline;letter-spacing: 0.5px;',
+    'subtitle_box': 'margin-top: 8px;margin-bottom: 24px;letter-spacing: 0.578px;background-color: rgb(255, 255, 255);'
+                    'font-size: 16px;color: rgb(62, 62, 62);text-align: center;text-indent: 0em;line-height: 1.6em;',
+    'subtitle': f'font-family: {FONT_OPEN_SANS};font-size: 20px;font-weight: 700;letter-spacing: 0.5px;'
+                'white-space-collapse: preserve;text-indent: 0em;',
+    'question_box': 'margin-top: 8px;margin-bottom: 24px;',
+    'question': f'font-size: 15px;text-indent: 0em;letter-spacing: 0.5px;font-family: {FONT_OPEN_SANS};'
+                'white-space-collapse: preserve;',
+    'question_text': 'color: rgb(171, 25, 66);font-weight: bold;',
+    # 回答原来是 section > section > p 三层，外两层的字号和颜色都被内层覆盖，合并为一个 p
+    'answer': 'margin: 8px 0px 24px;padding: 0px;white-space: normal;font-style: normal;font-weight: 400;'
+              'text-align: justify;font-size: 15px;color: rgb(0, 0, 0);',
+    'emphasis': 'font-weight: bold;',
+}
+
+# 主题摘要中的一个主题
+TOPIC_TEMPLATE = '''<section style="[[topic]]"><span leaf=""><span textstyle="" style="[[emphasis]]">{topic}</span></span></section>'''
+
+# 章节标题
+SECTION_HEADER_TEMPLATE = '''
+                    <section style="[[spacer]]"><span leaf=""><br></span></section>
+                    <section style="[[section_box]]">
+                        <section style="[[section_title_box]]"><span style="[[section_title]]"><span
+                                    leaf="">{section_id} &nbsp;{section_title}</span></span></section>
+                    </section>'''
+
+# 第二个及之后的副标题前的空行
+SUBTITLE_SPACER_TEMPLATE = '''
+                    <section style="[[spacer]]"><span leaf=""><br></span></section>'''
+
+# 副标题
+SUBTITLE_TEMPLATE = '''
+                    <section style="[[subtitle_box]]"><span style="[[subtitle]]"><span
+                                leaf="">"{subtitle}"</span></span></section>'''
+
+# 问题
+QUESTION_TEMPLATE = '''
+                    <section style="[[question_box]]"><span leaf="" style="[[question]]"><span textstyle=""
+                                style="[[question_text]]">蜗壳进阶联盟：{question}</span></span></section>'''
+
+# 回答的第一段（带说话人）
+FIRST_ANSWER_TEMPLATE = '''
+            <p style="[[answer]]"><strong><span leaf="">{speaker}</span></strong><span leaf="">{content}</span></p>'''
+
+# 回答的后续段落
+ANSWER_TEMPLATE = '''
+            <p style="[[answer]]"><span leaf="">{content}</span></p>'''
+
+# 加粗的关键短语
+EMPHASIS_TEMPLATE = '<span textstyle="" style="[[emphasis]]">{text}</span>'
+
+# 文章结尾
+FOOTER_TEMPLATE = '''
+                </section>
+            </section>
+        </section>
+        <section style="padding-right: 10px;padding-left: 10px;outline: 0px;line-height: 1.6;visibility: visible;">
+            <section style="outline: 0px;visibility: visible;">
+                <p
+                    style="margin: 8px 8px 24px;outline: 0px;letter-spacing: 0.578px;text-indent: 0em;line-height: 1.6em;">
+                    <span leaf=""><br></span></p>
+                <p
+                    style="margin: 8px 8px 24px;outline: 0px;letter-spacing: 0.578px;text-indent: 0em;line-height: 1.6em;">
+                    <span
+                        style="outline: 0px;font-size: 15px;text-indent: 0em;white-space-collapse: preserve;letter-spacing: 0.5px;color: rgb(0, 0, 0);font-family: &quot;Open Sans&quot;, &quot;Clear Sans&quot;, &quot;Helvetica Neue&quot;, Helvetica, Arial, &quot;Segoe UI Emoji&quot;, sans-serif;orphans: 4;caret-color: rgb(0, 122, 255);"><strong
+                            style="outline: 0px;color: rgb(171, 25, 66);background-color: rgb(255, 255, 255);"><span
+                                leaf=""><img
+                                    data-src="https://mmbiz.qpic.cn/mmbiz_jpg/twW3euR3BMJaBWaicHQq4icagaiageoklRIx6gcXphTa66cohxibYDMvuWfJArLV6HTFoKT4Aibqia0QcnZbnqhaHF5g/640?wx_fmt=jpeg"
+                                    class="rich_pages wxw-img"
+                                    data-ratio="0.44722222222222224" data-s="300,640" data-type="png" data-w="1080"
+                                    style="caret-color: rgb(0, 0, 0); color: rgb(0, 0, 0); font-weight: 400; letter-spacing: normal; text-align: start; white-space-collapse: collapse; outline: 0px; width: 579px !important; visibility: visible !important; height: auto !important;"
+                                    data-croporisrc="https://mmbiz.qpic.cn/mmbiz_png/twW3euR3BMIMkk15K4JCJKHQWSxSeEqicOju9uRCAvQ8C9aMibgKt4VE48VDHMTYjhoOOM4ciaMOLzDCZyEsytSjg/640?wx_fmt=other&amp;from=appmsg&amp;tp=webp&amp;wxfrom=5&amp;wx_lazy=1&amp;wx_co=1"
+                                    data-cropx2="1080" data-cropy2="483.1088082901554" data-imgfileid="100000983"
+                                    data-original-style="caret-color: rgb(0, 0, 0);color: rgb(0, 0, 0);font-weight: 400;letter-spacing: normal;text-align: start;white-space-collapse: collapse;outline: 0px;width: 579px;visibility: visible !important;height: auto !important;"
+                                    data-index="7"
+                                    src="https://mmbiz.qpic.cn/mmbiz_jpg/twW3euR3BMJaBWaicHQq4icagaiageoklRIx6gcXphTa66cohxibYDMvuWfJArLV6HTFoKT4Aibqia0QcnZbnqhaHF5g/640?wx_fmt=jpeg&amp;tp=webp&amp;wxfrom=5&amp;wx_lazy=1"
+                                    _width="579px" alt="Image" data-report-img-idx="6" data-fail="0"></span></strong></span></p>
+                <p><span leaf=""><br></span></p>
+            </section>
+        </section>
+    </section>
+    <p style="display: none;"><mp-style-type data-value="3"></mp-style-type></p>
+</div>'''
+
+TEMPLATE_SOURCES = {
+    'base': BASE_TEMPLATE,
+    'topic': TOPIC_TEMPLATE,
+    'section_header': SECTION_HEADER_TEMPLATE,
+    'subtitle_spacer': SUBTITLE_SPACER_TEMPLATE,
+    'subtitle': SUBTITLE_TEMPLATE,
+    'question': QUESTION_TEMPLATE,
+    'first_answer': FIRST_ANSWER_TEMPLATE,
+    'answer': ANSWER_TEMPLATE,
+    'emphasis': EMPHASIS_TEMPLATE,
+    'footer': FOOTER_TEMPLATE,
+}
+
+
+@lru_cache(maxsize=None)
+def get_template(name):
+    """获取编译好的模板：内联样式表并压缩后编译（每个进程只编译一次）"""
+    return CompiledTemplate(compact_html(inline_styles(TEMPLATE_SOURCES[name])))
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+import tolerant_json
+from archive import ArticleArchive, renderer_version, segment, unsegment
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def archive(tmp_path):
+    with ArticleArchive(str(tmp_path / 'articles.db')) as archive:
+        yield archive
+
+
+@pytest.fixture
+def data():
+    return tolerant_json.load_file(os.path.join(ROOT, 'data_example.json'))
+
+
+@pytest.mark.parametrize('text', [
+    '2020年', '在 2020 年', 'LLM量化', '大模型 LLM 量化', '中 文', '  前后有空格的English  ', '全角，标点。',
+])
+def test_unsegment_inverts_segment(text):
+    assert unsegment(segment(text)) == text.strip()
+
+
+def test_ingest_records_renderer_version(archive, data):
+    assert archive.ingest('a', data) == 'added'
+    assert archive.ingest('b', data, html='<p>刚渲染</p>', renderer_version=renderer_version()) == 'added'
+    assert {row['renderer_version'] for row in archive.list()} == {renderer_version()}
+    assert list(archive.rerender()) == []
+    assert archive.ingest('a', data) == 'unchanged'
+
+
+def test_rerender_picks_up_supplied_html(archive, data):
+    assert archive.ingest('old', data, html='<p>旧版渲染</p>') == 'added'
+    assert archive.get('old')['renderer_version'] is None
+    assert list(archive.rerender()) == [('old', 'updated', None)]
+    row = archive.get('old')
+    assert row['renderer_version'] == renderer_version()
+    assert row['html'] != '<p>旧版渲染</p>'
+    assert list(archive.rerender()) == []
+
+
+def test_ingest_supplied_html_clears_renderer_version(archive, data):
+    archive.ingest('a', data)
+    assert archive.ingest('a', data, html='<p>旧版渲染</p>') == 'updated'
+    assert archive.get('a')['renderer_version'] is None
+    assert list(archive.rerender()) == [('a', 'updated', None)]
+
+
+def test_search_snippet_keeps_original_spacing(archive, data):
+    data['main_sections'][0]['sub_sections'][0]['answer'] = '我在2020年开始做 LLM 量化研究。'
+    archive.ingest('a', data)
+    snippets = [result['snippet'] for result in archive.search('量化') if result['kind'] == 'qa']
+    assert '我在2020年开始做 LLM 【量化】研究。' in snippets
@@ -0,0 +1,48 @@
+import pytest
+
+from article_stats import apply_stats, compute_stats, count_text
+
+
+def article(*answers):
+    return {'main_sections': [{'sub_sections': [{'question': '', 'answer': answer} for answer in answers]}]}
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('我们用BitNet b1.58做实验', (6, 2)),
+    ("it's a well-known 2-bit trick", (0, 5)),
+    ('低比特量化，LLM 推理！', (7, 1)),
+    ('１２３，。！', (0, 0)),
+    ('', (0, 0)),
+])
+def test_count_mixed_chinese_and_latin(text, expected):
+    assert count_text(text) == expected
+
+
+def test_word_count_covers_questions_and_answers():
+    data = {'main_sections': [
+        {'sub_sections': [{'question': '为什么？', 'answer': '因为 GPU 贵。'}]},
+        {'sub_sections': [{'question': 'Why', 'answer': '省钱'}, {'question': '', 'answer': None}]},
+    ]}
+    stats = compute_stats(data)
+    assert (stats['cjk_chars'], stats['latin_words'], stats['word_count']) == (8, 2, 10)
+    assert (stats['sections'], stats['questions']) == (2, 3)
+
+
+@pytest.mark.parametrize('cjk_chars, latin_words, minutes', [
+    (0, 0, 1),
+    (1, 0, 1),
+    (450, 0, 1),
+    (451, 0, 2),
+    (450, 200, 2),
+    (450, 201, 3),
+])
+def test_reading_time_rounds_up_to_at_least_one_minute(cjk_chars, latin_words, minutes):
+    data = article('字' * cjk_chars + ' word' * latin_words)
+    assert compute_stats(data)['reading_time'] == minutes
+
+
+def test_apply_stats_overwrites_model_numbers_as_strings():
+    data = article('一二三 four')
+    data.update(word_count='4,521', reading_time='约15分钟')
+    apply_stats(data)
+    assert (data['word_count'], data['reading_time']) == ('4', '1')
@@ -0,0 +1,34 @@
+import os
+
+from async_pipeline import verbatim_path_for
+from batch import collect_inputs, find_duplicate_stems
+
+
+def touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('张三：你好\n')
+
+
+def test_glob_keeps_only_transcripts(tmp_path):
+    for name in ('a.txt', 'a_verbatim.txt', 'a_manifest.json', 'interview_article.html', 'notes.md'):
+        touch(str(tmp_path / name))
+    os.makedirs(tmp_path / 'sub.txt')
+    expected = [str(tmp_path / 'a.txt')]
+    assert collect_inputs(str(tmp_path / '*')) == expected
+    assert collect_inputs(str(tmp_path)) == expected
+
+
+def test_duplicate_stems_detected(tmp_path):
+    paths = [str(tmp_path / 'a' / 'x.txt'), str(tmp_path / 'b' / 'x.txt'), str(tmp_path / 'b' / 'y.txt')]
+    for path in paths:
+        touch(path)
+    inputs = collect_inputs(str(tmp_path / '*' / '*.txt'))
+    assert find_duplicate_stems(inputs) == {'x': paths[:2]}
+    assert find_duplicate_stems(paths[1:]) == {}
+
+
+def test_verbatim_path_never_equals_input():
+    assert verbatim_path_for('in.txt/a.txt') == 'in.txt/a_verbatim.txt'
+    assert verbatim_path_for('a.json') == 'a.json_verbatim.txt'
+    assert verbatim_path_for('dir/a.txt', 'out') == os.path.join('out', 'a_verbatim.txt')
@@ -0,0 +1,86 @@
+import os
+
+from chunking import (ChunkStitcher, VerbatimSegmenter, estimate_tokens, split_transcript, split_units,
+                      stitch_chunks)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def example_transcript(repeat=6):
+    with open(os.path.join(ROOT, 'example_transcript.txt'), encoding='utf-8') as f:
+        return '\n\n'.join([f.read().strip()] * repeat)
+
+
+def test_split_units_at_blank_lines_and_speakers():
+    transcript = '主持人：你好。\n张三：你好。\n接着说。\n\n李四：我补充一点。'
+    assert split_units(transcript) == ['主持人：你好。', '张三：你好。\n接着说。', '李四：我补充一点。']
+
+
+def test_chunks_keep_speaker_turns_whole_and_within_budget():
+    transcript = example_transcript()
+    units = split_units(transcript)
+    chunks = split_transcript(transcript, max_tokens=300)
+    assert len(chunks) > 1
+    bodies = [chunk['body'].split('\n\n') for chunk in chunks]
+    assert [unit for body in bodies for unit in body] == units
+    for chunk, body in zip(chunks, bodies):
+        assert estimate_tokens(chunk['body']) <= 300 or len(body) == 1
+
+
+def test_chunk_context_is_previous_tail():
+    chunks = split_transcript(example_transcript(), max_tokens=300, overlap=1)
+    assert chunks[0]['context'] == ''
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk['context'] == previous['body'].split('\n\n')[-1]
+    assert all(chunk['context'] == '' for chunk in split_transcript(example_transcript(), 300, overlap=0))
+
+
+def test_oversized_turn_split_at_sentence_ends():
+    turn = '张三：' + '这是一句比较长的话，用来测试切分。' * 40
+    chunks = split_transcript(turn, max_tokens=100)
+    assert len(chunks) > 1
+    assert ''.join(chunk['body'] for chunk in chunks) == turn
+    assert all(chunk['body'].endswith('。') for chunk in chunks)
+    assert all(estimate_tokens(chunk['body']) <= 100 for chunk in chunks)
+
+
+def test_stitcher_drops_retranscribed_context_only():
+    outputs = [
+        '主持人：第一个问题。\n\n张三：第一个回答，内容比较长一些。',
+        # 模型把上下文（上一片段最后一段）又转写了一遍，标点略有不同
+        '张三：第一个回答 内容比较长一些\n\n主持人：第二个问题。\n\n张三：第二个回答。',
+        '主持人：第三个问题。',
+    ]
+    assert stitch_chunks(outputs) == (
+        '主持人：第一个问题。\n\n张三：第一个回答，内容比较长一些。\n\n'
+        '主持人：第二个问题。\n\n张三：第二个回答。\n\n主持人：第三个问题。'
+    )
+
+
+def test_stitcher_keeps_distinct_paragraphs():
+    stitcher = ChunkStitcher()
+    assert stitcher.add('张三：好的。') == ['张三：好的。']
+    assert stitcher.add('主持人：好的，我们继续。') == ['主持人：好的，我们继续。']
+    assert stitcher.add('') == []
+    assert stitcher.add('张三：接着说。') == ['张三：接着说。']
+
+
+def test_split_then_stitch_round_trip():
+    transcript = example_transcript()
+    chunks = split_transcript(transcript, max_tokens=300)
+    # 每个片段的输出都带上重新转写的上下文
+    outputs = [f"{chunk['context']}\n\n{chunk['body']}" if chunk['context'] else chunk['body'] for chunk in chunks]
+    assert stitch_chunks(outputs) == '\n\n'.join(split_units(transcript))
+
+
+def test_segmenter_splits_streamed_text_at_paragraph_starts():
+    verbatim = '\n\n'.join(split_units(example_transcript()))
+    segments = []
+    segmenter = VerbatimSegmenter(lambda index, text: segments.append((index, text)), max_tokens=200)
+    for start in range(0, len(verbatim), 7):
+        segmenter.feed(verbatim[start:start + 7])
+    assert segmenter.finish() == len(segments) > 1
+    assert [index for index, _ in segments] == list(range(len(segments)))
+    assert '\n\n'.join(text for _, text in segments) == verbatim
+    units = set(split_units(verbatim))
+    assert all(text.split('\n\n')[0] in units for _, text in segments)
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from emphasis import EmphasisMatcher, wrap_matches
+
+
+def bold(phrase):
+    return f'[{phrase}]'
+
+
+def reference_find(phrases, text):
+    """朴素实现：从左到右，每个位置取最长的短语，匹配后跳过"""
+    phrases = sorted({p.strip() for p in phrases if p.strip()}, key=len, reverse=True)
+    matches = []
+    position = 0
+    while position < len(text):
+        for phrase in phrases:
+            if text.startswith(phrase, position):
+                matches.append((position, position + len(phrase)))
+                position += len(phrase)
+                break
+        else:
+            position += 1
+    return matches
+
+
+def test_longest_phrase_wins_at_same_start():
+    matcher = EmphasisMatcher(['深度', '深度学习'])
+    assert matcher.apply('我做深度学习', bold) == '我做[深度学习]'
+
+
+def test_leftmost_match_wins_over_longer_overlapping_one():
+    matcher = EmphasisMatcher(['大模型', '模型量化技术'])
+    assert matcher.find('大模型量化技术') == [(0, 3)]
+
+
+def test_matches_do_not_overlap():
+    matcher = EmphasisMatcher(['abc', 'bcd', 'cd'])
+    assert matcher.find('abcd') == [(0, 3)]
+    assert matcher.apply('abcdcd', bold) == '[abc]d[cd]'
+
+
+def test_phrase_inside_longer_failed_prefix():
+    # 'abcx' 失配后要通过失配指针找到 'bc'
+    matcher = EmphasisMatcher(['abcd', 'bc'])
+    assert matcher.find('abce') == [(1, 3)]
+
+
+def test_empty_matcher():
+    matcher = EmphasisMatcher([' ', ''])
+    assert len(matcher) == 0
+    assert matcher.find('任何文本') == []
+    assert matcher.apply('任何文本', bold) == '任何文本'
+
+
+def test_fingerprint_ignores_order_and_whitespace():
+    assert EmphasisMatcher(['甲', ' 乙']).fingerprint == EmphasisMatcher(['乙', '甲']).fingerprint
+    assert EmphasisMatcher(['甲']).fingerprint != EmphasisMatcher(['乙']).fingerprint
+
+
+def test_wrap_matches_reuses_find_result():
+    matcher = EmphasisMatcher(['量化', '推理'])
+    text = '量化之后推理更快'
+    matches = matcher.find(text)
+    assert wrap_matches(text, matches, bold) == matcher.apply(text, bold) == '[量化]之后[推理]更快'
+    assert wrap_matches(text, matches, lambda p: f'**{p}**') == '**量化**之后**推理**更快'
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_matches_reference_implementation(seed):
+    rng = random.Random(seed)
+    alphabet = 'abcd'
+    phrases = [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(8)]
+    text = ''.join(rng.choice(alphabet) for _ in range(60))
+    assert EmphasisMatcher(phrases).find(text) == reference_find(phrases, text)
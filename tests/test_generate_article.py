@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+import tolerant_json
+import interview_model
+import generate_article
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def data():
+    return tolerant_json.load_file(os.path.join(ROOT, 'data_example.json'))
+
+
+def test_generate_section_html_accepts_article_dict(data):
+    section = data['main_sections'][0]
+    html = generate_article.generate_section_html(section, data)
+    assert html == generate_article.generate_section_html(section, data['guest_name'])
+    assert html == generate_article.generate_section_html(section, interview_model.Interview.from_dict(data))
+    assert f"{data['guest_name']}：" in html
+    assert html in generate_article.generate_wechat_article_html(data)
+
+
+def test_render_helpers_accept_article_dict(data):
+    interview = interview_model.Interview.from_dict(data)
+    from_dict, from_interview = [], []
+    generate_article.render_article_into(from_dict, data)
+    generate_article.render_article_into(from_interview, interview)
+    assert ''.join(from_dict) == ''.join(from_interview) == generate_article.generate_wechat_article_html(data)
+
+
+@pytest.mark.parametrize('phrases', [[], ['学习', '算法竞赛', '学习方法']])
+def test_html_entry_points_agree(data, phrases):
+    previous = generate_article.get_emphasis_matcher()
+    generate_article.set_emphasis_patterns(phrases)
+    try:
+        interview = interview_model.Interview.from_dict(data)
+        sink = generate_article.WeChatHTMLSink()
+        for _ in generate_article.walk_article(interview, [sink]):
+            pass
+        html = generate_article.generate_wechat_article_html(interview)
+        assert ''.join(sink.out) == html
+        assert ''.join(generate_article.iter_article_html(data)) == html
+        assert ''.join(
+            generate_article.generate_section_html(section, interview) for section in interview.main_sections
+        ) in html
+        if phrases:
+            assert generate_article._bold(phrases[0]) in html
+    finally:
+        generate_article._emphasis_matcher = previous
+
+
+def test_sinks_without_phrases_share_one_walk(data):
+    from article_export import MarkdownSink
+    previous = generate_article.get_emphasis_matcher()
+    generate_article.set_emphasis_patterns([])
+    try:
+        interview = interview_model.Interview.from_dict(data)
+        html, markdown = generate_article.WeChatHTMLSink(), MarkdownSink()
+        for _ in generate_article.walk_article(interview, [html, markdown]):
+            pass
+        assert ''.join(html.out) == generate_article.generate_wechat_article_html(interview)
+        first_answer = data['main_sections'][0]['sub_sections'][0]['answer'].split('\n')[0]
+        assert f"**{data['guest_name']}：**{first_answer}\n" in ''.join(markdown.out)
+    finally:
+        generate_article._emphasis_matcher = previous
@@ -0,0 +1,58 @@
+import os
+import copy
+
+import pytest
+
+import tolerant_json
+import generate_article
+from incremental_render import IncrementalRenderer, fragment_index_path
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def data():
+    return tolerant_json.load_file(os.path.join(ROOT, 'data_example.json'))
+
+
+def read(path):
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return f.read()
+
+
+def test_render_matches_generate_wechat_article_html(data):
+    assert IncrementalRenderer().render(data) == generate_article.generate_wechat_article_html(data)
+
+
+def test_rerender_after_edit_reuses_unchanged_sections(data, tmp_path):
+    html_path = str(tmp_path / 'article.html')
+    IncrementalRenderer(keep_fragments=False).write(data, html_path)
+    assert read(html_path) == generate_article.generate_wechat_article_html(data)
+    assert os.path.exists(fragment_index_path(html_path))
+
+    edited = copy.deepcopy(data)
+    edited['main_sections'][1]['sub_sections'][0]['answer'] += '补充一句。'
+    renderer = IncrementalRenderer(keep_fragments=False)
+    renderer.write(edited, html_path)
+    assert read(html_path) == generate_article.generate_wechat_article_html(edited)
+    assert renderer.rendered == 1
+    assert renderer.reused == len(data['main_sections']) + 1
+    assert renderer.fragments == {}
+
+
+def test_watch_renderer_keeps_fragments_in_memory(data, tmp_path):
+    html_path = str(tmp_path / 'article.html')
+    renderer = IncrementalRenderer()
+    renderer.write(data, html_path)
+    os.remove(fragment_index_path(html_path))
+    renderer.write(data, html_path)
+    assert renderer.rendered == 0
+    assert read(html_path) == generate_article.generate_wechat_article_html(data)
+
+
+def test_prerendered_section_is_reused(data):
+    renderer = IncrementalRenderer(keep_fragments=False)
+    renderer.prerender_section(data['main_sections'][0], data['guest_name'], 0)
+    html = renderer.render(data)
+    assert html == generate_article.generate_wechat_article_html(data)
+    assert renderer.reused == 1
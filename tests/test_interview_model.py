@@ -0,0 +1,93 @@
+import copy
+
+import pytest
+
+from interview_model import Interview, InterviewDataError, Section, normalize
+
+
+def qa(question='问题', answer='回答', subtitle=None):
+    item = {'question': question, 'answer': answer}
+    if subtitle is not None:
+        item['subtitle'] = subtitle
+    return item
+
+
+def article(sections=None, **fields):
+    data = {'guest_name': '张三', 'main_sections': sections or [{'title': '章节', 'sub_sections': [qa()]}]}
+    data.update(fields)
+    return data
+
+
+def error_message(data):
+    with pytest.raises(InterviewDataError) as info:
+        Interview.from_dict(data)
+    return str(info.value)
+
+
+def test_error_reports_nested_path():
+    sections = [{'sub_sections': [qa(), qa()]} for _ in range(3)]
+    sections[2]['sub_sections'][1]['answer'] = '  '
+    assert error_message(article(sections)) == 'main_sections[2].sub_sections[1].answer: 不能为空'
+
+
+@pytest.mark.parametrize('mutate, message', [
+    (lambda d: d.pop('guest_name'), 'guest_name: 不能为空'),
+    (lambda d: d.update(main_sections=[]), 'main_sections: 至少需要一个章节'),
+    (lambda d: d['main_sections'][0].update(sub_sections=None), 'main_sections[0].sub_sections: 至少需要一个问答'),
+    (lambda d: d['main_sections'].append('第二章'), 'main_sections[1]: 应为对象，实际为 str'),
+    (lambda d: d['main_sections'][0]['sub_sections'][0].update(question=42),
+     'main_sections[0].sub_sections[0].question: 应为字符串，实际为 int'),
+    (lambda d: d['main_sections'][0]['sub_sections'].append(['问题', '回答']),
+     'main_sections[0].sub_sections[1]: 应为对象，实际为 list'),
+    (lambda d: d.update(topics='主题'), 'topics: 应为字符串列表，实际为 str'),
+    (lambda d: d.update(topics=['主题', 3]), 'topics[1]: 应为字符串，实际为 int'),
+    (lambda d: d.update(word_count='很多'), "word_count: 无法识别的数字 '很多'"),
+    (lambda d: d.update(reading_time=True), 'reading_time: 应为数字，实际为 bool'),
+])
+def test_invalid_fields_rejected(mutate, message):
+    data = article()
+    mutate(data)
+    assert error_message(data) == message
+
+
+def test_error_is_value_error():
+    assert issubclass(InterviewDataError, ValueError)
+    with pytest.raises(ValueError):
+        Interview.from_dict([])
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('4,521', 4521), ('4，521', 4521), ('约15分钟', 15), (7, 7), ('12', 12),
+])
+def test_counts_accept_formatted_strings(value, expected):
+    interview = Interview.from_dict(article(word_count=value, reading_time=value))
+    assert interview.word_count == interview.reading_time == expected
+
+
+def test_missing_counts_computed_locally():
+    interview = Interview.from_dict(article(word_count='', reading_time=None))
+    assert (interview.word_count, interview.reading_time) == (4, 1)
+
+
+def test_subtitle_carries_over_and_is_shared():
+    section = Section.from_dict({'sub_sections': [
+        qa(subtitle=''), qa(subtitle=' 开场 '), qa(), qa(subtitle='开场'), qa(subtitle='深入'), qa(subtitle=None),
+    ]}, index=4)
+    subtitles = [item.subtitle for item in section.sub_sections]
+    assert subtitles == ['', '开场', '开场', '开场', '深入', '深入']
+    assert section.sub_sections[1].subtitle is section.sub_sections[3].subtitle
+    assert section.id == '05'
+
+
+@pytest.mark.parametrize('section_id, expected', [(None, '01'), ('', '01'), (3, '03'), (' 2a ', '2a')])
+def test_section_id(section_id, expected):
+    assert Section.from_dict({'id': section_id, 'sub_sections': [qa()]}).id == expected
+
+
+def test_normalize_round_trip_keeps_original_format():
+    data = article(word_count='4,521', reading_time='约15分钟', topics=[' 主题一 ', '', '主题二'], extra='忽略')
+    normalized = normalize(copy.deepcopy(data))
+    assert normalized['word_count'] == '4521' and normalized['reading_time'] == '15'
+    assert normalized['topics'] == ['主题一', '主题二']
+    assert 'extra' not in normalized
+    assert normalize(normalized) == normalized
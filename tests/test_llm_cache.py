@@ -0,0 +1,91 @@
+import os
+import time
+import asyncio
+
+import pytest
+
+from llm_cache import LLMCache, open_cache
+from benchmarks.mock_llm_server import MockLLM, start_server, load_prompts
+
+KEY_ARGS = ('系统提示', '用户内容', 'model-a', 0.3)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMCache(str(tmp_path / 'cache'))
+
+
+@pytest.mark.parametrize('changed', [
+    ('另一个系统提示', '用户内容', 'model-a', 0.3),
+    ('系统提示', '另一段内容', 'model-a', 0.3),
+    ('系统提示', '用户内容', 'model-b', 0.3),
+    ('系统提示', '用户内容', 'model-a', 0.7),
+])
+def test_key_changes_with_prompt_model_and_params(cache, changed):
+    cache.set(LLMCache.make_key(*KEY_ARGS), '结果')
+    assert LLMCache.make_key(*KEY_ARGS) == LLMCache.make_key(*KEY_ARGS)
+    assert cache.get(LLMCache.make_key(*changed)) is None
+    assert cache.get(LLMCache.make_key(*KEY_ARGS)) == '结果'
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_refresh_ignores_existing_entries_but_writes(tmp_path):
+    key = LLMCache.make_key(*KEY_ARGS)
+    LLMCache(str(tmp_path)).set(key, '旧结果')
+    refreshing = LLMCache(str(tmp_path), refresh=True)
+    assert refreshing.get(key) is None
+    refreshing.set(key, '新结果')
+    assert LLMCache(str(tmp_path)).get(key) == '新结果'
+
+
+def test_expired_entries_miss_and_are_evicted(tmp_path):
+    cache = LLMCache(str(tmp_path), max_age_days=1)
+    key = LLMCache.make_key(*KEY_ARGS)
+    cache.set(key, '结果')
+    path = cache._path(key)
+    old = time.time() - 2 * 24 * 3600
+    os.utime(path, (old, old))
+    assert cache.get(key) is None
+    assert cache.evict() == 1
+    assert not path.exists()
+
+
+def test_open_cache_follows_flags(tmp_path):
+    config = {'cache_dir': str(tmp_path), 'cache_max_mb': 1, 'cache_max_age_days': 1}
+    assert open_cache(config, no_cache=True) is None
+    assert open_cache(config, refresh=True).refresh
+    assert not open_cache(config).refresh
+
+
+@pytest.fixture(scope='module')
+def mock_llm():
+    llm = MockLLM(load_prompts())
+    server, url = start_server(llm)
+    llm.url = url
+    yield llm
+    server.shutdown()
+
+
+def test_engine_uses_cache_unless_bypassed(mock_llm, tmp_path, monkeypatch):
+    pytest.importorskip('openai')
+    monkeypatch.setenv('API_KEY', 'mock')
+    monkeypatch.setenv('BASE_URL', mock_llm.url)
+    monkeypatch.setenv('MODEL_NAME', 'mock')
+    monkeypatch.setenv('LLM_CACHE_DIR', str(tmp_path / 'cache'))
+    import pipeline
+    from async_pipeline import LLMEngine
+    config = pipeline.load_config()
+
+    def call(cache):
+        async def main():
+            async with LLMEngine(config, cache=cache) as engine:
+                await engine.complete('系统提示', '用户内容')
+        before = mock_llm.requests
+        asyncio.run(main())
+        return mock_llm.requests - before
+
+    assert call(open_cache(config)) == 1
+    assert call(open_cache(config)) == 0
+    assert call(open_cache(config, no_cache=True)) == 1
+    assert call(open_cache(config, refresh=True)) == 1
+    assert call(open_cache(config)) == 0
@@ -0,0 +1,147 @@
+import time
+import asyncio
+
+import pytest
+
+from llm_retry import CircuitBreaker
+
+
+def open_breaker():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.record_failure()
+    assert not breaker.allow()
+    # 跳过熔断时间
+    breaker.opened_at = time.monotonic() - 61
+    return breaker
+
+
+def test_half_open_lets_one_probe_through():
+    breaker = open_breaker()
+    assert breaker.allow()
+    assert breaker.probing
+    assert not breaker.allow()
+    assert not breaker.allow()
+
+
+def test_probe_success_closes_breaker():
+    breaker = open_breaker()
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.allow() and breaker.allow()
+    assert not breaker.probing
+
+
+def test_probe_failure_reopens_breaker():
+    breaker = open_breaker()
+    assert breaker.allow()
+    assert breaker.record_failure()
+    assert not breaker.allow()
+    assert breaker.remaining() > 59
+
+
+def test_released_probe_lets_next_caller_probe():
+    breaker = open_breaker()
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_concurrent_callers_send_a_single_probe(monkeypatch, tmp_path):
+    import asyncio
+    import pipeline
+    from async_pipeline import LLMEngine
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('API_KEY', 'mock')
+    monkeypatch.setenv('MODEL_NAME', 'a')
+    config = pipeline.load_config()
+    calls = []
+
+    async def request(name):
+        calls.append(name)
+        await asyncio.sleep(0.01)
+        return name
+
+    async def main():
+        async with LLMEngine(config) as engine:
+            for name in ('a', 'b'):
+                breaker = engine._breaker(name)
+                breaker.opened_at = time.monotonic() - breaker.reset_timeout - 1
+            return await asyncio.gather(*(engine._schedule(['a', 'b'], 1, request) for _ in range(5)))
+
+    results = asyncio.run(main())
+    # 两个模型各放行一个试探请求，其余调用方等试探成功后再发
+    assert calls[:2] == ['a', 'b']
+    assert len(calls) == 5
+    assert set(results) <= {'a', 'b'}
+
+
+class FakeClock:
+    """替换 RateLimiter 用到的时钟和 asyncio.sleep：sleep 只推进时间并记下等待的秒数"""
+
+    def __init__(self, monkeypatch):
+        import async_pipeline
+        self.now = 1000.0
+        self.sleeps = []
+        monkeypatch.setattr(async_pipeline.time, 'monotonic', lambda: self.now)
+        monkeypatch.setattr(async_pipeline.asyncio, 'sleep', self.sleep)
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def acquire_all(limiter, tokens_list):
+    async def main():
+        for tokens in tokens_list:
+            await limiter.acquire(tokens)
+    asyncio.run(main())
+
+
+def test_rate_limiter_enforces_rpm(monkeypatch):
+    from async_pipeline import RateLimiter
+    clock = FakeClock(monkeypatch)
+    limiter = RateLimiter(rpm=60)
+    acquire_all(limiter, [0] * 60)
+    assert clock.sleeps == []
+    acquire_all(limiter, [0, 0])
+    assert clock.sleeps == pytest.approx([1.0, 1.0])
+
+
+def test_rate_limiter_enforces_tpm(monkeypatch):
+    from async_pipeline import RateLimiter
+    clock = FakeClock(monkeypatch)
+    limiter = RateLimiter(tpm=1000)
+    acquire_all(limiter, [600])
+    assert clock.sleeps == []
+    acquire_all(limiter, [600])
+    # 还差200个token，按每分钟1000个的速度补充需要12秒
+    assert clock.sleeps == pytest.approx([12.0])
+    # 超过整桶容量的请求按整桶计算，不会永远等待
+    acquire_all(limiter, [5000])
+    assert sum(clock.sleeps) == pytest.approx(72.0)
+
+
+def test_rate_limiter_refills_up_to_capacity(monkeypatch):
+    from async_pipeline import RateLimiter
+    clock = FakeClock(monkeypatch)
+    limiter = RateLimiter(rpm=60, tpm=6000)
+    acquire_all(limiter, [100] * 60)
+    clock.now += 30
+    acquire_all(limiter, [100] * 30)
+    assert clock.sleeps == []
+    # 空闲再久，桶也只补满到上限
+    clock.now += 3600
+    acquire_all(limiter, [100] * 60)
+    assert clock.sleeps == []
+    acquire_all(limiter, [100])
+    assert clock.sleeps == pytest.approx([1.0])
+
+
+def test_rate_limiter_unlimited_never_waits(monkeypatch):
+    from async_pipeline import RateLimiter
+    clock = FakeClock(monkeypatch)
+    acquire_all(RateLimiter(), [10 ** 6] * 100)
+    assert clock.sleeps == []
@@ -0,0 +1,57 @@
+import json
+import asyncio
+
+from chunking import estimate_tokens
+from metrics import OTHER_STAGE, PipelineMetrics, current_stage, record_file_written
+
+
+def test_estimate_tokens():
+    assert estimate_tokens('') == 0
+    assert estimate_tokens('你好，世界') == 5
+    assert estimate_tokens('abcdefgh') == 2
+    assert estimate_tokens('中文abcd') == 3
+
+
+def test_calls_are_recorded_under_current_stage():
+    metrics = PipelineMetrics()
+
+    async def run():
+        with metrics.stage('json'):
+            metrics.record_llm_call(prompt_tokens=100, completion_tokens=20)
+            # asyncio.to_thread 中的调用记到同一个阶段
+            await asyncio.to_thread(metrics.record_llm_call, 0, 0, True)
+            await asyncio.to_thread(metrics.record_retry)
+        metrics.record_llm_call(prompt_tokens=1)
+
+    asyncio.run(run())
+    assert current_stage() == OTHER_STAGE
+    record = metrics.stages['json']
+    assert (record['llm_calls'], record['cache_hits'], record['retries']) == (2, 1, 1)
+    assert (record['prompt_tokens'], record['completion_tokens'], record['runs']) == (100, 20, 1)
+    assert metrics.stages[OTHER_STAGE]['prompt_tokens'] == 1
+    assert metrics.totals()['llm_calls'] == 3
+
+
+def test_file_writes_counted(tmp_path):
+    metrics = PipelineMetrics()
+    path = tmp_path / 'out.txt'
+    path.write_text('12345', encoding='utf-8')
+    with metrics.stage('html'):
+        record_file_written(str(path))
+    assert metrics.stages['html']['bytes_written'] == 5
+
+
+def test_jsonl_and_prometheus_output(tmp_path):
+    metrics = PipelineMetrics()
+    with metrics.stage('verbatim'):
+        metrics.record_llm_call(prompt_tokens=10, completion_tokens=5)
+    jsonl_path = tmp_path / 'metrics.jsonl'
+    metrics.write(str(jsonl_path), transcript='a"b.txt')
+    rows = [json.loads(line) for line in jsonl_path.read_text(encoding='utf-8').splitlines()]
+    assert rows[0]['stage'] == 'verbatim' and rows[0]['transcript'] == 'a"b.txt'
+    assert rows[0]['prompt_tokens'] == 10
+
+    prom_path = tmp_path / 'metrics.prom'
+    metrics.write(str(prom_path), transcript='a"b.txt')
+    text = prom_path.read_text(encoding='utf-8')
+    assert 'interview_pipeline_prompt_tokens_total{transcript="a\\"b.txt",stage="verbatim"} 10' in text
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+import async_pipeline
+from metrics import PipelineMetrics
+
+
+class Engine:
+    def __init__(self):
+        self.config = {'max_concurrency': 2}
+        self.metrics = PipelineMetrics()
+
+
+def test_segment_failure_stops_producer_and_header(monkeypatch):
+    state = {'produce_cancelled': False, 'header_started': False}
+
+    async def request_part(engine, prompt, text, label, *args):
+        if text == 'bad':
+            raise RuntimeError('片段提取失败')
+        if label == '文章信息':
+            state['header_started'] = True
+        await asyncio.sleep(0)
+        return {'main_sections': [{'id': '01', 'title': text, 'sub_sections': [{'question': 'q', 'answer': 'a'}]}]}
+
+    async def produce(on_segment):
+        on_segment(0, 'bad')
+        try:
+            # 逐字稿还要很久才能生成完
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            state['produce_cancelled'] = True
+            raise
+        return 'bad'
+
+    monkeypatch.setattr(async_pipeline, '_request_part', request_part)
+    prompts = {'verbatim_segment': {'content': ''}, 'verbatim_header': {'content': ''}}
+
+    async def run():
+        await asyncio.wait_for(async_pipeline.verbatim_to_json_by_segment(Engine(), prompts, produce), 5)
+
+    with pytest.raises(RuntimeError, match='片段提取失败'):
+        asyncio.run(run())
+    assert state == {'produce_cancelled': True, 'header_started': False}
+
+
+def test_header_failure_cancels_workers(monkeypatch):
+    cancelled = []
+
+    async def request_part(engine, prompt, text, label, *args):
+        if label == '文章信息':
+            raise RuntimeError('文章信息提取失败')
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.append(text)
+            raise
+
+    async def produce(on_segment):
+        on_segment(0, 'slow')
+        return 'slow'
+
+    monkeypatch.setattr(async_pipeline, '_request_part', request_part)
+    prompts = {'verbatim_segment': {'content': ''}, 'verbatim_header': {'content': ''}}
+
+    async def run():
+        await asyncio.wait_for(async_pipeline.verbatim_to_json_by_segment(Engine(), prompts, produce), 5)
+
+    with pytest.raises(RuntimeError, match='文章信息提取失败'):
+        asyncio.run(run())
+    assert cancelled == ['slow']
@@ -0,0 +1,74 @@
+import os
+import shutil
+import asyncio
+
+import pytest
+
+import generate_article
+from benchmarks.mock_llm_server import MockLLM, start_server, load_prompts
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+pytest.importorskip('openai')
+
+
+@pytest.fixture(scope='module')
+def base_url():
+    server, url = start_server(MockLLM(load_prompts()))
+    yield url
+    server.shutdown()
+
+
+@pytest.fixture
+def config(base_url, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('API_KEY', 'mock')
+    monkeypatch.setenv('BASE_URL', base_url)
+    monkeypatch.setenv('MODEL_NAME', 'mock')
+    import pipeline
+    return pipeline.load_config()
+
+
+def run(config, txt_path, **options):
+    from async_pipeline import LLMEngine, run_pipeline
+
+    async def main():
+        async with LLMEngine(config) as engine:
+            result = await run_pipeline(engine, txt_path, load_prompts(), **options)
+            return result, engine.metrics.totals()['llm_calls']
+
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def transcript(tmp_path):
+    path = str(tmp_path / 'interview.txt')
+    shutil.copyfile(os.path.join(ROOT, 'example_transcript.txt'), path)
+    return path
+
+
+def read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('options', [{}, {'overlap': True}, {'by_section': True}, {'chunked': True, 'stream': True}])
+def test_pipeline_against_mock_server(config, transcript, options):
+    result, calls = run(config, transcript, output_dir='out', **options)
+    assert calls > 0
+    assert result['data']['main_sections']
+    assert read(result['html_path']) == generate_article.generate_wechat_article_html(result['data'])
+
+
+def test_rerun_reuses_stages_and_copies_into_new_output_dir(config, transcript):
+    first, _ = run(config, transcript, output_dir='a')
+    again, calls = run(config, transcript, output_dir='a')
+    assert calls == 0
+    assert set(again['timings'].values()) == {None}
+
+    moved, calls = run(config, transcript, output_dir='b')
+    assert calls == 0
+    assert moved['verbatim_path'] == os.path.join('b', 'interview_verbatim.txt')
+    assert moved['json_path'] == os.path.join('b', 'interview_data.json')
+    assert read(moved['json_path']) == read(first['json_path'])
+    assert read(moved['html_path']) == read(first['html_path'])
@@ -0,0 +1,28 @@
+import os
+import json
+
+import generate_article
+from render import render_file
+
+
+def test_invalid_data_leaves_no_tmp_file(tmp_path):
+    json_path = tmp_path / 'bad.json'
+    json_path.write_text(json.dumps({'guest_name': '张三'}), encoding='utf-8')
+    html_path = str(tmp_path / 'bad.html')
+    _, _, written, error = render_file(str(json_path), html_path)
+    assert error and written == 0
+    assert os.listdir(tmp_path) == ['bad.json']
+
+
+def test_render_failure_removes_tmp_file(tmp_path, monkeypatch):
+    json_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data_example.json')
+    html_path = str(tmp_path / 'a.html')
+
+    def fail(data, fp):
+        fp.write('<html>')
+        raise RuntimeError('模板出错')
+
+    monkeypatch.setattr(generate_article, 'render_to', fail)
+    _, _, _, error = render_file(json_path, html_path)
+    assert error == 'RuntimeError: 模板出错'
+    assert os.listdir(tmp_path) == []
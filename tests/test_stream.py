@@ -0,0 +1,122 @@
+import os
+import re
+import asyncio
+
+import pytest
+
+from chunking import estimate_tokens
+from benchmarks.mock_llm_server import MockLLM, start_server
+
+pytest.importorskip('openai')
+
+PROMPT = '把录音稿整理成逐字稿'
+CONTENT = '张三：今天聊聊 LLM 量化。'
+# 中英文混排，按16字一个chunk输出，数chunk和按文本估算的token数明显不同
+OUTPUT = ('张三：我们从 post-training quantization 讲起，再聊 QAT 和 GPTQ。\n' * 20)
+
+
+class ResumableLLM(MockLLM):
+    """续写请求只返回剩余部分，并记下每次请求中已生成的内容"""
+
+    def __init__(self):
+        super().__init__()
+        self.resumed_from = []
+
+    def respond(self, body):
+        assistant = [m['content'] for m in body['messages'] if m['role'] == 'assistant']
+        self.resumed_from.append(assistant[0] if assistant else '')
+        return OUTPUT[len(self.resumed_from[-1]):]
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture(scope='module')
+def server():
+    llm = ResumableLLM()
+    server, url = start_server(llm)
+    llm.url = url
+    yield llm
+    server.shutdown()
+
+
+@pytest.fixture
+def llm(server):
+    server.resumed_from.clear()
+    return server
+
+
+@pytest.fixture
+def config(llm, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('API_KEY', 'mock')
+    monkeypatch.setenv('BASE_URL', llm.url)
+    monkeypatch.setenv('MODEL_NAME', 'mock')
+    import pipeline
+    return pipeline.load_config()
+
+
+def stream(config, output_path, on_delta=None):
+    from async_pipeline import LLMEngine
+
+    async def main():
+        async with LLMEngine(config) as engine:
+            try:
+                return await engine.complete_stream(PROMPT, CONTENT, output_path, on_delta=on_delta)
+            finally:
+                stream.totals = engine.metrics.totals()
+
+    return asyncio.run(main())
+
+
+def interrupt_after(chunks):
+    received = []
+
+    def on_delta(delta):
+        received.append(delta)
+        if len(received) == chunks:
+            raise Interrupted()
+    return on_delta
+
+
+def read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def test_interrupted_stream_resumes_from_partial(config, llm, tmp_path, capsys):
+    output_path = str(tmp_path / 'verbatim.txt')
+    with pytest.raises(Interrupted):
+        stream(config, output_path, on_delta=interrupt_after(5))
+    partial = read(output_path)
+    assert partial and OUTPUT.startswith(partial) and partial != OUTPUT
+    assert os.path.exists(f'{output_path}.partial')
+    capsys.readouterr()
+
+    assert stream(config, output_path) == OUTPUT
+    assert llm.resumed_from == ['', partial]
+    assert read(output_path) == OUTPUT
+    assert not os.path.exists(f'{output_path}.partial')
+    assert f'已有 {len(partial)} 字' in capsys.readouterr().out
+
+    remainder = OUTPUT[len(partial):]
+    assert stream.totals['llm_calls'] == 1
+    assert stream.totals['completion_tokens'] == estimate_tokens(remainder)
+
+
+def test_progress_estimates_tokens_from_text(config, tmp_path, capsys):
+    stream(config, str(tmp_path / 'verbatim.txt'))
+    reported = re.findall(r'已接收约 (\d+) tokens', capsys.readouterr().out)
+    assert int(reported[-1]) == estimate_tokens(OUTPUT)
+    assert estimate_tokens(OUTPUT) != -(-len(OUTPUT) // 16)
+
+
+def test_marker_for_other_request_is_ignored(config, llm, tmp_path):
+    output_path = str(tmp_path / 'verbatim.txt')
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write('另一次请求的输出')
+    with open(f'{output_path}.partial', 'w', encoding='utf-8') as f:
+        f.write('other-key')
+    assert stream(config, output_path) == OUTPUT
+    assert llm.resumed_from == ['']
@@ -0,0 +1,39 @@
+import re
+
+import templates
+from templates import CompiledTemplate, compact_html, compact_style, get_template, inline_styles
+
+
+def test_compact_style():
+    style = 'font-size: 16px; color: rgb(62, 62, 62); outline: 0px; margin: 0px 0px 10px; color: rgb(0, 0, 0);'
+    assert compact_style(style) == 'font-size:16px;margin:0 0 10px;color:#000'
+    assert compact_style('font-family: &quot;PingFang SC&quot; , Arial') == "font-family:'PingFang SC',Arial"
+    assert compact_style('caret-color: red; visibility: visible') == ''
+
+
+def test_compact_html_keeps_placeholders_and_drops_empty_styles():
+    source = '''
+    <section style="outline: 0px;">
+        <p style="font-size: 16px;">{content}</p>
+    </section>
+    '''
+    assert compact_html(source) == '<section><p style="font-size:16px">{content}</p></section>'
+
+
+def test_inline_styles():
+    assert inline_styles('<p style="[[a]]">', {'a': 'color: red'}) == '<p style="color: red">'
+
+
+def test_compiled_template_does_not_touch_content():
+    template = CompiledTemplate('<p>{a}-{b}</p>')
+    content = '<b>  \n  rgb(1, 2, 3) style="x: 0px" {b}'
+    assert template.render(a=content, b=1) == f'<p>{content}-1</p>'
+
+
+def test_all_templates_are_inlined_and_compact():
+    for name in templates.TEMPLATE_SOURCES:
+        literals = ''.join(get_template(name).literals)
+        assert '[[' not in literals, name
+        for style in templates.STYLE_ATTR_PATTERN.findall(literals):
+            assert compact_style(style) == style, name
+        assert not re.search(r'>\s*\n\s*<', literals), name
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+import tolerant_json
+from tolerant_json import IncrementalJSONParser, JSONRepairError, parse_tolerant
+
+
+def feed_chars(text):
+    """逐字符送入，模拟流式输出在任意位置被切开"""
+    parser = IncrementalJSONParser()
+    for char in text:
+        parser.feed(char)
+    return parser.finish()
+
+
+def test_valid_json_uses_stdlib_result():
+    text = '{"a": [1, 2.5, true, null], "b": "\\u4e2d"}'
+    assert tolerant_json.loads(text) == json.loads(text)
+
+
+def test_comments_and_trailing_commas():
+    result = parse_tolerant('{"a": 1, // 注释\n /* 块注释 */ "b": [1, 2,],}')
+    assert result.complete
+    assert result.value == {'a': 1, 'b': [1, 2]}
+
+
+def test_code_fence_and_surrounding_text():
+    assert tolerant_json.loads('好的，结果如下：\n```json\n{"a": 1}\n```\n以上') == {'a': 1}
+
+
+def test_single_quotes_and_bare_keys():
+    assert tolerant_json.loads("{'a': 'x', b: None}") == {'a': 'x', 'b': None}
+
+
+def test_unescaped_quotes_inside_string():
+    result = parse_tolerant('{"q": "他说"好"的", "b": 2}')
+    assert result.value == {'q': '他说"好"的', 'b': 2}
+    assert result.issues and all(issue.path == ['q'] for issue in result.issues)
+
+
+def test_truncated_inside_nested_array():
+    result = parse_tolerant('{"a": {"b": [1, 2')
+    assert not result.complete
+    assert result.value == {'a': {'b': [1, 2]}}
+    assert result.truncated_path == ['a', 'b', 1]
+
+
+def test_truncated_inside_string_keeps_text():
+    result = parse_tolerant('{"a": "abc')
+    assert not result.complete
+    assert result.value == {'a': 'abc'}
+
+
+def test_loads_raises_on_truncation_with_position():
+    with pytest.raises(JSONRepairError) as excinfo:
+        tolerant_json.loads('{"a": [1')
+    assert (excinfo.value.line, excinfo.value.column) == (1, 9)
+
+
+def test_missing_object():
+    with pytest.raises(JSONRepairError):
+        tolerant_json.loads('没有JSON')
+
+
+def test_surrogate_pair_combined():
+    # 多余的逗号让解析走容错路径
+    result = parse_tolerant('{"a": "hi \\ud83d\\ude00 there",}')
+    assert result.value == {'a': 'hi \U0001F600 there'}
+    assert not result.issues
+    json.dumps(result.value, ensure_ascii=False).encode('utf-8')
+
+
+def test_surrogate_pair_split_across_chunks():
+    assert feed_chars('{"a": "\\uD83D\\uDE00",}').value == {'a': '\U0001F600'}
+
+
+def test_lone_surrogate_replaced():
+    result = parse_tolerant('{"a": "x\\ud83d", "b": 1,}')
+    assert result.value == {'a': 'x�', 'b': 1}
+    assert len(result.issues) == 1
+
+
+def test_short_unicode_escape_gives_back_closing_quote():
+    result = parse_tolerant('{"a": "x\\u00"}')
+    assert result.complete
+    assert result.value == {'a': 'x\\u00'}
+    assert len(result.issues) == 1
+
+
+def test_malformed_unicode_escape_keeps_following_text():
+    result = feed_chars('{"a": "x\\u00zz", "b": 1}')
+    assert result.value == {'a': 'x\\u00zz', 'b': 1}
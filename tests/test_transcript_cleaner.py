@@ -0,0 +1,79 @@
+import os
+import re
+
+import pytest
+
+from transcript_cleaner import TranscriptCleaner, clean_transcript
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 标点和空白不算内容，其他字符清洗后只能删除、不能改写或调换顺序
+_NOT_CONTENT = re.compile(r'[\s，,。.！!？?、；;：:…]')
+
+
+def cleaned(text):
+    return clean_transcript(text)[0]
+
+
+def is_subsequence(short, long):
+    chars = iter(long)
+    return all(char in chars for char in short)
+
+
+@pytest.mark.parametrize('text', [
+    '一个一个地看',
+    '讨论讨论',
+    '他说：然后呢？',
+    '时间是10:30：开始',
+    '你说的是这个吗？对吧？',
+    '张三：我们下午3:00：准备开会。',
+    'I know that that is true.',
+    '他做研究，研究生们很忙',
+    '我觉得，我觉得很好',
+    '我说的就是，这个。',
+    '你要的是那个！',
+    '主持人：你好，很高兴见到你。',
+])
+def test_content_unchanged(text):
+    assert cleaned(text) == text + '\n'
+
+
+def test_only_deletes_content():
+    with open(os.path.join(ROOT, 'example_transcript.txt'), encoding='utf-8') as f:
+        transcript = f.read()
+    result = cleaned(transcript)
+    assert is_subsequence(_NOT_CONTENT.sub('', result), _NOT_CONTENT.sub('', transcript))
+
+
+def test_interjections_and_standalone_fillers_removed():
+    assert cleaned('嗯，那个，今天我们聊聊，就是，学习方法。') == '今天我们聊聊，学习方法。\n'
+
+
+def test_pronoun_filler_removed_only_before_pause():
+    assert cleaned('这个，我们先说结论，那个，再说原因。') == '我们先说结论，再说原因。\n'
+
+
+def test_filler_before_question_mark_kept():
+    assert cleaned('然后呢？嗯？') == '然后呢？嗯？\n'
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('我我我觉得很好', '我觉得很好'),
+    ('我觉得，我觉得，很好', '我觉得，很好'),
+    ('他做研究，研究。', '他做研究。'),
+    ('这个这个这个问题', '这个问题'),
+    ('the the the cat', 'the cat'),
+])
+def test_stutter_collapsed(text, expected):
+    assert cleaned(text) == expected + '\n'
+
+
+@pytest.mark.parametrize('line', [
+    '[00:01:23] 张三 :你好',
+    '00:01:23 张三：你好',
+    '【张三】：你好',
+    '张三 00:12：你好',
+    '张三 [00:12]: 你好',
+])
+def test_speaker_markers_normalized(line):
+    assert TranscriptCleaner().normalize_speakers(line) == '张三：你好'
@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+容错的增量JSON解析器
+从模型输出（可逐块送入）中提取第一个顶层JSON对象，容忍代码块标记、注释、多余逗号、
+字符串内未转义的引号，并能补全被截断的输出、报告出错和截断的具体位置
+"""
+
+import re
+import json
+
+
+# 字符串内需要特殊处理的字符
+_STRING_SPECIAL = {
+    '"': re.compile(r'["\\]'),
+    "'": re.compile(r"['\\]"),
+}
+
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', '/': '/', '\\': '\\', '"': '"', "'": "'"}
+_HEX_DIGITS = frozenset('0123456789abcdefABCDEF')
+
+_LITERALS = {'true': True, 'false': False, 'null': None, 'none': None}
+
+_SCALAR_PATTERN = re.compile(r'[^\s,:\[\]{}"\'#/]+')
+
+_NUMBER_PATTERN = re.compile(r'-?\d+(\.\d+)?([eE][+-]?\d+)?')
+
+
+class JSONRepairError(ValueError):
+    """模型输出中找不到可用的JSON对象"""
+
+    def __init__(self, message, line=None, column=None):
+        if line is not None:
+            message = f"{message}（第{line}行第{column}列）"
+        super().__init__(message)
+        self.line = line
+        self.column = column
+
+
+class ParseIssue:
+    """解析过程中发现并已容错处理的问题"""
+
+    __slots__ = ('offset', 'line', 'column', 'path', 'message')
+
+    def __init__(self, offset, path, message):
+        self.offset = offset
+        self.line = None
+        self.column = None
+        self.path = path
+        self.message = message
+
+    def __str__(self):
+        return f"第{self.line}行第{self.column}列（{format_path(self.path) or '顶层'}）: {self.message}"
+
+
+class ParseResult:
+    """
+    解析结果
+
+    Attributes:
+        value: 解析出的对象（截断时为补全后的对象）
+        complete: 顶层对象是否完整闭合
+        truncated_path: 截断时正在生成的值的路径，如 ['main_sections', 2, 'sub_sections']
+        line, column: 截断位置（complete为True时为None）
+        issues: 已容错处理的问题列表
+    """
+
+    __slots__ = ('value', 'complete', 'truncated_path', 'line', 'column', 'issues')
+
+    def __init__(self, value, complete, truncated_path, line, column, issues):
+        self.value = value
+        self.complete = complete
+        self.truncated_path = truncated_path
+        self.line = line
+        self.column = column
+        self.issues = issues
+
+
+def format_path(path):
+    """把路径格式化为 main_sections[2].sub_sections[1].answer 的形式"""
+    text = ''
+    for part in path:
+        if isinstance(part, int):
+            text += f'[{part}]'
+        else:
+            text += f'.{part}' if text else str(part)
+    return text
+
+
+class _Frame:
+    """正在构建的对象或数组"""
+
+    __slots__ = ('container', 'is_object', 'key', 'expect')
+
+    def __init__(self, is_object):
+        self.container = {} if is_object else []
+        self.is_object = is_object
+        self.key = None
+        # 对象: key / colon / value / comma；数组: value / comma
+        self.expect = 'key' if is_object else 'value'
+
+
+class IncrementalJSONParser:
+    """
+    增量JSON解析器
+
+    用法：
+        parser = IncrementalJSONParser()
+        for chunk in stream:
+            parser.feed(chunk)
+        result = parser.finish()
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+        self._mode = 'seek'
+        self._stack = []
+        self._buffer = []
+        self._quote = '"'
+        self._pending = ''
+        self._surrogate = None
+        self._result = None
+        self.issues = []
+
+    @property
+    def done(self):
+        """顶层对象是否已经完整解析"""
+        return self._mode == 'done'
+
+    def feed(self, text):
+        """送入一段新的模型输出"""
+        if not text:
+            return
+        self._chunks.append(text)
+        index = 0
+        length = len(text)
+        while index < length and self._mode != 'done':
+            index = self._step(text, index)
+        self._offset += length
+
+    def finish(self):
+        """结束输入：补全被截断的结构并返回 ParseResult"""
+        full_text = ''.join(self._chunks)
+        if self._mode == 'seek':
+            raise JSONRepairError("模型输出中没有找到JSON对象")
+
+        complete = self._mode == 'done'
+        truncated_path = None
+        line = column = None
+        if not complete:
+            truncated_path = self._current_path(in_progress=self._mode != 'value')
+            line, column = _line_column(full_text, len(full_text))
+            self._close_pending_token()
+            while self._stack:
+                frame = self._stack[-1]
+                if frame.is_object and frame.key is not None and frame.expect != 'comma':
+                    frame.key = None
+                self._close_container()
+
+        for issue in self.issues:
+            issue.line, issue.column = _line_column(full_text, issue.offset)
+        return ParseResult(self._result, complete, truncated_path, line, column, self.issues)
+
+    # ---- 内部实现 ----
+
+    def _issue(self, position, message):
+        self.issues.append(ParseIssue(self._offset + position, self._current_path(in_progress=True), message))
+
+    def _current_path(self, in_progress):
+        """当前正在构建的值的路径"""
+        path = []
+        for depth, frame in enumerate(self._stack):
+            deeper = depth + 1 < len(self._stack) or in_progress
+            if frame.is_object:
+                if frame.key is None or frame.expect == 'comma' and not deeper:
+                    break
+                path.append(frame.key)
+            else:
+                if not deeper:
+                    break
+                path.append(len(frame.container))
+        return path
+
+    def _step(self, text, index):
+        """处理从index开始的输入，返回下一个待处理的位置"""
+        mode = self._mode
+        char = text[index]
+
+        if mode == 'seek':
+            start = text.find('{', index)
+            if start == -1:
+                return len(text)
+            self._stack.append(_Frame(True))
+            self._mode = 'value'
+            return start + 1
+
+        if mode == 'string':
+            match = _STRING_SPECIAL[self._quote].search(text, index)
+            if match is None:
+                self._flush_surrogate(index)
+                self._buffer.append(text[index:])
+                return len(text)
+            if match.start() > index:
+                self._flush_surrogate(index)
+                self._buffer.append(text[index:match.start()])
+            if match.group() == '\\':
+                self._mode = 'escape'
+            else:
+                self._mode = 'quote'
+                self._pending = ''
+            return match.end()
+
+        if mode == 'escape':
+            if char == 'u':
+                self._mode = 'unicode'
+                self._pending = ''
+            else:
+                self._flush_surrogate(index)
+                self._buffer.append(_ESCAPES.get(char, char))
+                self._mode = 'string'
+            return index + 1
+
+        if mode == 'unicode':
+            if char not in _HEX_DIGITS:
+                # 转义不足4位：保留原文，这个字符交回字符串状态处理（可能是结束引号）
+                self._issue(index, f"无效的unicode转义 \\u{self._pending}")
+                self._flush_surrogate(index)
+                self._buffer.append('\\u' + self._pending)
+                self._mode = 'string'
+                return index
+            self._pending += char
+            if len(self._pending) == 4:
+                self._on_code_unit(int(self._pending, 16), index)
+                self._mode = 'string'
+            return index + 1
+
+        if mode == 'quote':
+            # 引号后跟着的字符决定它是字符串结束还是内容中未转义的引号
+            if char in ' \t\r':
+                self._pending += char
+                return index + 1
+            if char in ',:}]\n#/':
+                self._mode = 'value'
+                self._flush_surrogate(index)
+                self._emit(''.join(self._buffer))
+                self._buffer = []
+                return index
+            self._issue(index, "字符串中有未转义的引号，已按内容处理")
+            self._flush_surrogate(index)
+            self._buffer.append(self._quote + self._pending)
+            self._mode = 'string'
+            return index
+
+        if mode == 'scalar':
+            match = _SCALAR_PATTERN.match(text, index)
+            if match:
+                self._buffer.append(match.group())
+                return match.end()
+            self._mode = 'value'
+            self._emit_scalar(index)
+            return index
+
+        if mode == 'comment_line':
+            end = text.find('\n', index)
+            if end == -1:
+                return len(text)
+            self._mode = 'value'
+            return end + 1
+
+        if mode == 'comment_block':
+            if self._pending == '*' and char == '/':
+                self._mode = 'value'
+                return index + 1
+            self._pending = char
+            return index + 1
+
+        if mode == 'slash':
+            if char == '/':
+                self._mode = 'comment_line'
+            elif char == '*':
+                self._mode = 'comment_block'
+                self._pending = ''
+            else:
+                self._issue(index, "无法识别的字符 '/'")
+                self._mode = 'value'
+                return index
+            return index + 1
+
+        # mode == 'value'：结构字符
+        if char in ' \t\r\n':
+            return index + 1
+        if char == '#':
+            self._mode = 'comment_line'
+            return index + 1
+        if char == '/':
+            self._mode = 'slash'
+            return index + 1
+        if char == ',':
+            self._on_comma(index)
+            return index + 1
+        if char == ':':
+            self._on_colon(index)
+            return index + 1
+        if char in '}]':
+            self._on_close(char, index)
+            return index + 1
+
+        self._before_value(index)
+        if char in '{[':
+            self._stack.append(_Frame(char == '{'))
+        elif char in '"\'':
+            self._mode = 'string'
+            self._quote = char
+            self._buffer = []
+        else:
+            self._mode = 'scalar'
+            self._buffer = []
+            return index
+        return index + 1
+
+    def _before_value(self, index):
+        """一个新的值开始前，检查是否缺少逗号或冒号"""
+        frame = self._stack[-1]
+        if frame.expect == 'comma':
+            self._issue(index, "缺少逗号，已自动补上")
+            frame.expect = 'key' if frame.is_object else 'value'
+        elif frame.expect == 'colon':
+            self._issue(index, "缺少冒号，已自动补上")
+            frame.expect = 'value'
+
+    def _on_comma(self, index):
+        frame = self._stack[-1]
+        if frame.expect == 'comma':
+            frame.expect = 'key' if frame.is_object else 'value'
+        elif frame.is_object and frame.expect in ('colon', 'value'):
+            self._issue(index, f"键 {frame.key!r} 缺少值，已忽略")
+            frame.key = None
+            frame.expect = 'key'
+        # 连续的逗号直接忽略
+
+    def _on_colon(self, index):
+        frame = self._stack[-1]
+        if frame.is_object and frame.expect == 'colon':
+            frame.expect = 'value'
+        else:
+            self._issue(index, "多余的冒号，已忽略")
+
+    def _on_close(self, char, index):
+        frame = self._stack[-1]
+        if frame.is_object != (char == '}'):
+            # 括号不匹配：先闭合当前容器，再重新处理这个括号
+            self._issue(index, f"括号不匹配，已在 '{char}' 前补全")
+            self._close_container()
+            if self._mode != 'done':
+                self._on_close(char, index)
+            return
+        if frame.is_object and frame.expect in ('colon', 'value'):
+            self._issue(index, f"键 {frame.key!r} 缺少值，已忽略")
+            frame.key = None
+        self._close_container()
+
+    def _close_container(self):
+        frame = self._stack.pop()
+        if self._stack:
+            self._emit(frame.container)
+        else:
+            self._result = frame.container
+            self._mode = 'done'
+
+    def _emit(self, value):
+        """把一个完整的值放入当前容器"""
+        frame = self._stack[-1]
+        if not frame.is_object:
+            frame.container.append(value)
+            frame.expect = 'comma'
+        elif frame.expect == 'key':
+            frame.key = value if isinstance(value, str) else str(value)
+            frame.expect = 'colon'
+        else:
+            if frame.key is not None:
+                frame.container[frame.key] = value
+            frame.key = None
+            frame.expect = 'comma'
+
+    def _emit_scalar(self, index):
+        token = ''.join(self._buffer)
+        self._buffer = []
+        frame = self._stack[-1]
+        if frame.is_object and frame.expect == 'key':
+            self._emit(token)
+            return
+        lowered = token.lower()
+        if lowered in _LITERALS:
+            self._emit(_LITERALS[lowered])
+        elif _NUMBER_PATTERN.fullmatch(token):
+            self._emit(float(token) if any(c in token for c in '.eE') else int(token))
+        else:
+            self._issue(index, f"无法识别的值 {token!r}，已按字符串处理")
+            self._emit(token)
+
+    def _on_code_unit(self, code, index):
+        """处理一个 \\uXXXX：高代理项等待下一个低代理项，两者合并为一个字符（如emoji）"""
+        if 0xDC00 <= code <= 0xDFFF and self._surrogate is not None:
+            self._buffer.append(chr(0x10000 + ((self._surrogate - 0xD800) << 10) + (code - 0xDC00)))
+            self._surrogate = None
+            return
+        self._flush_surrogate(index)
+        if 0xD800 <= code <= 0xDBFF:
+            self._surrogate = code
+        elif 0xDC00 <= code <= 0xDFFF:
+            self._issue(index, f"孤立的unicode代理项 \\u{code:04x}，已替换为 U+FFFD")
+            self._buffer.append('\ufffd')
+        else:
+            self._buffer.append(chr(code))
+
+    def _flush_surrogate(self, index):
+        """高代理项后面没有跟着低代理项：替换为 U+FFFD（孤立的代理项无法写成UTF-8）"""
+        if self._surrogate is not None:
+            self._issue(index, f"孤立的unicode代理项 \\u{self._surrogate:04x}，已替换为 U+FFFD")
+            self._buffer.append('\ufffd')
+            self._surrogate = None
+
+    def _close_pending_token(self):
+        """输入在字符串或标量中间结束时，尽量保留已有内容"""
+        mode = self._mode
+        self._mode = 'value'
+        if mode in ('string', 'escape', 'unicode', 'quote'):
+            self._flush_surrogate(0)
+            self._emit(''.join(self._buffer))
+        elif mode == 'scalar':
+            self._emit_scalar(self._offset)
+        self._buffer = []
+
+
+def _line_column(text, offset):
+    """把字符偏移换算成行号和列号（从1开始）"""
+    line = text.count('\n', 0, offset) + 1
+    column = offset - (text.rfind('\n', 0, offset) + 1) + 1
+    return line, column
+
+
+def parse_tolerant(text):
+    """一次性解析完整文本，返回 ParseResult"""
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    return parser.finish()
+
+
+def loads(text):
+    """容错地解析JSON文本，输出被截断时抛出 JSONRepairError"""
+    # 大多数输入本来就是合法JSON，先用标准库解析，失败时再逐字符容错解析
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    result = parse_tolerant(text)
+    if not result.complete:
+        raise JSONRepairError(
+            f"JSON在 {format_path(result.truncated_path) or '顶层'} 处被截断",
+            result.line, result.column
+        )
+    return result.value
+
+
+def load_file(path):
+    """容错地读取JSON文件（允许注释、多余逗号等）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return loads(f.read())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+录音稿本地预清洗
+在调用大模型之前删除语气词和口头禅、合并口吃式的重复、统一发言人标记的格式，
+缩短最大一次模型调用的输入。
+
+清洗只删除不承载内容的部分，拿不准的（紧挨着重复两次的词、问号前的口头禅、
+正文中的 "xx：" ）一律保留；流水线中需要加 --clean 才会启用
+"""
+
+import re
+from functools import lru_cache
+
+from chunking import estimate_tokens
+from emphasis import load_glossary
+
+
+# 在任何位置都可以直接删除的语气词
+DEFAULT_INTERJECTIONS = ('嗯', '呃', '唔')
+
+# 只有单独成句（前后都是标点或行首行尾）时才删除的口头禅，避免误删正常用法
+DEFAULT_FILLERS = ('那个', '这个', '就是说', '就是', '然后就是', '然后呢', '然后', '对吧', '的话', '啊', '哦')
+
+_PUNCTUATION = '，,。.！!？?、；;：:…'
+
+# 口头禅后面跟着这些标点时才删除；后面是问号的（然后呢？ / 对吧？）是真正的提问，保留
+_FILLER_END = '，,。.！!、；;：:…'
+
+# 这个 / 那个 在句末（就是，这个。）多是指代，只有后面是逗号一类的停顿时才当作口头禅
+_PRONOUN_FILLERS = ('这个', '那个')
+_PRONOUN_FILLER_END = '，,、；;：:…'
+
+# 发言人标记中的时间戳，如 00:12 / 00:01:23
+_TIMESTAMP = r'\d{1,2}:\d{2}(?::\d{2})?'
+_NAME = r'[^\s：:，,。？?！!\[\]【】()（）]{1,20}'
+
+# 只认明确的发言人标记行，统一为 "姓名："：
+#   "[00:01:23] 张三 :" / "00:01:23 张三："（行首时间戳，不带括号时必须是时:分:秒）
+#   "【张三】：" / "[张三]:"（括号括起的姓名）
+#   "张三 00:12：" / "张三 [00:12]："（姓名和时间戳之间有空白）
+# 已经是 "姓名：" 的行和正文中的 "时间是10:30：" 不会被改动
+_SPEAKER_LINE = re.compile(
+    r'^[ \t]*(?:'
+    rf'(?:[\[【(（]{_TIMESTAMP}[\]】)）]|\d{{1,2}}:\d{{2}}:\d{{2}})[ \t]*[\[【]?(?P<after_time>{_NAME})[\]】]?'
+    rf'|[\[【](?P<bracketed>{_NAME})[\]】]'
+    rf'|(?P<before_time>{_NAME})[ \t]+[\[【(（]?{_TIMESTAMP}[\]】)）]?'
+    r')[ \t]*[：:](?!\d)[ \t]*',
+    re.MULTILINE
+)
+
+# 连续重复三次及以上的单个汉字（我我我觉得）
+_REPEATED_CHAR = re.compile(r'([\u4e00-\u9fff])\1{2,}')
+
+# 重复的2~6字词组：用逗号隔开且最后一次重复后是标点或结尾的（我觉得，我觉得，），或紧挨着重复三次及以上的（这个这个这个）；
+# 紧挨着重复两次的（一个一个、讨论讨论）多是正常用法，不合并；逗号后的重复只是下一个词的开头时（做研究，研究生）也不合并
+_REPEATED_PHRASE = re.compile(rf'([\u4e00-\u9fff]{{2,6}})(?:(?:[，,、]\1)+(?=[{re.escape(_PUNCTUATION)}]|$)|\1{{2,}})', re.MULTILINE)
+
+# 重复的英文单词：用逗号隔开的（I, I），或重复三次及以上的（the the the）；"that that" 可能是正常用法
+_REPEATED_WORD = re.compile(r'\b([A-Za-z]+)(?:(?:\s*,\s*\1\b)+|(?:\s+\1\b){2,})', re.IGNORECASE)
+
+# 删除后残留的重复标点和行首标点
+_DUPLICATE_COMMAS = re.compile(r'[，,、](?:\s*[，,、])+')
+_COMMA_BEFORE_STOP = re.compile(r'[，,、]\s*(?=[。！？!?；;…])')
+_LEADING_PUNCTUATION = re.compile(r'^([ \t]*(?:[^\s：:]{1,20}：)?)[ \t]*[，,、。.]+[ \t]*', re.MULTILINE)
+_BLANK_LINES = re.compile(r'\n{3,}')
+
+
+class TranscriptCleaner:
+    """由语气词和口头禅词表构建的清洗器，正则只编译一次，可重复用于多份录音稿"""
+
+    def __init__(self, fillers=DEFAULT_FILLERS, interjections=DEFAULT_INTERJECTIONS):
+        # 长的词优先匹配，避免 "就是说" 只删掉 "就是"
+        fillers = sorted({f.strip() for f in fillers if f.strip()}, key=len, reverse=True)
+        interjections = sorted({i.strip() for i in interjections if i.strip()}, key=len, reverse=True)
+        punctuation = re.escape(_PUNCTUATION)
+        filler_end = re.escape(_FILLER_END)
+        pronoun_end = re.escape(_PRONOUN_FILLER_END)
+        pronouns = [f for f in fillers if f in _PRONOUN_FILLERS]
+        fillers = [f for f in fillers if f not in _PRONOUN_FILLERS]
+        self.interjection_pattern = None
+        if interjections:
+            self.interjection_pattern = re.compile(
+                '(?:' + '|'.join(map(re.escape, interjections)) + f')+(?:[{filler_end}]|(?![？?]))'
+            )
+        alternatives = []
+        if fillers:
+            alternatives.append('(?:' + '|'.join(map(re.escape, fillers)) + f')[{filler_end}]')
+        if pronouns:
+            alternatives.append('(?:' + '|'.join(map(re.escape, pronouns)) + f')[{pronoun_end}]')
+        self.filler_pattern = None
+        if alternatives:
+            self.filler_pattern = re.compile(
+                f'(?:(?<=[{punctuation}\\s])|^|(?<=[：:]))(?:' + '|'.join(alternatives) + ')',
+                re.MULTILINE
+            )
+
+    def normalize_speakers(self, text):
+        """统一发言人标记为 "姓名：" 的形式，并去掉标记中的时间戳"""
+        return _SPEAKER_LINE.sub(
+            lambda m: f"{m.group('after_time') or m.group('bracketed') or m.group('before_time')}：", text
+        )
+
+    def remove_fillers(self, text):
+        """删除语气词和单独成句的口头禅"""
+        if self.interjection_pattern is not None:
+            text = self.interjection_pattern.sub('', text)
+        if self.filler_pattern is not None:
+            # 删除后可能露出新的单独成句的口头禅（那个，就是，...），重复到不再变化
+            while True:
+                cleaned = self.filler_pattern.sub('', text)
+                if cleaned == text:
+                    break
+                text = cleaned
+        return text
+
+    def collapse_repeats(self, text):
+        """合并口吃式的重复字词"""
+        text = _REPEATED_PHRASE.sub(r'\1', text)
+        text = _REPEATED_CHAR.sub(r'\1', text)
+        return _REPEATED_WORD.sub(r'\1', text)
+
+    def clean(self, text):
+        """
+        清洗一份录音稿
+
+        Returns:
+            tuple[str, dict]: 清洗后的文本，以及清洗前后的token估算
+                              {'tokens_before', 'tokens_after', 'tokens_removed'}
+        """
+        tokens_before = estimate_tokens(text)
+        text = self.normalize_speakers(text)
+        text = self.remove_fillers(text)
+        text = self.collapse_repeats(text)
+        text = _DUPLICATE_COMMAS.sub('，', text)
+        text = _COMMA_BEFORE_STOP.sub('', text)
+        text = _LEADING_PUNCTUATION.sub(r'\1', text)
+        text = _BLANK_LINES.sub('\n\n', text).strip() + '\n'
+        tokens_after = estimate_tokens(text)
+        return text, {
+            'tokens_before': tokens_before,
+            'tokens_after': tokens_after,
+            'tokens_removed': tokens_before - tokens_after,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_cleaner(lexicon_path=None):
+    """获取清洗器；lexicon_path为口头禅词表文件（每行一个词），其中的词会加入默认词表"""
+    fillers = DEFAULT_FILLERS
+    if lexicon_path:
+        fillers = fillers + tuple(load_glossary(lexicon_path))
+    return TranscriptCleaner(fillers)
+
+
+def clean_transcript(text, lexicon_path=None):
+    """用默认词表（和可选的词表文件）清洗录音稿，返回 (清洗后的文本, 统计)"""
+    return get_cleaner(lexicon_path).clean(text)